@@ -0,0 +1,48 @@
+# bench/combat_sim.py
+"""
+Headless Brettventures combat: win rates and throughput per monster.
+
+Runs utils.combat.resolve() N times against every monster (scaled to the
+given level) for one player build, with seeds 0..N-1, so the numbers are
+reproducible and a balance change shows up as a diff.
+
+Usage (from the repo root):
+    python -m bench.combat_sim --fights 10000
+    python -m bench.combat_sim --level 10 --hp 38 --pow 5 --smt 6 --luck 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import List
+
+from utils import combat
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline combat simulator")
+    ap.add_argument("--fights", type=int, default=10000, help="fights per monster")
+    ap.add_argument("--level", type=int, default=1)
+    ap.add_argument("--hp", type=int, default=20, help="current and max HP")
+    ap.add_argument("--pow", type=int, default=1)
+    ap.add_argument("--smt", type=int, default=1)
+    ap.add_argument("--luck", type=int, default=0)
+    ap.add_argument("--monsters", default="", help="comma-separated ids (default: all)")
+    args = ap.parse_args(argv)
+
+    p = {"level": args.level, "hp": args.hp, "hp_max": args.hp, "pow": args.pow, "smt": args.smt, "luck": args.luck}
+    ids = [m for m in args.monsters.split(",") if m] or list(combat.MONSTERS)
+    unknown = [m for m in ids if m not in combat.MONSTERS]
+    if unknown:
+        ap.error(f"unknown monster(s): {', '.join(unknown)}")
+    results = combat.fights_for(p, [combat.MONSTERS[m] for m in ids], args.fights)
+    total = sum(r["fights"] for r in results)
+    secs = sum(r["fights"] / r["fights_per_s"] for r in results if r["fights_per_s"])
+    print(json.dumps({"player": p, "results": results,
+                      "fights_per_s": round(total / secs) if secs else None}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# bench/datasets.py
+"""Synthetic stats files shaped like a long-running production store."""
+from __future__ import annotations
+
+import json
+import os
+import random
+from typing import Any, Dict
+
+from constants import BRETT_RESPONSES
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Every Nth user also has a Brettventures character
+ADVENTURER_EVERY = 5
+
+
+def parse_size(label: str) -> int:
+    key = label.strip().lower()
+    if key in SIZES:
+        return SIZES[key]
+    return int(key)
+
+
+def user_id(i: int) -> int:
+    """Deterministic snowflake-ish id for the i-th synthetic user."""
+    return 100_000_000_000_000_000 + i
+
+
+def build_root(n_users: int, seed: int = 1234) -> Dict[str, Any]:
+    rnd = random.Random(seed)
+    users: Dict[str, Any] = {}
+    g_out = {k: 0 for k in BRETT_RESPONSES}
+    players: Dict[str, Any] = {}
+
+    for i in range(n_users):
+        uid = user_id(i)
+        outcomes = {k: rnd.randint(0, 40) for k in BRETT_RESPONSES}
+        total = sum(outcomes.values())
+        for k, c in outcomes.items():
+            g_out[k] += c
+        users[str(uid)] = {
+            "total": total,
+            "outcomes": outcomes,
+            "last_roll_date": None,
+            "streak_days": rnd.randint(0, 5),
+        }
+        if i % ADVENTURER_EVERY == 0:
+            players[str(uid)] = {
+                "user_id": uid,
+                "name": f"user{uid}",
+                "level": rnd.randint(1, 20),
+                "xp": rnd.randint(0, 9),
+                "hp": 20, "hp_max": 20,
+                "stamina": 5, "stamina_max": 5,
+                "pow": rnd.randint(1, 10), "smt": rnd.randint(1, 10), "luck": 0,
+                "gold": rnd.randint(0, 500),
+                "inventory": [],
+                "flags": {},
+                "stamina_ts": 0,
+            }
+
+    return {
+        "global": {"total": sum(g_out.values()), "outcomes": g_out},
+        "users": users,
+        "brettventures": {"players": players},
+    }
+
+
+def write_dataset(path: str, n_users: int, seed: int = 1234) -> int:
+    """Write a synthetic store to `path`; returns the file size in bytes."""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    root = build_root(n_users, seed)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(root, f, indent=2)
+    return os.path.getsize(path)
+
+
+def adventurer_ids(n_users: int):
+    """User ids that received a Brettventures character in build_root."""
+    return [user_id(i) for i in range(0, n_users, ADVENTURER_EVERY)]
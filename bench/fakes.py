@@ -0,0 +1,93 @@
+# bench/fakes.py
+"""
+Minimal stand-ins for the discord.py objects our cog handlers touch.
+
+Only the attributes the handlers actually read are provided, so the
+benchmarks exercise real command code without a gateway connection.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Any, Dict, List, Optional
+
+_ids = itertools.count(900_000_000_000_000_000)
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str | None = None, bot: bool = False):
+        self.id = user_id
+        self.name = name or f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.bot = bot
+
+    async def send(self, content: str | None = None, **kwargs: Any) -> None:
+        pass
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, members: List[FakeUser] | None = None):
+        self.id = guild_id
+        self.chunked = True
+        self._members: Dict[int, FakeUser] = {m.id: m for m in (members or [])}
+
+    @property
+    def members(self) -> List[FakeUser]:
+        return list(self._members.values())
+
+    def get_member(self, user_id: int) -> Optional[FakeUser]:
+        return self._members.get(user_id)
+
+    def add_member(self, member: FakeUser) -> None:
+        self._members[member.id] = member
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int | None = None):
+        self.id = channel_id or next(_ids)
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, content: str | None = None, **kwargs: Any) -> None:
+        self.sent.append({"content": content, **kwargs})
+
+
+class FakeMessage:
+    def __init__(self, author: FakeUser, channel: FakeChannel,
+                 guild: FakeGuild | None, content: str = ""):
+        self.id = next(_ids)
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.content = content
+        self.mentions: List[FakeUser] = []
+
+
+class FakeBot:
+    """Just enough of commands.Bot for cog constructors and fetch_user fallbacks."""
+
+    def __init__(self):
+        self.user = FakeUser(1, "BrettBot", bot=True)
+
+    def get_user(self, user_id: int) -> Optional[FakeUser]:
+        return None
+
+    async def fetch_user(self, user_id: int) -> FakeUser:
+        return FakeUser(user_id)
+
+
+class FakeContext:
+    def __init__(self, bot: FakeBot, author: FakeUser,
+                 guild: FakeGuild | None, channel: FakeChannel | None = None,
+                 content: str = ""):
+        self.bot = bot
+        self.author = author
+        self.guild = guild
+        self.channel = channel or FakeChannel()
+        self.message = FakeMessage(author, self.channel, guild, content)
+
+    @property
+    def sent(self) -> List[Dict[str, Any]]:
+        return self.channel.sent
+
+    async def send(self, content: str | None = None, **kwargs: Any) -> None:
+        await self.channel.send(content, **kwargs)
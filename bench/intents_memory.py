@@ -0,0 +1,146 @@
+# bench/intents_memory.py
+"""
+Memory/CPU cost of the gateway cache: default intents vs BOT_LOW_MEMORY.
+
+Feeds a synthetic large-guild event stream (GUILD_CREATE with the member list
+a chunked guild ends up holding, PRESENCE_UPDATEs, MESSAGE_CREATEs) through
+discord.py's real ConnectionState parsers for each configuration from
+`bot.client_options()`, then reports retained memory and CPU time.
+
+Usage (from the repo root):
+    python -m bench.intents_memory --guilds 5 --members 20000 --presences 100000 --messages 50000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import gc
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from bench.loadsim import _message_payload, _user_payload
+
+_ids = itertools.count(1_200_000_000_000_000_000)
+_STATUSES = ("online", "idle", "dnd", "offline")
+
+
+def _member(uid: int, now: str) -> Dict[str, Any]:
+    return {"user": _user_payload(uid, f"m{uid % 1000000}"), "roles": [], "joined_at": now,
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def _presence(gid: int, uid: int, i: int) -> Dict[str, Any]:
+    return {"user": {"id": str(uid)}, "guild_id": str(gid), "status": _STATUSES[i % 4],
+            "activities": [{"name": f"Game {i % 50}", "type": 0}],
+            "client_status": {"desktop": _STATUSES[i % 4]}}
+
+
+def _guild(gid: int, chan: int, members: List[int], self_id: int,
+           with_members: bool, with_presences: bool) -> Dict[str, Any]:
+    now = dt.datetime.now(dt.timezone.utc).isoformat()
+    listed = members if with_members else []
+    return {
+        "id": str(gid), "name": f"big-{gid}", "owner_id": str(members[0]),
+        "roles": [{"id": str(gid), "name": "@everyone", "permissions": "0", "position": 0,
+                   "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(chan), "type": 0, "name": "general", "position": 0,
+                      "guild_id": str(gid), "permission_overwrites": [], "nsfw": False}],
+        "members": [_member(uid, now) for uid in listed] + [_member(self_id, now)],
+        "presences": [_presence(gid, uid, i) for i, uid in enumerate(listed)] if with_presences else [],
+        "member_count": len(members) + 1, "large": True,
+        "emojis": [], "stickers": [], "features": [],
+    }
+
+
+async def _run(label: str, opts: Dict[str, Any], args) -> Dict[str, Any]:
+    import discord
+
+    intents = opts["intents"]
+    cache_all = opts.get("chunk_guilds_at_startup", intents.members) and \
+        (opts.get("member_cache_flags") is None or opts["member_cache_flags"].joined)
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    cpu0 = time.process_time()
+
+    client = discord.Client(**opts)
+    async with client:
+        state = client._connection
+        self_id = next(_ids)
+        state.user = discord.ClientUser(state=state, data=_user_payload(self_id, "BrettBot", bot=True))
+        # No websocket here: chunking is emulated by listing every member in
+        # GUILD_CREATE when this config would have chunked.
+        state._chunk_guilds = False
+
+        world = []
+        for _ in range(args.guilds):
+            gid, chan = next(_ids), next(_ids)
+            members = [next(_ids) for _ in range(args.members)]
+            state.parse_guild_create(_guild(gid, chan, members, self_id,
+                                            with_members=cache_all,
+                                            with_presences=cache_all and intents.presences))
+            world.append((gid, chan, members))
+
+        presences = 0
+        if intents.presences:
+            for i in range(args.presences):
+                gid, _, members = world[i % len(world)]
+                state.parse_presence_update(_presence(gid, members[(i * 7919) % len(members)], i))
+                presences += 1
+
+        for i in range(args.messages):
+            gid, chan, members = world[i % len(world)]
+            uid = members[(i * 104729) % len(members)]
+            state.parse_message_create(_message_payload(chan, gid, uid, f"chatter {i}"))
+
+        await asyncio.sleep(0)  # let dispatched no-op events drain
+        cpu = time.process_time() - cpu0
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - base
+        cached_members = sum(len(g._members) for g in client.guilds)
+        cached_messages = len(state._messages or ())
+
+    tracemalloc.stop()
+    return {
+        "config": label,
+        "presence_intent": intents.presences,
+        "presence_events": presences,
+        "cached_members": cached_members,
+        "cached_messages": cached_messages,
+        "retained_mb": round(retained / 1e6, 1),
+        "cpu_s": round(cpu, 2),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Gateway cache footprint: default vs low-memory")
+    ap.add_argument("--guilds", type=int, default=5)
+    ap.add_argument("--members", type=int, default=20000, help="members per guild")
+    ap.add_argument("--presences", type=int, default=100000)
+    ap.add_argument("--messages", type=int, default=50000)
+    args = ap.parse_args(argv)
+
+    import bot as botmod
+
+    results = [
+        asyncio.run(_run("default", botmod.client_options(low_memory=False), args)),
+        asyncio.run(_run("low-memory", botmod.client_options(low_memory=True), args)),
+    ]
+    d, lo = results
+    saved = {
+        "memory_mb": round(d["retained_mb"] - lo["retained_mb"], 1),
+        "memory_pct": round(100 * (1 - lo["retained_mb"] / d["retained_mb"]), 1) if d["retained_mb"] else 0.0,
+        "cpu_s": round(d["cpu_s"] - lo["cpu_s"], 2),
+    }
+    print(json.dumps({"results": results, "savings": saved}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
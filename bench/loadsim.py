@@ -0,0 +1,295 @@
+# bench/loadsim.py
+"""
+Offline gateway load simulator.
+
+Builds real discord.py Guild/Member/Message objects on the bot's own
+ConnectionState and feeds them through `bot.process_commands`, exactly as
+`on_message` would. The HTTP layer is stubbed so every outgoing message is
+recorded instead of sent, which lets us measure end-to-end behaviour of the
+cogs loaded by `load_extensions` without a Discord connection.
+
+Usage (from the repo root):
+    python -m bench.loadsim --guilds 50 --rate 200 --seconds 20
+    python -m bench.loadsim --mix "!brett=6,!leaderboard=1,!adventure explore=2"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import datetime as dt
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_MIX = "!brett=6,!leaderboard=1,!adventure explore=2"
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def _sid() -> int:
+    return next(_snowflakes)
+
+
+def parse_mix(spec: str) -> Tuple[List[str], List[float]]:
+    """'!brett=6,!stats=1' -> (['!brett', '!stats'], [6.0, 1.0])"""
+    cmds: List[str] = []
+    weights: List[float] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        cmd, _, w = part.rpartition("=")
+        if not cmd:
+            cmd, w = w, "1"
+        cmds.append(cmd.strip())
+        weights.append(float(w))
+    if not cmds:
+        raise ValueError("empty command mix")
+    return cmds, weights
+
+
+# ---- fake gateway payloads ----
+def _user_payload(uid: int, name: str, bot: bool = False) -> Dict[str, Any]:
+    return {"id": str(uid), "username": name, "discriminator": "0",
+            "global_name": name, "avatar": None, "bot": bot}
+
+
+def _guild_payload(gid: int, channel_ids: List[int], member_ids: List[int]) -> Dict[str, Any]:
+    now = dt.datetime.now(dt.timezone.utc).isoformat()
+    return {
+        "id": str(gid),
+        "name": f"sim-guild-{gid}",
+        "owner_id": str(member_ids[0]),
+        "roles": [{"id": str(gid), "name": "@everyone", "permissions": "1071698660929",
+                   "position": 0, "color": 0, "hoist": False, "managed": False,
+                   "mentionable": False}],
+        "channels": [{"id": str(cid), "type": 0, "name": f"chan-{i}", "position": i,
+                      "guild_id": str(gid), "permission_overwrites": [], "nsfw": False}
+                     for i, cid in enumerate(channel_ids)],
+        "members": [{"user": _user_payload(uid, f"sim{uid % 100000}"), "roles": [],
+                     "joined_at": now, "deaf": False, "mute": False, "flags": 0}
+                    for uid in member_ids],
+        "member_count": len(member_ids),
+        "emojis": [], "stickers": [], "features": [],
+    }
+
+
+def _message_payload(channel_id: int, guild_id: int, author_id: int, content: str) -> Dict[str, Any]:
+    return {
+        "id": str(_sid()),
+        "channel_id": str(channel_id),
+        "guild_id": str(guild_id),
+        "author": _user_payload(author_id, f"sim{author_id % 100000}"),
+        "member": {"roles": [], "joined_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+                   "deaf": False, "mute": False, "flags": 0},
+        "content": content,
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+# ---- stubbed HTTP layer ----
+class SendRecorder:
+    """
+    Replaces HTTPClient.send_message (and the user lookup leaderboards fall back
+    to) so nothing leaves the process; every outgoing message is recorded.
+    """
+
+    def __init__(self, bot_user: Dict[str, Any]):
+        self.bot_user = bot_user
+        self.sent: List[Dict[str, Any]] = []
+        self.by_channel: Dict[int, int] = {}
+
+    async def send_message(self, channel_id, *, params=None, **_: Any) -> Dict[str, Any]:
+        payload = (params.payload if params is not None else None) or {}
+        cid = int(channel_id)
+        self.sent.append({"channel_id": cid, "t": time.perf_counter(),
+                          "content": payload.get("content"),
+                          "embeds": len(payload.get("embeds") or [])})
+        self.by_channel[cid] = self.by_channel.get(cid, 0) + 1
+        return {
+            **_message_payload(cid, 0, int(self.bot_user["id"]), payload.get("content") or ""),
+            "author": self.bot_user,
+        }
+
+    async def get_user(self, user_id) -> Dict[str, Any]:
+        return _user_payload(int(user_id), f"sim{int(user_id) % 100000}")
+
+
+async def _lag_monitor(interval: float, samples: List[float], stop: asyncio.Event) -> None:
+    """Measure how late the loop wakes us; that overshoot is event-loop lag."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - t0 - interval))
+
+
+def _pct(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+
+async def simulate(args) -> Dict[str, Any]:
+    import bot as botmod
+
+    # `async with` wires the client to this loop, same as bot.main()
+    async with botmod.bot:
+        return await _simulate(botmod, args)
+
+
+async def _simulate(botmod, args) -> Dict[str, Any]:
+    import discord
+    from discord.ext import commands
+    from utils import brettventures, outbox
+
+    bot = botmod.bot
+    state = bot._connection
+    rnd = random.Random(args.seed)
+
+    # Log in a synthetic bot user and stub the HTTP send path
+    me = _user_payload(_sid(), "BrettBot", bot=True)
+    state.user = discord.ClientUser(state=state, data=me)
+    recorder = SendRecorder(me)
+    bot.http.send_message = recorder.send_message  # type: ignore[method-assign]
+    bot.http.get_user = recorder.get_user  # type: ignore[method-assign]
+
+    await botmod.load_extensions()
+
+    # Guilds, channels and members on the real ConnectionState cache
+    world: List[Tuple[discord.Guild, List[int], List[int]]] = []
+    for _ in range(args.guilds):
+        gid = _sid()
+        chans = [_sid() for _ in range(args.channels)]
+        members = [_sid() for _ in range(args.members)]
+        guild = state._add_guild_from_data(_guild_payload(gid, chans, members))
+        world.append((guild, chans, members))
+
+    # Give every simulated user a character so explore does real work
+    if not args.no_seed_players:
+        for guild, _, members in world:
+            for uid in members:
+                brettventures.bv_get_or_create_player(uid, f"sim{uid % 100000}")
+
+    cmds, weights = parse_mix(args.mix)
+    cooldowns = 0
+    errors = 0
+
+    async def on_command_error(ctx, error):
+        nonlocal cooldowns, errors
+        if isinstance(error, commands.CommandOnCooldown):
+            cooldowns += 1
+        elif not isinstance(error, commands.CommandNotFound):
+            errors += 1
+
+    bot.add_listener(on_command_error, "on_command_error")
+
+    latencies: Dict[str, List[float]] = {c: [] for c in cmds}
+    lag: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_lag_monitor(0.01, lag, stop))
+    tasks: List[asyncio.Task] = []
+
+    async def dispatch(cmd: str, msg: discord.Message, scheduled: float) -> None:
+        await bot.process_commands(msg)
+        latencies[cmd].append(time.perf_counter() - scheduled)
+
+    interval = 1.0 / args.rate
+    start = time.perf_counter()
+    sent_before = len(recorder.sent)
+    n = int(args.rate * args.seconds)
+    for i in range(n):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        guild, chans, members = world[rnd.randrange(len(world))]
+        cmd = rnd.choices(cmds, weights)[0]
+        data = _message_payload(rnd.choice(chans), guild.id, rnd.choice(members), cmd)
+        channel = guild.get_channel(int(data["channel_id"]))
+        msg = discord.Message(state=state, channel=channel, data=data)
+        tasks.append(asyncio.create_task(dispatch(cmd, msg, scheduled)))
+
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+    bot.remove_listener(on_command_error, "on_command_error")
+
+    all_lat = [x for v in latencies.values() for x in v]
+    return {
+        "messages": n,
+        "target_rate": args.rate,
+        "achieved_rate": round(n / wall, 2),
+        "replies": len(recorder.sent) - sent_before,
+        "cooldown_hits": cooldowns,
+        "errors": errors,
+        "latency_ms": {
+            "p50": round(_pct(all_lat, 0.50) * 1000, 2),
+            "p99": round(_pct(all_lat, 0.99) * 1000, 2),
+            "max": round(max(all_lat, default=0.0) * 1000, 2),
+        },
+        "per_command_p99_ms": {c: round(_pct(v, 0.99) * 1000, 2) for c, v in latencies.items()},
+        "loop_lag_ms": {
+            "p50": round(_pct(lag, 0.50) * 1000, 2),
+            "p99": round(_pct(lag, 0.99) * 1000, 2),
+            "max": round(max(lag, default=0.0) * 1000, 2),
+        },
+        "outbox": {"sent": outbox.OUTBOX.sent, "merged": outbox.OUTBOX.merged, "enabled": outbox.ENABLED},
+        "extensions": sorted(bot.extensions),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline end-to-end load simulator")
+    ap.add_argument("--guilds", type=int, default=50)
+    ap.add_argument("--channels", type=int, default=3, help="channels per guild")
+    ap.add_argument("--members", type=int, default=40, help="members per guild")
+    ap.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="weighted command mix, e.g. '!brett=6,!stats=1'")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--stats-file", help="store to use (default: fresh temp file)")
+    ap.add_argument("--no-seed-players", action="store_true")
+    ap.add_argument("--verbose", action="store_true", help="keep bot stdout/stderr")
+    ap.add_argument("--json", dest="json_out")
+    args = ap.parse_args(argv)
+
+    # Must happen before utils.storage is imported (it reads STATS_FILE at import)
+    os.environ["STATS_FILE"] = args.stats_file or os.path.join(
+        tempfile.mkdtemp(prefix="brett-loadsim-"), "stats.json")
+
+    sink = io.StringIO()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.ExitStack()
+    with quiet as stack:
+        if stack is not None:
+            stack.enter_context(contextlib.redirect_stdout(sink))
+            stack.enter_context(contextlib.redirect_stderr(sink))
+        result = asyncio.run(simulate(args))
+
+    print(json.dumps(result, indent=2))
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
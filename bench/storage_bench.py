@@ -0,0 +1,413 @@
+# bench/storage_bench.py
+"""
+Reproducible benchmarks for the storage layer and the cog hot paths.
+
+Usage (from the repo root):
+    python -m bench.storage_bench                       # 1k + 100k, all workloads
+    python -m bench.storage_bench --sizes 1k,100k,1m
+    python -m bench.storage_bench --save-baseline       # refresh bench/baseline.json
+    python -m bench.storage_bench --check               # exit 1 on regression
+
+Every (size, workload) case runs in its own interpreter so peak RSS and
+bytes written are attributable to that case alone. Store saves are batched
+behind the journal, so each case runs the scheduler's flush between ops
+(every STORE_FLUSH_SECS, inside the timing) and once at the end.
+
+The classic workloads keep every user hot (STORE_COLD_DAYS=0). `tiered`
+demotes the whole synthetic store first (untimed) and then rolls for a pool
+of ACTIVE_USERS, so its numbers should barely move between 1k and 100k.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+WORKLOADS = ("single", "burst", "mixed", "cogs", "tiered")
+ACTIVE_USERS = 500
+
+# A case fails the check when it is this much worse than baseline
+DEFAULT_TOLERANCE = 0.25
+BYTES_TOLERANCE = 0.10
+
+
+# ---- measurement helpers ----
+def _wchar() -> int | None:
+    """Bytes this process has written (Linux /proc), or None if unavailable."""
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    idx = min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))
+    return s[idx]
+
+
+def _summarize(case: str, latencies: List[float], wall: float,
+               written: int | None) -> Dict[str, Any]:
+    ops = len(latencies)
+    return {
+        "case": case,
+        "ops": ops,
+        "throughput": round(ops / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "bytes_written": written,
+        "bytes_per_op": round(written / ops) if written is not None and ops else None,
+    }
+
+
+# ---- workloads (run inside the child process) ----
+class _Flusher:
+    """The bot's scheduled storage.flush(), run between ops when it is due."""
+
+    def __init__(self):
+        from utils import storage
+        self.flush, self.every = storage.flush, storage.STORE_FLUSH_SECS
+        self.due = time.perf_counter() + self.every
+
+    def __call__(self) -> None:
+        if time.perf_counter() >= self.due:
+            self.flush()
+            self.due = time.perf_counter() + self.every
+
+
+def _timed_loop(ops: int, max_seconds: float, fn: Callable[[int], None]) -> List[float]:
+    lat: List[float] = []
+    flusher = _Flusher()
+    deadline = time.perf_counter() + max_seconds
+    for i in range(ops):
+        t0 = time.perf_counter()
+        fn(i)
+        flusher()
+        lat.append(time.perf_counter() - t0)
+        if t0 > deadline:
+            break
+    return lat
+
+
+def _run_single(ctx: Dict[str, Any]) -> List[float]:
+    from utils import storage
+    rnd, users, outcomes = ctx["rnd"], ctx["users"], ctx["outcomes"]
+
+    def op(_: int) -> None:
+        storage.record_roll(ctx["guild_id"], rnd.choice(users), rnd.choice(outcomes), int(time.time()))
+
+    return _timed_loop(ctx["ops"], ctx["max_seconds"], op)
+
+
+def _run_mixed(ctx: Dict[str, Any]) -> List[float]:
+    from utils import brettventures, storage
+    rnd, users, outcomes = ctx["rnd"], ctx["users"], ctx["outcomes"]
+    adventurers = ctx["adventurers"]
+
+    def op(_: int) -> None:
+        r = rnd.random()
+        if r < 0.40:
+            storage.load_stats(outcomes)
+        elif r < 0.70:
+            brettventures.bv_get_player(rnd.choice(adventurers))
+        elif r < 0.90:
+            storage.record_roll(ctx["guild_id"], rnd.choice(users), rnd.choice(outcomes), int(time.time()))
+        else:
+            brettventures.bv_add_xp(rnd.choice(adventurers), 1)
+
+    return _timed_loop(ctx["ops"], ctx["max_seconds"], op)
+
+
+def _setup_tiered(ctx: Dict[str, Any]) -> None:
+    """Demote everyone (the synthetic users have never been active) and save the small hot store."""
+    from utils import storage
+    storage.load_stats(ctx["outcomes"])
+    while storage.flush():   # SWEEP_MAX users per namespace each time
+        pass
+    ctx["users"] = ctx["users"][:ACTIVE_USERS]
+
+
+def _make_cogs():
+    from bench.fakes import FakeBot
+    from cogs.core_games import CoreGames
+    from cogs.stats import Stats
+    from cogs.brettventures import Brettventures
+
+    bot = FakeBot()
+    return bot, CoreGames(bot), Stats(bot), Brettventures(bot)
+
+
+def _run_burst(ctx: Dict[str, Any]) -> List[float]:
+    """
+    Fire `ops` concurrent !brett invocations from a small set of hot users and
+    measure each one from burst start to completion (queueing included).
+    """
+    from bench.fakes import FakeContext, FakeGuild, FakeUser
+
+    bot, core, _, _ = _make_cogs()
+    guild = FakeGuild(ctx["guild_id"])
+    hot = [FakeUser(uid) for uid in ctx["users"][:25]]
+    for m in hot:
+        guild.add_member(m)
+
+    async def burst() -> List[float]:
+        lat: List[float] = []
+        flusher = _Flusher()
+        start = time.perf_counter()
+        deadline = start + ctx["max_seconds"]
+
+        async def one(i: int) -> None:
+            if time.perf_counter() > deadline:
+                return
+            c = FakeContext(bot, hot[i % len(hot)], guild)
+            await core.brett_cmd.callback(core, c)
+            flusher()
+            lat.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(i) for i in range(ctx["ops"])))
+        return lat
+
+    return asyncio.run(burst())
+
+
+def _run_cogs(ctx: Dict[str, Any]) -> List[float]:
+    """Round-robin the read and write handlers users hit most."""
+    from bench.fakes import FakeContext, FakeGuild, FakeUser
+
+    from cogs.leaderboards import Leaderboards
+
+    bot, core, stats, bv = _make_cogs()
+    boards = Leaderboards(bot)
+    guild = FakeGuild(ctx["guild_id"])
+    rnd = ctx["rnd"]
+    members = [FakeUser(uid) for uid in rnd.sample(ctx["users"], min(200, len(ctx["users"])))]
+    adventurers = [FakeUser(uid) for uid in ctx["adventurers"][:200]]
+    for m in members + adventurers:
+        guild.add_member(m)
+
+    handlers = [
+        (core, core.brett_cmd, members),
+        (stats, stats.stats_cmd, members),
+        (stats, stats.chart_cmd, members),
+        (boards, boards.leaderboard_cmd, members),
+        (bv, bv.adventure_explore, adventurers),
+        (bv, bv.adventure_stats, adventurers),
+    ]
+
+    async def run() -> List[float]:
+        lat: List[float] = []
+        flusher = _Flusher()
+        deadline = time.perf_counter() + ctx["max_seconds"]
+        for i in range(ctx["ops"]):
+            cog, cmd, pool = handlers[i % len(handlers)]
+            c = FakeContext(bot, rnd.choice(pool), guild)
+            t0 = time.perf_counter()
+            await cmd.callback(cog, c)
+            flusher()
+            lat.append(time.perf_counter() - t0)
+            if t0 > deadline:
+                break
+        return lat
+
+    return asyncio.run(run())
+
+
+RUNNERS = {
+    "single": _run_single,
+    "burst": _run_burst,
+    "mixed": _run_mixed,
+    "cogs": _run_cogs,
+    "tiered": _run_single,
+}
+SETUPS = {"tiered": _setup_tiered}
+
+
+def run_case(size_label: str, workload: str, dataset: str, ops: int,
+             max_seconds: float, seed: int) -> Dict[str, Any]:
+    """Child-process entry: copy the dataset, run one workload, summarize."""
+    from bench.datasets import adventurer_ids, parse_size, user_id
+
+    work = os.path.join(tempfile.mkdtemp(prefix="brett-bench-"), "stats.json")
+    shutil.copyfile(dataset, work)
+
+    from utils import storage
+    from constants import BRETT_RESPONSES
+    storage.STATS_FILE = work
+
+    n = parse_size(size_label)
+    rnd = random.Random(seed)
+    ctx = {
+        "rnd": rnd,
+        "ops": ops,
+        "max_seconds": max_seconds,
+        "guild_id": 4242,
+        "outcomes": list(BRETT_RESPONSES),
+        "users": [user_id(i) for i in rnd.sample(range(n), min(n, 5000))],
+        "adventurers": adventurer_ids(n)[:5000],
+    }
+
+    if workload in SETUPS:
+        SETUPS[workload](ctx)
+    w0 = _wchar()
+    t0 = time.perf_counter()
+    latencies = RUNNERS[workload](ctx)
+    storage.flush()
+    wall = time.perf_counter() - t0
+    w1 = _wchar()
+
+    shutil.rmtree(os.path.dirname(work), ignore_errors=True)
+    written = (w1 - w0) if (w0 is not None and w1 is not None) else None
+    return _summarize(f"{size_label}/{workload}", latencies, wall, written)
+
+
+# ---- parent: orchestration, reporting, baseline ----
+def _spawn_case(size_label: str, workload: str, dataset: str, args) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, "-m", "bench.storage_bench",
+        "--case", f"{size_label}:{workload}",
+        "--dataset", dataset,
+        "--ops", str(args.ops),
+        "--max-seconds", str(args.max_seconds),
+        "--seed", str(args.seed),
+    ]
+    env = dict(os.environ)
+    if workload != "tiered":
+        env["STORE_COLD_DAYS"] = "0"
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"case {size_label}/{workload} failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+            tolerance: float) -> List[str]:
+    """Return human-readable regression lines (empty if none)."""
+    problems: List[str] = []
+    for r in results:
+        b = baseline.get(r["case"])
+        if not b:
+            continue
+        if b["throughput"] and r["throughput"] < b["throughput"] * (1 - tolerance):
+            problems.append(f"{r['case']}: throughput {r['throughput']} < baseline {b['throughput']}")
+        if b["p99_ms"] and r["p99_ms"] > b["p99_ms"] * (1 + tolerance):
+            problems.append(f"{r['case']}: p99 {r['p99_ms']}ms > baseline {b['p99_ms']}ms")
+        if b.get("bytes_per_op") and r.get("bytes_per_op") is not None \
+                and r["bytes_per_op"] > b["bytes_per_op"] * (1 + BYTES_TOLERANCE):
+            problems.append(f"{r['case']}: bytes/op {r['bytes_per_op']} > baseline {b['bytes_per_op']}")
+    return problems
+
+
+def _print_table(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    hdr = f"{'case':<14} {'ops':>6} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'rss MB':>8} {'bytes/op':>12} {'vs base':>8}"
+    print(hdr)
+    print("-" * len(hdr))
+    for r in results:
+        b = baseline.get(r["case"])
+        delta = ""
+        if b and b.get("throughput"):
+            delta = f"{(r['throughput'] / b['throughput'] - 1) * 100:+.0f}%"
+        bpo = r["bytes_per_op"] if r["bytes_per_op"] is not None else "n/a"
+        print(f"{r['case']:<14} {r['ops']:>6} {r['throughput']:>10} {r['p50_ms']:>10} "
+              f"{r['p99_ms']:>10} {r['peak_rss_mb']:>8} {bpo:>12} {delta:>8}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Brett Bot storage/command benchmarks")
+    ap.add_argument("--sizes", default="1k,100k", help="comma list of 1k,100k,1m or integers")
+    ap.add_argument("--workloads", default=",".join(WORKLOADS))
+    ap.add_argument("--ops", type=int, default=200, help="operations per case")
+    ap.add_argument("--max-seconds", type=float, default=30.0, help="time cap per case")
+    ap.add_argument("--seed", type=int, default=1234)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any case regresses")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--json", dest="json_out", help="also write raw results here")
+    # internal: single case in a child process
+    ap.add_argument("--case", help=argparse.SUPPRESS)
+    ap.add_argument("--dataset", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.case:
+        size_label, workload = args.case.split(":", 1)
+        res = run_case(size_label, workload, args.dataset, args.ops, args.max_seconds, args.seed)
+        print(json.dumps(res))
+        return 0
+
+    from bench.datasets import parse_size, write_dataset
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    workloads = [w.strip() for w in args.workloads.split(",") if w.strip()]
+    unknown = [w for w in workloads if w not in RUNNERS]
+    if unknown:
+        ap.error(f"unknown workload(s): {', '.join(unknown)}")
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results: List[Dict[str, Any]] = []
+    data_dir = tempfile.mkdtemp(prefix="brett-bench-data-")
+    try:
+        for size_label in sizes:
+            dataset = os.path.join(data_dir, f"stats_{size_label}.json")
+            nbytes = write_dataset(dataset, parse_size(size_label), args.seed)
+            print(f"[dataset] {size_label}: {nbytes / 1e6:.1f} MB", file=sys.stderr)
+            for workload in workloads:
+                results.append(_spawn_case(size_label, workload, dataset, args))
+                print(f"[done] {size_label}/{workload}", file=sys.stderr)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    _print_table(results, baseline)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        merged = dict(baseline)
+        merged.update({r["case"]: r for r in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+        print(f"[baseline] wrote {args.baseline}", file=sys.stderr)
+        return 0
+
+    problems = compare(results, baseline, args.tolerance)
+    for p in problems:
+        print(f"[REGRESSION] {p}")
+    return 1 if (problems and args.check) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,51 +1,230 @@
 # --- at top with imports ---
-import os, asyncio, traceback
+import os, asyncio, hashlib, importlib, json, time, traceback
 import discord
 from discord.ext import commands
 
-INTENTS = discord.Intents.default()
-INTENTS.message_content = True
-INTENTS.members = True
-INTENTS.presences = True
+from utils import achievements, members, outbox, prefixes, ratelimit, timeutil
 
-bot = commands.Bot(command_prefix=commands.when_mentioned_or("!"),
-                   intents=INTENTS, case_insensitive=True,
-                   help_command=None)
+# BOT_LOW_MEMORY=1: no presence intent, no member cache beyond the bot itself,
+# no member chunking at startup and a small message cache. Commands that show
+# member names resolve them on demand (utils/members.py) instead.
+LOW_MEMORY = os.getenv("BOT_LOW_MEMORY", "").strip() == "1"
+
+def client_options(low_memory=LOW_MEMORY):
+    """Intents and cache settings shared by every Bot/AutoShardedBot we build."""
+    intents = discord.Intents.default()
+    # BOT_MESSAGE_CONTENT=0: slash commands, mentions and DMs only (no privileged intent)
+    intents.message_content = os.getenv("BOT_MESSAGE_CONTENT", "1").strip() != "0"
+    intents.members = True              # still needed for on-demand member queries
+    intents.presences = not low_memory  # presences are never read
+    opts = {"intents": intents}
+    if low_memory:
+        opts["member_cache_flags"] = discord.MemberCacheFlags.none()
+        opts["chunk_guilds_at_startup"] = False
+        opts["max_messages"] = int(os.getenv("BOT_MAX_MESSAGES", "100")) or None
+    return opts
+
+_CLIENT_OPTS = client_options()
+INTENTS = _CLIENT_OPTS["intents"]
+
+# Sharding: SHARD_COUNT (+ SHARD_IDS="0,1") makes this process one shard group
+# of a larger deployment (see launcher.py); BOT_AUTOSHARD=1 lets discord.py
+# pick the shard count for a single process.
+_SHARD_COUNT = os.getenv("SHARD_COUNT", "").strip()
+_SHARD_IDS = [int(x) for x in os.getenv("SHARD_IDS", "").split(",") if x.strip()]
+
+class _BrettBot:
+    """Contexts send through the per-channel outbox (utils/outbox.py); slash commands sync on login."""
+
+    async def get_context(self, origin, /, *, cls=outbox.QueuedContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def setup_hook(self):
+        await sync_app_commands()
+
+    async def close(self):
+        # Unlocks still waiting to be announced go out while we can send
+        await achievements.drain()
+        await super().close()
+
+class Bot(_BrettBot, commands.Bot):
+    pass
+
+class AutoShardedBot(_BrettBot, commands.AutoShardedBot):
+    pass
+
+if _SHARD_COUNT or os.getenv("BOT_AUTOSHARD", "").strip() == "1":
+    bot = AutoShardedBot(command_prefix=prefixes.command_prefix,
+                         case_insensitive=True,
+                         help_command=None, **_CLIENT_OPTS,
+                         shard_count=int(_SHARD_COUNT) if _SHARD_COUNT else None,
+                         shard_ids=_SHARD_IDS or None)
+else:
+    bot = Bot(command_prefix=prefixes.command_prefix,
+              case_insensitive=True,
+              help_command=None, **_CLIENT_OPTS)
+
+# Loaded at startup, concurrently
+EXTENSIONS = ("cogs.stats", "cogs.core_games", "cogs.brettventures", "cogs.economy",
+              "cogs.fishing", "cogs.quests", "cogs.profile",
+              "cogs.leaderboards", "cogs.battles")
+
+# Rarely used cogs: only a placeholder command is registered at startup and the
+# real extension is loaded the first time one of its commands is invoked.
+# Set BOT_EAGER_EXTENSIONS=1 to load everything up front instead.
+DEFERRED_EXTENSIONS = {
+    "cogs.help": ("help",),
+    "cogs.admin": ("prefix", "jobs", "grant"),
+}
+
+# ext -> {"import_ms": ..., "setup_ms": ...}
+EXT_TIMINGS = {}
+_prewarm_task = None
+_scheduler_task = None
+
+@bot.before_invoke
+async def before_invoke(ctx):
+    # Command rate limits (@limit in the cogs, plus RATE_LIMIT_GUILD/RATE_LIMIT_GLOBAL)
+    # are enforced here rather than in checks, so !help's can_run doesn't spend them.
+    if ctx.command.extras.get("deferred"):
+        return  # the placeholder re-dispatches through bot.invoke, which charges the real command
+    await ratelimit.before_invoke(ctx)
+    await outbox.defer_bulk(ctx)
 
 @bot.command()
 async def ping(ctx):  # sanity check that bot base is alive
     await ctx.send("pong")
 
+async def _load_one(ext):
+    try:
+        # Import in a worker thread so module-level work (and the shared
+        # imports it pulls in) overlaps with the other extensions.
+        t0 = time.perf_counter()
+        await asyncio.to_thread(importlib.import_module, ext)
+        t1 = time.perf_counter()
+        await bot.load_extension(ext)
+        t2 = time.perf_counter()
+        EXT_TIMINGS[ext] = {"import_ms": round((t1 - t0) * 1000, 1),
+                            "setup_ms": round((t2 - t1) * 1000, 1)}
+        print(f"[EXT OK] {ext} (import {EXT_TIMINGS[ext]['import_ms']}ms, "
+              f"setup {EXT_TIMINGS[ext]['setup_ms']}ms)")
+    except Exception as e:
+        print(f"[EXT LOAD ERROR] {ext}: {e}")
+        traceback.print_exc()
+
+def _register_deferred(ext, names):
+    """Placeholder commands that load `ext` on first use, then re-dispatch."""
+    async def _load_then_invoke(ctx, *_, **__):
+        for n in names:
+            bot.remove_command(n)
+        if ext not in bot.extensions:
+            await _load_one(ext)
+        new_ctx = await bot.get_context(ctx.message)
+        if new_ctx.command is not None:
+            await bot.invoke(new_ctx)
+
+    for name in names:
+        if bot.get_command(name) is None:
+            bot.add_command(commands.Command(_load_then_invoke, name=name, hidden=True,
+                                             extras={"deferred": ext}))
+
 async def load_extensions():
-    for ext in ("cogs.stats", "cogs.core_games", "cogs.help", "cogs.brettventures"):
-        try:
-            await bot.load_extension(ext)
-            print(f"[EXT OK] {ext}")
-        except Exception as e:
-            print(f"[EXT LOAD ERROR] {ext}: {e}")
-            traceback.print_exc()
+    eager = os.getenv("BOT_EAGER_EXTENSIONS", "").strip() == "1"
+    exts = list(EXTENSIONS) + (list(DEFERRED_EXTENSIONS) if eager else [])
+    await asyncio.gather(*(_load_one(ext) for ext in exts))
+    if not eager:
+        for ext, names in DEFERRED_EXTENSIONS.items():
+            _register_deferred(ext, names)
+            print(f"[EXT DEFERRED] {ext} -> {', '.join(names)}")
+
+async def sync_app_commands():
+    """Push the slash-command tree to Discord, but only when it changed since the last push."""
+    if os.getenv("BOT_SYNC_COMMANDS", "1").strip() == "0":
+        return
+    from utils import storage
+    tree = [c.to_dict(bot.tree) for c in bot.tree.get_commands()]
+    digest = hashlib.sha256(json.dumps([bot.application_id, tree], sort_keys=True).encode()).hexdigest()
+    path = os.path.join(os.path.dirname(storage.STATS_FILE) or ".", ".app_commands.sha256")
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read().strip() == digest:
+                print(f"[SYNC] {len(tree)} app command(s) unchanged; not syncing")
+                return
+    except OSError:
+        pass
+    try:
+        synced = await bot.tree.sync()
+    except discord.HTTPException as e:
+        print(f"[SYNC] failed, slash commands may be stale: {e}")
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(digest)
+    print(f"[SYNC] pushed {len(synced)} app command(s)")
+
+async def prewarm():
+    """Load the stats store (and the constants content pools it imports) off the event loop."""
+    from utils import storage
+    t0 = time.perf_counter()
+    await asyncio.to_thread(storage.prewarm)
+    await asyncio.to_thread(prefixes.load)
+    print(f"[PREWARM] stats store ready in {(time.perf_counter() - t0) * 1000:.0f}ms")
 
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (id={bot.user.id})")
+    if bot.shard_count:
+        print(f"[SHARDS] {getattr(bot, 'shard_ids', None) or [bot.shard_id]} of {bot.shard_count}")
     # Show how many prefix commands actually registered
     print("[COMMANDS]", sorted([c.name for c in bot.commands]))
+    if EXT_TIMINGS:
+        slowest = max(EXT_TIMINGS.items(), key=lambda kv: kv[1]["import_ms"] + kv[1]["setup_ms"])
+        print(f"[STARTUP] {len(EXT_TIMINGS)} extension(s); slowest {slowest[0]} {slowest[1]}")
     print("Type !ping")
 
+@bot.event
+async def on_message(message):
+    # Cheap reject before discord.py builds a Context: most messages are chat
+    if message.author.bot or not prefixes.could_be_command(bot, message):
+        return
+    await bot.process_commands(message)
+
 @bot.event
 async def on_command_error(ctx, error):
     # avoid double-handling CommandNotFound if you prefer
     if isinstance(error, commands.CommandNotFound):
         return
+    if isinstance(error, commands.CommandOnCooldown):
+        return await ctx.send(f"⏳ Slow down — try again in {error.retry_after:.1f}s.", delete_after=5)
     traceback.print_exception(type(error), error, error.__traceback__)
 
 async def main():
+    global _prewarm_task, _scheduler_task
     token = os.getenv("DISCORD_BOT_TOKEN", "").strip()
     if not token:
         raise SystemExit("Set DISCORD_BOT_TOKEN in the environment.")
-    async with bot:
-        await load_extensions()         # <--- MAKE SURE THIS LINE EXISTS
-        await bot.start(token)
+    from utils import charts, storage
+    try:
+        async with bot:
+            # Warm storage while extensions load
+            _prewarm_task = asyncio.create_task(prewarm())
+            sched = timeutil.SCHEDULER
+            if not storage.STORAGE_SOCKET:
+                # This process owns the store (otherwise the daemon runs its upkeep)
+                storage.schedule_jobs(sched)
+            else:
+                # Other shard processes can change a guild's prefix
+                sched.add("prefixes", prefixes.refresh, every=prefixes.REFRESH_SECS)
+            sched.add("member-names", members.expire_names, every=600, jitter=60)
+            _scheduler_task = asyncio.create_task(sched.run())
+            await load_extensions()         # <--- MAKE SURE THIS LINE EXISTS
+            # Custom prefixes have to be in place before the first message arrives
+            await _prewarm_task
+            await bot.start(token)
+    finally:
+        if not storage.STORAGE_SOCKET:
+            storage.flush()
+        charts.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,83 @@
+# cogs/admin.py
+from __future__ import annotations
+
+import discord
+from discord.ext import commands
+
+from utils import members
+from utils.brettventures import bv_grant
+from utils.prefixes import prefix_for, set_prefix
+from utils.storage import acall
+from utils.timeutil import SCHEDULER
+
+
+class Admin(commands.Cog):
+    """Server settings and bot upkeep."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="prefix")
+    @commands.guild_only()
+    async def prefix_cmd(self, ctx: commands.Context, new: str | None = None):
+        """Show this server's command prefix, or change it (Manage Server): `!prefix ?`"""
+        current = prefix_for(ctx.guild.id)
+        if new is None:
+            return await ctx.send(f"Commands here start with `{current}` (mentioning me works too).")
+        if not ctx.author.guild_permissions.manage_guild:
+            return await ctx.send("You need **Manage Server** to change the prefix.")
+        try:
+            now = await set_prefix(ctx.guild.id, None if new.lower() == "reset" else new)
+        except ValueError as e:
+            return await ctx.send(f"❌ {str(e).capitalize()}.")
+        await ctx.send(f"✅ Prefix is now `{now}` — try `{now}help`.")
+
+    @commands.command(name="jobs")
+    @commands.is_owner()
+    async def jobs_cmd(self, ctx: commands.Context):
+        """Background jobs in this process and how they're doing. Owner only."""
+        stats = SCHEDULER.stats()
+        if not stats:
+            return await ctx.send("No background jobs in this process.")
+        lines = ["⏱️ **Background jobs**"]
+        for name, s in stats.items():
+            line = (f"- `{name}`: {s['runs']} run(s), avg {s['avg_ms']:.1f}ms, max {s['max_ms']:.1f}ms, "
+                    f"next in {s['next_in']:.0f}s")
+            if s["skipped"]:
+                line += f", {s['skipped']} skipped (overlap)"
+            if s["failures"]:
+                line += f", {s['failures']} failed — last: {s['last_error']}"
+            lines.append(line)
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="grant")
+    @commands.guild_only()
+    @commands.is_owner()
+    async def grant_cmd(self, ctx: commands.Context, xp: int, gold: int, *targets: discord.Member | discord.Role):
+        """Give XP and gold to adventurers in one go: `!grant 100 50 @Raiders @bob`. Owner only."""
+        if xp < 0 or gold < 0 or not (xp or gold):
+            return await ctx.send("Usage: `!grant <xp> <gold> @member|@role ...` (amounts ≥ 0).")
+        ids = set()
+        for t in targets:
+            if isinstance(t, discord.Role):
+                try:
+                    holders = await members.role_members(ctx.guild, t)
+                except Exception as e:
+                    return await ctx.send(f"❌ Couldn't list the members of {t.name}: {e}. Name them instead.")
+                ids.update(m.id for m in holders if not m.bot)
+            else:
+                ids.add(t.id)
+        if not ids:
+            return await ctx.send("Name the members or roles to grant to.")
+        res = await acall(bv_grant, [[uid, xp, gold] for uid in sorted(ids)], "admin",
+                          key=f"grant:{ctx.message.id}")
+        line = f"🎁 Granted {xp} XP and {gold} gold to {res['players']} adventurer(s)"
+        if res["levels"]:
+            line += f"; {len(res['levels'])} levelled up"
+        if res["missing"]:
+            line += f" ({len(res['missing'])} without a character skipped)"
+        await ctx.send(line + ".")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Admin(bot))
@@ -0,0 +1,119 @@
+# cogs/battles.py
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Dict, List, Tuple
+
+import discord
+from discord.ext import commands
+
+from constants import BRETT_SCORE, OUTCOMES
+from utils import achievements
+from utils.battles import LOSS, WIN, battle_ratings, battle_stats, next_round, record_battles, seed_bracket
+from utils.locks import GUILDS
+from utils.outbox import bulk_output
+from utils.ratelimit import limit
+from utils.storage import acall
+
+TOURNEY_MIN = 3
+TOURNEY_MAX = 32
+TOURNEY_REROLLS = 5             # tied duels are re-rolled, then the higher rating advances
+ROUND_PAUSE_SECS = 1.5
+
+ROUND_NAMES = {2: "Final", 4: "Semi-finals", 8: "Quarter-finals"}
+
+
+def _duel(a: int, b: int, ratings: Dict[str, float]) -> Tuple[int, str]:
+    """(winner, play-by-play) for one knockout duel; never a tie."""
+    for _ in range(TOURNEY_REROLLS):
+        oa, ob = random.choice(OUTCOMES), random.choice(OUTCOMES)
+        sa, sb = BRETT_SCORE.get(oa, 0), BRETT_SCORE.get(ob, 0)
+        if sa != sb:
+            return (a if sa > sb else b), f"**{oa}** vs **{ob}**"
+    winner = a if ratings.get(str(a), 0) >= ratings.get(str(b), 0) else b
+    return winner, "tied every roll — the higher rating goes through"
+
+
+class Battles(commands.Cog):
+    """Brett Battle records, ratings and tournaments."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="battlestats", aliases=["record", "elo"])
+    async def battlestats_cmd(self, ctx: commands.Context, member: discord.Member | None = None):
+        """Your battle record and rating; name someone to see your head-to-head."""
+        target = member or ctx.author
+        vs = ctx.author.id if target.id != ctx.author.id else None
+        st = await acall(battle_stats, target.id, vs)
+        if not st:
+            return await ctx.send(f"{target.display_name} hasn't battled yet. Try `!brettbattle @someone`.")
+        games = st["w"] + st["l"] + st["t"]
+        lines = [f"⚔️ **{target.display_name}** — {st['w']}W / {st['l']}L / {st['t']}T over {games} battle(s)",
+                 f"📈 Rating **{round(st['elo'])}**" + (f" • #{st['rank']} of {st['ranked']:,}" if st["rank"] else "")]
+        if vs is not None:
+            theirs, yours, ties = st["h2h"]
+            lines.append(f"🤜 Head-to-head vs you: {theirs}–{yours}" + (f" ({ties} tie(s))" if ties else ""))
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="tournament", aliases=["bracket", "tourney"])
+    @bulk_output
+    @commands.guild_only()
+    @limit(1, 30, scope="channel")
+    async def tournament_cmd(self, ctx: commands.Context, *members: discord.Member):
+        """Knockout bracket: `!tournament @a @b @c …` (you're entered too)."""
+        entrants = list(dict.fromkeys([ctx.author.id] + [m.id for m in members if not m.bot]))
+        if not TOURNEY_MIN <= len(entrants) <= TOURNEY_MAX:
+            return await ctx.send(f"Tournaments need {TOURNEY_MIN}–{TOURNEY_MAX} players (mention them).")
+        # One bracket at a time per server; a second one queues behind it
+        if GUILDS.get(ctx.guild.id).locked():
+            await ctx.send("⏳ Another tournament is running here — yours starts when it's done.")
+        async with GUILDS.hold(ctx.guild.id):
+            await self._run_tournament(ctx, entrants, members)
+
+    async def _run_tournament(self, ctx: commands.Context, entrants: List[int], members):
+        names = {ctx.author.id: ctx.author.display_name}
+        names.update({m.id: m.display_name for m in members})
+        ratings = await acall(battle_ratings, entrants)
+
+        slots = seed_bracket(entrants, lambda u: ratings[str(u)])
+        byes = [s[0] for s in slots if len(s) == 1]
+        intro = f"🏟️ **Brett Tournament** — {len(entrants)} players"
+        if byes:
+            intro += f"\nByes (top rated): {', '.join(names[u] for u in byes)}"
+        await ctx.send(intro)
+
+        while True:
+            size = 2 * len(slots)   # bracket slots; a bye fills two
+            lines = [f"**{ROUND_NAMES.get(size, f'Round of {size}')}**"]
+            results, field = [], []
+            for slot in slots:
+                if len(slot) == 1:
+                    field.append(slot[0])
+                    continue
+                a, b = slot
+                w, how = _duel(a, b, ratings)
+                field.append(w)
+                results.append([a, b, WIN if w == a else LOSS])
+                lines.append(f"• {names[a]} vs {names[b]}: {how} → 🏆 **{names[w]}**")
+            # the whole round is one storage write
+            unlocked = []
+            for rec in await acall(record_battles, results):
+                ratings[str(rec["a"])], ratings[str(rec["b"])] = rec["elo_a"][1], rec["elo_b"][1]
+                unlocked += rec.get("unlocked", ())
+            await ctx.send("\n".join(lines))
+            for uid, ach in unlocked:
+                achievements.announce(ctx, uid, [ach])
+
+            if len(field) == 1:
+                break
+            slots = next_round(field)   # winners keep their slot order
+            await asyncio.sleep(ROUND_PAUSE_SECS)
+
+        champ = field[0]
+        await ctx.send(f"👑 **{names[champ]}** wins the tournament! (rating {round(ratings[str(champ)])})")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Battles(bot))
@@ -2,23 +2,30 @@
 from __future__ import annotations
 
 import discord
+from discord import app_commands
 from discord.ext import commands
-from utils.storage import bv_next_stamina_eta
+from utils.storage import VersionConflict, acall
 
-from utils.storage import (
+from utils.brettventures import (
     bv_get_or_create_player,
     bv_get_player,
     bv_upsert_player,
-    bv_add_xp,
+    bv_explore,
+    bv_next_stamina_eta,
 )
-from utils.rng import roll, nudge
+from utils.economy import econ_balance
+from utils import achievements
+from utils.combat import MONSTERS, resolve
+from utils.leveling import CURVE
+from utils.locks import USERS
+from utils.rng import Stream, nudge
 
 # --- Tunables (quick to tweak; we can move to balance.py later) ----------------
-XP_PER_LEVEL_BASE = 10          # used in storage’s level-up curve (10 * level)
 STAMINA_COST_EXPLORE = 1
 STAMINA_REST_AMOUNT = 3         # per rest command
 TRAIN_COST_STAMINA = 2
 TRAIN_GAIN = {"pow": 1, "smt": 1}
+WRITE_RETRIES = 3               # re-read and retry when the player changed under us
 
 # Encounter table: (threshold, text, xp, gold, hp_delta, pow_d, smt_d)
 ENCOUNTERS = [
@@ -83,6 +90,56 @@ ENCOUNTERS = [
     (100,"Mini-boss! A Greedy Goblin drops a heavy purse and a trinket.", 8, 40, -3, 1, 1),
 ]
 
+# Encounters (by threshold) that are real fights (utils/combat.py): the row's
+# rewards are for winning, and the HP lost comes from the fight
+FIGHTS = {
+    42: "slime", 44: "goose", 62: "goblin_scout", 72: "rival", 76: "hornets",
+    82: "highwayman", 88: "boar", 96: "rival", 98: "shade", 100: "greedy_goblin",
+}
+
+
+def _encounter(p: dict, seed: int) -> tuple:
+    """
+    Roll an explore encounter and apply its stat effects to `p` (gold and XP
+    are the caller's). The roll and any fight come from one RNG stream seeded
+    by `seed`, so a retried write replays the same encounter.
+    """
+    rng = Stream(seed)
+    p["stamina"] -= STAMINA_COST_EXPLORE
+    # Roll with a small bump from smt + luck (soft advantage)
+    r = nudge(rng.roll(100), bonus=min(10, p["smt"] + p["luck"]))
+    row, text, xp, gold, hp_delta, pow_d, smt_d = None, None, 0, 0, 0, 0, 0
+    for t, t_text, t_xp, t_gold, t_hp, t_pow, t_smt in ENCOUNTERS:
+        if r <= t:
+            row, text, xp, gold, hp_delta, pow_d, smt_d = t, t_text, t_xp, t_gold, t_hp, t_pow, t_smt
+            break
+    fight, monster = None, MONSTERS.get(FIGHTS.get(row))
+    if monster is not None:
+        fight = resolve(p, monster.scaled(p["level"]), rng)
+        hp_delta = fight.hp - p["hp"]
+        if fight.won is False:
+            text = f"The {monster.name} gets the better of you. You limp home."
+            xp, gold, pow_d, smt_d = 1, 0, 0, 0
+        elif fight.won is None:
+            text = f"You and the {monster.name} fight to a standstill, then both back off."
+            xp, gold, pow_d, smt_d = xp // 2, 0, 0, 0
+    hp = max(1, min(p["hp_max"], p["hp"] + hp_delta))
+    hp_delta, p["hp"] = hp - p["hp"], hp
+    p["pow"] += pow_d
+    p["smt"] += smt_d
+    return r, text, xp, gold, hp_delta, pow_d, smt_d, (monster, fight)
+
+
+def _fight_line(monster, fight) -> str:
+    how = {True: "won", False: "lost", None: "drew"}[fight.won]
+    line = f"vs **{monster.name}**: {how} in {fight.turns} turn(s) • dealt {fight.dealt}, took {fight.taken}"
+    if fight.crits:
+        line += f" • {fight.crits} crit(s)"
+    if fight.dodges:
+        line += f" • {fight.dodges} dodge(s)"
+    return line
+
+
 def _format_bar(value: int, maximum: int, width: int = 12) -> str:
     filled = int(round(width * max(0, min(1, value / float(maximum or 1)))))
     return "█" * filled + "░" * (width - filled)
@@ -94,22 +151,25 @@ class Brettventures(commands.Cog):
         self.bot = bot
 
     # Group root
-    @commands.group(name="adventure", invoke_without_command=True)
+    @commands.hybrid_group(name="adventure", invoke_without_command=True, fallback="help")
     @commands.guild_only()
     async def adventure(self, ctx: commands.Context):
+        """Brettventures: a tiny RPG."""
         await ctx.send("Use `adventure start | stats | explore | rest | train`")
 
     # Create/attach character
     @adventure.command(name="start")
     async def adventure_start(self, ctx: commands.Context):
-        p = bv_get_or_create_player(ctx.author.id, ctx.author.display_name)
+        """Create your character."""
+        p = await acall(bv_get_or_create_player, ctx.author.id, ctx.author.display_name)
         await ctx.send(f"Welcome to **Brettventures**, {p['name']}! Type `adventure stats`.")
 
     # Show stats
     @adventure.command(name="stats")
     async def adventure_stats(self, ctx: commands.Context, member: discord.Member | None = None):
+        """Someone's character sheet."""
         target = member or ctx.author
-        p = bv_get_player(target.id)
+        p = await acall(bv_get_player, target.id)
         if not p:
             return await ctx.send("No character yet. Use `adventure start`.")
 
@@ -124,10 +184,10 @@ class Brettventures(commands.Cog):
         embed.add_field(name="POW", value=p["pow"], inline=True)
         embed.add_field(name="SMT", value=p["smt"], inline=True)
         embed.add_field(name="LCK", value=p["luck"], inline=True)
-        embed.add_field(name="Gold", value=p["gold"], inline=True)
+        embed.add_field(name="Gold", value=await acall(econ_balance, target.id), inline=True)
 
         # footer: XP + stamina ETA
-        eta = bv_next_stamina_eta(target.id)  # None if full, 0 if ready now, >0 seconds otherwise
+        eta = await acall(bv_next_stamina_eta, target.id)  # None if full, 0 if ready now, >0 seconds otherwise
         if eta is None:
             eta_text = "Full"
         elif eta == 0:
@@ -139,7 +199,7 @@ class Brettventures(commands.Cog):
 
         embed.set_footer(
             text=(
-                f"XP: {p['xp']}/{XP_PER_LEVEL_BASE * p['level']} • "
+                f"XP: {p['xp']}/{CURVE.to_next(p['level'])} • "
                 f"STA: {p['stamina']}/{p['stamina_max']} ({eta_text}) • "
                 "Brettventures α"
             )
@@ -150,38 +210,32 @@ class Brettventures(commands.Cog):
     # Explore once: spend stamina, roll outcome
     @adventure.command(name="explore")
     async def adventure_explore(self, ctx: commands.Context):
-        p = bv_get_player(ctx.author.id)
-        if not p:
-            return await ctx.send("No character yet. Use `adventure start`.")
-        if p["stamina"] < STAMINA_COST_EXPLORE:
-            return await ctx.send("You’re too tired to explore. Try `adventure rest`.")
-
-        # Spend stamina
-        p["stamina"] -= STAMINA_COST_EXPLORE
-
-        # Roll with a small bump from smt + luck (soft advantage)
-        r = nudge(roll(100), bonus=min(10, p["smt"] + p["luck"]))
-        # Pick encounter
-        text, xp, gold, hp_delta, pow_d, smt_d = None, 0, 0, 0, 0, 0
-        for t, t_text, t_xp, t_gold, t_hp, t_pow, t_smt in ENCOUNTERS:
-            if r <= t:
-                text, xp, gold, hp_delta, pow_d, smt_d = t_text, t_xp, t_gold, t_hp, t_pow, t_smt
-                break
-
-        # Apply encounter effects
-        p["gold"] += gold
-        p["hp"] = max(1, min(p["hp_max"], p["hp"] + hp_delta))
-        p["pow"] += pow_d
-        p["smt"] += smt_d
-        bv_upsert_player(p)
-
-        # XP + possible level up handled in storage helper
-        p = bv_add_xp(p["user_id"], xp)
+        """Spend stamina on a random encounter."""
+        async with USERS.hold(ctx.author.id):
+            for _ in range(WRITE_RETRIES):
+                p = await acall(bv_get_player, ctx.author.id)
+                if not p:
+                    return await ctx.send("No character yet. Use `adventure start`.")
+                if p["stamina"] < STAMINA_COST_EXPLORE:
+                    return await ctx.send("You’re too tired to explore. Try `adventure rest`.")
+                level = p["level"]
+                r, text, xp, gold, hp_delta, pow_d, smt_d, (monster, fight) = _encounter(p, ctx.message.id)
+                try:
+                    # Player, XP + level ups, gold (via the economy ledger) and quests in one write
+                    res = await acall(bv_explore, p, xp, gold, f"explore:{ctx.message.id}")
+                    break
+                except VersionConflict:
+                    continue
+            else:
+                return await ctx.send("Your character is busy elsewhere — try again in a moment.")
+        p, finished = res["player"], res["quests"]
 
         # Feedback
         embed = discord.Embed(title="Brettventures — Explore")
         embed.description = text or "Nothing much happens, but the air smells like adventure."
         embed.add_field(name="Roll", value=str(r), inline=True)
+        if fight is not None:
+            embed.add_field(name="Fight", value=_fight_line(monster, fight), inline=False)
         if xp:   embed.add_field(name="XP", value=f"+{xp}", inline=True)
         if gold: embed.add_field(name="Gold", value=f"+{gold}", inline=True)
         if hp_delta:
@@ -189,16 +243,20 @@ class Brettventures(commands.Cog):
             embed.add_field(name="HP", value=f"{sign}{hp_delta}", inline=True)
         if pow_d: embed.add_field(name="POW", value=f"+{pow_d}", inline=True)
         if smt_d: embed.add_field(name="SMT", value=f"+{smt_d}", inline=True)
+        for name in finished:
+            embed.add_field(name="Quest complete", value=f"✅ {name}", inline=False)
         embed.set_footer(text=f"Lv {p['level']} • HP {p['hp']}/{p['hp_max']} • STA {p['stamina']}/{p['stamina_max']}")
         await ctx.send(embed=embed)
+        achievements.announce(ctx, ctx.author.id, [a.id for a in achievements.crossed("level", level, p["level"])])
 
     # Rest: regain stamina
     @adventure.command(name="rest")
     async def adventure_rest(self, ctx: commands.Context):
-        p = bv_get_player(ctx.author.id)
+        """Check your stamina and when the next point comes back."""
+        p = await acall(bv_get_player, ctx.author.id)
         if not p:
             return await ctx.send("No character yet. Use `adventure start`.")
-        eta = bv_next_stamina_eta(ctx.author.id)
+        eta = await acall(bv_next_stamina_eta, ctx.author.id)
         if eta is None:
             return await ctx.send(f"Your stamina is full: {p['stamina']}/{p['stamina_max']}.")
 
@@ -213,21 +271,31 @@ class Brettventures(commands.Cog):
 
     # Train: spend stamina to raise POW or SMT
     @adventure.command(name="train")
+    @app_commands.choices(stat=[app_commands.Choice(name=s.upper(), value=s) for s in TRAIN_GAIN])
     async def adventure_train(self, ctx: commands.Context, stat: str | None = None):
-        p = bv_get_player(ctx.author.id)
-        if not p:
-            return await ctx.send("No character yet. Use `adventure start`.")
-        if p["stamina"] < TRAIN_COST_STAMINA:
-            return await ctx.send(f"Training costs {TRAIN_COST_STAMINA} stamina. Try `adventure rest`.")
+        """Spend stamina to raise POW or SMT."""
+        async with USERS.hold(ctx.author.id):
+            for _ in range(WRITE_RETRIES):
+                p = await acall(bv_get_player, ctx.author.id)
+                if not p:
+                    return await ctx.send("No character yet. Use `adventure start`.")
+                if p["stamina"] < TRAIN_COST_STAMINA:
+                    return await ctx.send(f"Training costs {TRAIN_COST_STAMINA} stamina. Try `adventure rest`.")
 
-        # pick stat (default toggles POW/SMT by level parity to spread gains)
-        s = (stat or ("pow" if (p["level"] % 2 == 1) else "smt")).lower()
-        if s not in TRAIN_GAIN:
-            return await ctx.send("Choose a stat to train: `pow` or `smt`.")
+                # pick stat (default toggles POW/SMT by level parity to spread gains)
+                s = (stat or ("pow" if (p["level"] % 2 == 1) else "smt")).lower()
+                if s not in TRAIN_GAIN:
+                    return await ctx.send("Choose a stat to train: `pow` or `smt`.")
 
-        p["stamina"] -= TRAIN_COST_STAMINA
-        p[s] += TRAIN_GAIN[s]
-        bv_upsert_player(p)
+                p["stamina"] -= TRAIN_COST_STAMINA
+                p[s] += TRAIN_GAIN[s]
+                try:
+                    await acall(bv_upsert_player, p)
+                    break
+                except VersionConflict:
+                    continue
+            else:
+                return await ctx.send("Your character is busy elsewhere — try again in a moment.")
         await ctx.send(f"You train **{s.upper()}** and feel stronger. "
                        f"{s.upper()} +{TRAIN_GAIN[s]} • STA {p['stamina']}/{p['stamina_max']}")
 
@@ -4,6 +4,9 @@ import time
 import discord
 from discord.ext import commands
 
+from utils import achievements
+from utils.ratelimit import limit
+
 
 # ---------- helpers ----------
 def _target_member(ctx: commands.Context,
@@ -18,26 +21,40 @@ def _target_member(ctx: commands.Context,
     return ctx.author
 
 
-def _record_roll_safe(gid: int, uid: int, outcome: str) -> None:
-    """Try new storage signature, then legacy; never crash commands."""
+async def _record_roll_safe(gid: int, uid: int, outcome: str) -> list:
+    """Try new storage signature, then legacy; never crash commands. Returns unlocked achievement ids."""
     try:
         from utils import storage as _storage  # lazy import
     except Exception:
-        return
+        return []
     ts = int(time.time())
     try:
         # Preferred: record_roll(gid, uid, outcome, ts)
-        _storage.record_roll(gid, uid, outcome, ts)  # type: ignore[attr-defined]
-        return
+        return await _storage.acall(_storage.record_roll, gid, uid, outcome, ts) or []  # type: ignore[attr-defined]
     except TypeError:
         pass
     except Exception:
         pass
     try:
         # Legacy: record_roll(uid, outcome)
-        _storage.record_roll(uid, outcome)  # type: ignore[misc]
+        return await _storage.acall(_storage.record_roll, uid, outcome) or []  # type: ignore[misc]
     except Exception:
-        pass
+        return []
+
+
+async def _record_battle_safe(a: int, b: int, result: float) -> dict | None:
+    """Persist one battle (result from a's side); None if storage is unavailable."""
+    try:
+        from utils import battles, storage as _storage  # lazy import
+        return (await _storage.acall(battles.record_battles, [[a, b, result]]))[0]
+    except Exception:
+        return None
+
+
+def _elo_change(before_after) -> str:
+    before, after = before_after
+    delta = round(after - before)
+    return f"{round(after)} ({'+' if delta >= 0 else ''}{delta})"
 
 
 class CoreGames(commands.Cog):
@@ -47,29 +64,33 @@ class CoreGames(commands.Cog):
         self.bot = bot
 
     # ---------- simple randomizers ----------
-    @commands.command(name="brett")
-    @commands.cooldown(1, 2, commands.BucketType.user)
+    @commands.hybrid_command(name="brett")
+    @limit(1, 2)
     async def brett_cmd(self, ctx: commands.Context) -> None:
+        """Roll the Brett die."""
         from constants import BRETT_RESPONSES
         # choose the line ONCE, use it for both display and stats
         line = random.choice(BRETT_RESPONSES)
-        _record_roll_safe(ctx.guild.id, ctx.author.id, line)  # record the same key stats will read
+        unlocked = await _record_roll_safe(ctx.guild.id, ctx.author.id, line)  # record the same key stats will read
         await ctx.send(line)
+        achievements.announce(ctx, ctx.author.id, unlocked)
 
-    @commands.command(name="doublebrett")
-    @commands.cooldown(1, 3, commands.BucketType.user)
+    @commands.hybrid_command(name="doublebrett")
+    @limit(1, 3)
     async def doublebrett_cmd(self, ctx: commands.Context) -> None:
+        """Roll the Brett die twice."""
         from constants import BRETT_RESPONSES
         a = random.choice(BRETT_RESPONSES)
         b = random.choice(BRETT_RESPONSES)
         # record both lines
-        _record_roll_safe(ctx.guild.id, ctx.author.id, a)
-        _record_roll_safe(ctx.guild.id, ctx.author.id, b)
+        unlocked = await _record_roll_safe(ctx.guild.id, ctx.author.id, a)
+        unlocked += await _record_roll_safe(ctx.guild.id, ctx.author.id, b)
         await ctx.send(f"{a}\n{b}")
+        achievements.announce(ctx, ctx.author.id, unlocked)
 
 
-    @commands.command(name="8brett", aliases=("8ball", "brett8"))
-    @commands.cooldown(1, 2, commands.BucketType.user)
+    @commands.hybrid_command(name="8brett", aliases=("8ball", "brett8"))
+    @limit(1, 2)
     async def eight_brett_cmd(self, ctx: commands.Context, *, question: str = "") -> None:
         """Magic 8-ball style answer (no stats). Usage: !8brett <question>"""
         try:
@@ -81,14 +102,16 @@ class CoreGames(commands.Cog):
             return
         await ctx.send(random.choice(EIGHTBALL))
 
-    @commands.command(name="coin")
-    @commands.cooldown(1, 2, commands.BucketType.user)
+    @commands.hybrid_command(name="coin")
+    @limit(1, 2)
     async def coin_cmd(self, ctx: commands.Context) -> None:
+        """Flip a coin."""
         await ctx.send(random.choice(["Heads", "Tails"]))
 
-    @commands.command(name="choose")
-    @commands.cooldown(1, 2, commands.BucketType.user)
+    @commands.hybrid_command(name="choose")
+    @limit(1, 2)
     async def choose_cmd(self, ctx: commands.Context, *, options: str = "") -> None:
+        """Pick one of your options: `!choose pizza | tacos | sushi`"""
         s = options.strip()
         if not s:
             await ctx.send("Give me options, e.g. `!choose pizza | tacos | sushi`")
@@ -100,10 +123,11 @@ class CoreGames(commands.Cog):
         await ctx.send(random.choice(parts))
 
     # ---------- social fun ----------
-    @commands.command(name="insult")
-    @commands.cooldown(1, 3, commands.BucketType.user)
+    @commands.hybrid_command(name="insult")
+    @limit(1, 3)
     async def insult_cmd(self, ctx: commands.Context,
                          member: typing.Optional[discord.Member] = None) -> None:
+        """Brett roasts someone (or you)."""
         try:
             from constants import INSULTS
         except Exception:
@@ -111,10 +135,11 @@ class CoreGames(commands.Cog):
         target = _target_member(ctx, member)
         await ctx.send(f"{target.mention}, you {random.choice(INSULTS)}.")
 
-    @commands.command(name="compliment")
-    @commands.cooldown(1, 3, commands.BucketType.user)
+    @commands.hybrid_command(name="compliment")
+    @limit(1, 3)
     async def compliment_cmd(self, ctx: commands.Context,
                              member: typing.Optional[discord.Member] = None) -> None:
+        """Brett says something nice about someone."""
         try:
             from constants import COMPLIMENTS
         except Exception:
@@ -122,10 +147,11 @@ class CoreGames(commands.Cog):
         target = _target_member(ctx, member)
         await ctx.send(f"{target.mention} you {random.choice(COMPLIMENTS)} ✨")
 
-    @commands.command(name="mood")
-    @commands.cooldown(1, 3, commands.BucketType.user)
+    @commands.hybrid_command(name="mood")
+    @limit(1, 3)
     async def mood_cmd(self, ctx: commands.Context,
                        member: typing.Optional[discord.Member] = None) -> None:
+        """How someone feels today, according to Brett."""
         try:
             from constants import BRETT_MOODS
         except Exception:
@@ -151,10 +177,11 @@ class CoreGames(commands.Cog):
         await ctx.send(f"{emoji} **{target.display_name}** feels *{label}* today.")
 
     # ---------- versus ----------
-    @commands.command(name="brettbattle", aliases=("battle", "duel", "fight"))
-    @commands.cooldown(1, 5, commands.BucketType.channel)
+    @commands.hybrid_command(name="brettbattle", aliases=("battle", "duel", "fight"))
+    @limit(1, 5, scope="channel")
     async def brettbattle_cmd(self, ctx: commands.Context,
                               opponent: typing.Optional[discord.Member] = None) -> None:
+        """Roll off against someone; the result moves both ratings."""
         try:
             from constants import OUTCOMES, BRETT_SCORE
         except Exception:
@@ -171,27 +198,37 @@ class CoreGames(commands.Cog):
 
         p1, p2 = ctx.author, opponent
         o1, o2 = random.choice(OUTCOMES), random.choice(OUTCOMES)
-        _record_roll_safe(ctx.guild.id, p1.id, o1)
-        _record_roll_safe(ctx.guild.id, p2.id, o2)
+        unlocked1 = await _record_roll_safe(ctx.guild.id, p1.id, o1)
+        unlocked2 = await _record_roll_safe(ctx.guild.id, p2.id, o2)
         s1, s2 = BRETT_SCORE.get(o1, 0), BRETT_SCORE.get(o2, 0)
 
         verdict = "🤝 It’s a tie. Shit's fucked."
+        result = 0.5
         if s1 > s2:
             verdict = f"🏆 **{p1.display_name}** wins!"
+            result = 1.0
         elif s2 > s1:
             verdict = f"🏆 **{p2.display_name}** wins!"
-
-        await ctx.send(
-            "\n".join([
-                "⚔️ **Brett Battle!**",
-                f"{p1.mention} rolled **{o1}** vs {p2.mention} rolled **{o2}**",
-                verdict,
-            ])
-        )
+            result = 0.0
+
+        lines = [
+            "⚔️ **Brett Battle!**",
+            f"{p1.mention} rolled **{o1}** vs {p2.mention} rolled **{o2}**",
+            verdict,
+        ]
+        rec = await _record_battle_safe(p1.id, p2.id, result)
+        if rec:
+            lines.append(f"📈 Rating: {p1.display_name} {_elo_change(rec['elo_a'])} • "
+                         f"{p2.display_name} {_elo_change(rec['elo_b'])}")
+        await ctx.send("\n".join(lines))
+        achievements.announce(ctx, p1.id, unlocked1)
+        achievements.announce(ctx, p2.id, unlocked2)
+        for uid, ach in (rec or {}).get("unlocked", ()):
+            achievements.announce(ctx, uid, [ach])
 
     # ---------- chaos ----------
-    @commands.command(name="chaos")
-    @commands.cooldown(1, 3, commands.BucketType.user)
+    @commands.hybrid_command(name="chaos")
+    @limit(1, 3)
     async def chaos_cmd(self, ctx: commands.Context) -> None:
         """Invoke the Warp (random Chaos outcome)."""
         try:
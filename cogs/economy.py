@@ -0,0 +1,138 @@
+# cogs/economy.py
+from __future__ import annotations
+
+import time
+
+import discord
+from discord.ext import commands
+
+from utils.brettventures import bv_buy
+from utils.economy import HOUSE, econ_balance, econ_daily, econ_history, econ_transfer
+from utils.outbox import bulk_output
+from utils.ratelimit import limit
+from utils.rng import percent
+from utils.storage import acall
+
+# --- Tunables ------------------------------------------------------------------
+GAMBLE_WIN_CHANCE = 0.48        # house edge: a fair coin would be 0.5
+GAMBLE_MAX = 10_000
+PAY_MAX = 1_000_000
+
+# item -> (price, stat effects, blurb); effects are applied to the Brettventures player
+SHOP = {
+    "ration": (10, {"hp": 5}, "Restores 5 HP"),
+    "tonic": (20, {"stamina": 1}, "Restores 1 stamina"),
+    "charm": (150, {"luck": 1}, "+1 LCK, permanently"),
+}
+
+
+def _coins(n: int) -> str:
+    return f"{n:,} 🪙"
+
+
+def _reason_label(reason: str) -> str:
+    return {
+        "daily": "Daily reward",
+        "adventure:explore": "Adventure loot",
+        "migrate:bv_gold": "Brettventures gold",
+    }.get(reason, reason.replace(":", " · ").capitalize())
+
+
+class Economy(commands.Cog):
+    """Coins: balances, daily rewards, payments, gambling and the shop."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="balance", aliases=["bal", "wallet"])
+    async def balance_cmd(self, ctx: commands.Context, member: discord.Member | None = None):
+        target = member or ctx.author
+        coins = await acall(econ_balance, target.id)
+        await ctx.send(f"💰 **{target.display_name}** has {_coins(coins)}.")
+
+    @commands.command(name="daily")
+    async def daily_cmd(self, ctx: commands.Context):
+        try:
+            res = await acall(econ_daily, ctx.author.id)
+        except ValueError:
+            wait = (int(time.time()) // 86400 + 1) * 86400 - int(time.time())
+            return await ctx.send(f"⏳ You already claimed today's reward. Next one in "
+                                  f"**{wait // 3600}h {(wait % 3600) // 60:02d}m** (resets 00:00 UTC).")
+        streak = f" • 🔥 {res['streak']}-day streak" if res["streak"] > 1 else ""
+        await ctx.send(f"🎁 +{_coins(res['amount'])}{streak}. Balance: {_coins(res['balance'])}")
+
+    @commands.command(name="pay", aliases=["give"])
+    @commands.guild_only()
+    async def pay_cmd(self, ctx: commands.Context, member: discord.Member, amount: int):
+        if member.id == ctx.author.id or member.bot:
+            return await ctx.send("Pick someone else to pay.")
+        if not 0 < amount <= PAY_MAX:
+            return await ctx.send(f"Amount must be between 1 and {PAY_MAX:,}.")
+        try:
+            res = await acall(econ_transfer, [[ctx.author.id, -amount], [member.id, amount]], "pay",
+                              key=f"pay:{ctx.message.id}")
+        except ValueError as e:
+            return await ctx.send(f"❌ {str(e).capitalize()}.")
+        await ctx.send(f"💸 {ctx.author.display_name} → {member.display_name}: {_coins(amount)}. "
+                       f"Your balance: {_coins(res['balances'][str(ctx.author.id)])}")
+
+    @commands.command(name="gamble", aliases=["bet"])
+    @limit(1, 2)
+    async def gamble_cmd(self, ctx: commands.Context, amount: int):
+        if not 0 < amount <= GAMBLE_MAX:
+            return await ctx.send(f"Bet between 1 and {GAMBLE_MAX:,}.")
+        won = percent(GAMBLE_WIN_CHANCE)
+        delta = amount if won else -amount
+        try:
+            res = await acall(econ_transfer, [[ctx.author.id, delta], [HOUSE, -delta]],
+                              "gamble:win" if won else "gamble:loss", key=f"gamble:{ctx.message.id}")
+        except ValueError as e:
+            return await ctx.send(f"❌ {str(e).capitalize()}.")
+        bal = _coins(res["balances"][str(ctx.author.id)])
+        if won:
+            await ctx.send(f"🎲 Brett smiles on you: +{_coins(amount)}. Balance: {bal}")
+        else:
+            await ctx.send(f"🎲 Brett says nah: -{_coins(amount)}. Balance: {bal}")
+
+    @commands.command(name="shop")
+    async def shop_cmd(self, ctx: commands.Context):
+        embed = discord.Embed(title="🛒 Brett's Shop", description="Buy with `!buy <item>`.")
+        for name, (price, _, blurb) in SHOP.items():
+            embed.add_field(name=f"{name} — {_coins(price)}", value=blurb, inline=False)
+        coins = await acall(econ_balance, ctx.author.id)
+        embed.set_footer(text=f"Your balance: {coins:,} 🪙")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="buy")
+    async def buy_cmd(self, ctx: commands.Context, item: str):
+        item = item.lower()
+        if item not in SHOP:
+            return await ctx.send(f"No such item. Try one of: {', '.join(SHOP)}.")
+        price, effects, _ = SHOP[item]
+        try:
+            p = await acall(bv_buy, ctx.author.id, item, price, effects, key=f"buy:{ctx.message.id}")
+        except ValueError as e:
+            if str(e) == "No such player":
+                return await ctx.send("Shop items are for adventurers. Use `adventure start` first.")
+            return await ctx.send(f"❌ {str(e).capitalize()}.")
+        await ctx.send(f"🛍️ Bought **{item}** for {_coins(price)}. "
+                       f"HP {p['hp']}/{p['hp_max']} • STA {p['stamina']}/{p['stamina_max']} • "
+                       f"Balance: {_coins(p['gold'])}")
+
+    @commands.command(name="transactions", aliases=["tx"])
+    @bulk_output
+    async def transactions_cmd(self, ctx: commands.Context):
+        acct = str(ctx.author.id)
+        txs = await acall(econ_history, ctx.author.id, 10)
+        if not txs:
+            return await ctx.send("No transactions yet — try `!daily`.")
+        lines = [f"🧾 **{ctx.author.display_name}** — last {len(txs)} transaction(s)"]
+        for tx in txs:
+            delta = sum(d for a, d in tx["postings"] if a == acct)
+            when = time.strftime("%m-%d %H:%M", time.gmtime(tx["ts"]))
+            lines.append(f"`#{tx['id']}` {when} {'+' if delta > 0 else ''}{delta:,} — {_reason_label(tx['reason'])}")
+        await ctx.send("\n".join(lines))
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Economy(bot))
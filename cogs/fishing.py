@@ -0,0 +1,141 @@
+# cogs/fishing.py
+from __future__ import annotations
+
+import functools
+from typing import Dict, List, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils import achievements
+from utils.ratelimit import limit
+from utils.rng import AliasTable
+from utils.brettventures import bv_fish, bv_get_player, bv_sell_items
+from utils.storage import acall
+
+# --- Tunables ------------------------------------------------------------------
+FISH_MAX_BATCH = 25             # casts per !fish
+FISH_XP_PER_CAST = 1
+BONUS_CAP = 20                  # max rarity bonus from stats
+
+# item_id -> (name, emoji, rarity, sell value)
+ITEMS: Dict[str, Tuple[str, str, str, int]] = {
+    "boot":     ("Soggy Boot",      "🥾", "junk",      0),
+    "weed":     ("Tangle of Weeds", "🌿", "junk",      0),
+    "minnow":   ("Minnow",          "🐟", "common",    1),
+    "perch":    ("Perch",           "🐟", "common",    2),
+    "carp":     ("Carp",            "🐟", "common",    3),
+    "trout":    ("Trout",           "🐠", "uncommon",  6),
+    "salmon":   ("Salmon",          "🐠", "uncommon",  9),
+    "crab":     ("Crab",            "🦀", "uncommon",  8),
+    "pike":     ("Pike",            "🐡", "rare",     20),
+    "octopus":  ("Octopus",         "🐙", "rare",     28),
+    "koi":      ("Golden Koi",      "✨", "legendary", 75),
+    "kraken":   ("Baby Kraken",     "🦑", "legendary", 120),
+}
+
+# location -> [(item_id, base weight)]
+LOCATIONS: Dict[str, List[Tuple[str, float]]] = {
+    "pond":  [("boot", 8), ("weed", 12), ("minnow", 40), ("perch", 25), ("carp", 20),
+              ("trout", 6), ("pike", 1.5), ("koi", 0.3)],
+    "river": [("boot", 6), ("weed", 8), ("minnow", 20), ("perch", 20), ("trout", 18),
+              ("salmon", 12), ("pike", 3), ("koi", 0.5)],
+    "sea":   [("boot", 5), ("weed", 10), ("carp", 10), ("crab", 20), ("salmon", 15),
+              ("octopus", 4), ("kraken", 0.4)],
+}
+DEFAULT_LOCATION = "pond"
+
+# Weight multiplier per point of bonus, by rarity (junk gets rarer as you improve)
+RARITY_BOOST = {"junk": -0.04, "common": 0.0, "uncommon": 0.05, "rare": 0.12, "legendary": 0.25}
+RARITY_ORDER = ["legendary", "rare", "uncommon", "common", "junk"]
+
+
+def stat_bonus(p: dict) -> int:
+    """Rarity bonus from player stats: LCK counts double, SMT half."""
+    return max(0, min(BONUS_CAP, 2 * int(p.get("luck", 0)) + int(p.get("smt", 0)) // 2))
+
+
+@functools.lru_cache(maxsize=None)
+def loot_table(location: str, bonus: int) -> AliasTable[str]:
+    """Alias sampler for a location at a given bonus; built once per pair."""
+    ids, weights = [], []
+    for item_id, base in LOCATIONS[location]:
+        mult = 1.0 + bonus * RARITY_BOOST[ITEMS[item_id][2]]
+        ids.append(item_id)
+        weights.append(base * max(0.1, mult))
+    return AliasTable(ids, weights)
+
+
+def _item_line(item_id: str, n: int) -> str:
+    name, emoji, rarity, _ = ITEMS[item_id]
+    tag = f" *({rarity})*" if rarity in ("rare", "legendary") else ""
+    return f"{emoji} {name} ×{n}{tag}"
+
+
+class Fishing(commands.Cog):
+    """Cast a line at the pond, river or sea."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # Compile every table up front so the first cast pays nothing
+        for loc in LOCATIONS:
+            for bonus in range(BONUS_CAP + 1):
+                loot_table(loc, bonus)
+
+    @commands.command(name="fish")
+    @limit(1, 15)
+    async def fish_cmd(self, ctx: commands.Context, casts: int = 1, location: str = DEFAULT_LOCATION):
+        """Cast N times (max 25) at pond / river / sea: `!fish 10 river`."""
+        location = location.lower()
+        if location not in LOCATIONS:
+            return await ctx.send(f"Unknown spot. Try: {', '.join(LOCATIONS)}.")
+        casts = max(1, min(FISH_MAX_BATCH, casts))
+        p = await acall(bv_get_player, ctx.author.id)
+        if not p:
+            return await ctx.send("You need a character to fish. Use `adventure start`.")
+
+        # All N casts in one draw; catch, XP and quest progress in one storage write
+        catch = loot_table(location, stat_bonus(p)).counts_n(casts)
+        level = p["level"]
+        res = await acall(bv_fish, ctx.author.id, catch, casts, FISH_XP_PER_CAST * casts)
+        p, finished = res["player"], res["quests"]
+
+        rows = sorted(catch.items(), key=lambda kv: (RARITY_ORDER.index(ITEMS[kv[0]][2]), -kv[1]))
+        embed = discord.Embed(title=f"🎣 {casts} cast{'s' if casts != 1 else ''} at the {location}")
+        embed.description = "\n".join(_item_line(i, n) for i, n in rows)
+        for name in finished:
+            embed.add_field(name="Quest complete", value=f"✅ {name}", inline=False)
+        embed.set_footer(text=f"+{FISH_XP_PER_CAST * casts} XP • Lv {p['level']} • Sell with !sellfish")
+        await ctx.send(embed=embed)
+        achievements.announce(ctx, ctx.author.id, [a.id for a in achievements.crossed("level", level, p["level"])])
+
+    @commands.command(name="fishbag", aliases=["bag"])
+    async def fishbag_cmd(self, ctx: commands.Context, member: discord.Member | None = None):
+        target = member or ctx.author
+        p = await acall(bv_get_player, target.id)
+        bag = {i: n for i, n in (p or {}).get("items", {}).items() if i in ITEMS and n > 0}
+        if not bag:
+            return await ctx.send(f"{target.display_name}'s bag is empty. Go `!fish`!")
+        rows = sorted(bag.items(), key=lambda kv: (RARITY_ORDER.index(ITEMS[kv[0]][2]), kv[0]))
+        worth = sum(ITEMS[i][3] * n for i, n in bag.items())
+        lines = [f"🎒 **{target.display_name}'s catch** — worth {worth:,} 🪙"]
+        lines += [_item_line(i, n) for i, n in rows]
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="sellfish")
+    async def sellfish_cmd(self, ctx: commands.Context):
+        """Sell everything in your bag that's worth something."""
+        prices = {i: v for i, (_, _, _, v) in ITEMS.items() if v > 0}
+        try:
+            res = await acall(bv_sell_items, ctx.author.id, prices, key=f"sellfish:{ctx.message.id}")
+        except ValueError:
+            return await ctx.send("You need a character to fish. Use `adventure start`.")
+        if not res["sold"]:
+            return await ctx.send("Nothing worth selling. (Boots don't count.)")
+        n = sum(res["sold"].values())
+        await ctx.send(f"💰 Sold {n} catch{'es' if n != 1 else ''} for **{res['coins']:,}** 🪙. "
+                       f"Balance: {res['balance']:,} 🪙")
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Fishing(bot))
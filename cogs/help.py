@@ -4,16 +4,21 @@ from typing import Dict, List, Tuple
 import discord
 from discord.ext import commands
 
+from utils.prefixes import prefix_for
+
 # Map cog class names to a nice title + emoji + order
 # NOTE: Keys must match each Cog class name (e.g., class CoreGames(...): -> "CoreGames")
 COG_META = {
     "CoreGames": ("🎯 Core Games", 0),
     "Brettventures": ("🧭 Brettventures", 1),
-    "Stats": ("📊 Stats & Leaderboards", 2),
-    # Add more cogs here if you like:
-    # "Economy": ("💰 Economy", 3),
-    # "Quests": ("🗺️ Quests", 4),
-    # "Admin": ("🛠️ Admin", 5),
+    "Stats": ("📊 Stats", 2),
+    "Economy": ("💰 Economy", 3),
+    "Fishing": ("🎣 Fishing", 4),
+    "Quests": ("🗺️ Quests", 5),
+    "Profile": ("🪪 Profile", 6),
+    "Leaderboards": ("🏆 Leaderboards", 7),
+    "Battles": ("⚔️ Battles", 8),
+    "Admin": ("🛠️ Admin", 9),
 }
 
 # Optional per-cog usage tips shown at the bottom of each page
@@ -28,15 +33,34 @@ COG_TIPS = {
         "• Rest / stamina: `!adventure rest`\n"
         "_Stamina regenerates over time; check `!adventure stats` for ETA._"
     ),
-    "Stats": "*Tip:* Try `!leaderboard` and `!mystats` after you’ve been rolling for a bit.",
+    "Economy": (
+        "*Tip:* Claim `!daily` every day to build a streak bonus. "
+        "Adventure loot lands in the same wallet: spend it with `!buy`."
+    ),
+    "Fishing": (
+        "*Tip:* `!fish 25 sea` casts 25 times at once. LCK and SMT make rare catches more likely; "
+        "`!sellfish` turns your bag into coins."
+    ),
+    "Quests": "*Tip:* Quests track themselves as you roll, explore and fish; rewards are paid automatically.",
+    "Battles": (
+        "*Tip:* Every `!brettbattle` moves both players' ratings. "
+        "`!tournament @a @b @c` runs a knockout bracket; `!lb elo` ranks everyone."
+    ),
+    "Leaderboards": (
+        "*Tip:* `!lb gold 2` shows page 2 of the richest, `!lb nah me` where you stand on “Nah.”, "
+        "and `server` limits any board to people who've rolled here."
+    ),
+    "Stats": (
+        "*Tip:* Try `!leaderboard` and `!mystats` after you’ve been rolling for a bit.\n"
+        "Add a window for recent activity: `!stats week`, `!chart today`, `!leaderboard month`."
+    ),
 }
 
 def chunk(lst: List[str], n: int) -> List[List[str]]:
     return [lst[i:i+n] for i in range(0, len(lst), n)]
 
-def command_signature(cmd: commands.Command) -> str:
+def command_signature(cmd: commands.Command, prefix: str = "!") -> str:
     """Make a compact prefix-style signature, e.g. !adventure start <arg>"""
-    prefix = "!"
     # Use qualified_name so subcommands show as 'adventure start'
     sig = f"{prefix}{cmd.qualified_name}"
     params: List[str] = []
@@ -132,7 +156,8 @@ class PrettyHelp(commands.Cog):
         emb.set_footer(text=f"Requested by {ctx.author.display_name}")
 
         # Build compact signatures like `!adventure start <options>`
-        sigs = [f"`{command_signature(c)}`" for c in cmds]
+        prefix = prefix_for(ctx.guild.id if ctx.guild else 0)
+        sigs = [f"`{command_signature(c, prefix)}`" for c in cmds]
 
         # Split safely into two columns
         mid = (len(sigs) + 1) // 2  # ceil(len/2)
@@ -0,0 +1,91 @@
+# cogs/leaderboards.py
+from __future__ import annotations
+
+from discord.ext import commands
+
+from constants import BRETT_RESPONSES
+from utils import ranking
+from utils.members import display_names
+from utils.outbox import bulk_output
+from utils.storage import acall, lb_around, lb_page, window_leaderboard
+from utils.windows import WINDOW_LABELS, parse_window
+
+PER_PAGE = 10
+AROUND_RADIUS = 3
+SCOPE_WORDS = {"server", "guild", "here", "local"}
+ME_WORDS = {"me", "around", "mine"}
+
+
+class Leaderboards(commands.Cog):
+    """Rankings for rolls, outcomes, streaks, levels and coins."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.hybrid_command(name="leaderboard", aliases=["top", "lb"])
+    @bulk_output
+    async def leaderboard_cmd(self, ctx: commands.Context, *, query: str = ""):
+        """`!lb [rolls|nah|streak|level|gold|today|week|month] [page|me] [server]`"""
+        metric, window, page, around, local = "rolls", None, 1, False, False
+        for a in query.split():
+            w = a.lower()
+            is_window, unit = parse_window(w)
+            if is_window:
+                if unit is None:
+                    return await ctx.send("Windowed leaderboards support `today`, `week` and `month`.")
+                window = unit
+            elif w.isdigit():
+                page = int(w)
+            elif w in ME_WORDS:
+                around = True
+            elif w in SCOPE_WORDS:
+                local = True
+            else:
+                metric = ranking.resolve(w, BRETT_RESPONSES)
+                if metric is None:
+                    names = ", ".join(f"`{m}`" for m in ranking.METRICS if ":" not in m)
+                    return await ctx.send(f"Unknown board `{a}`. Try {names}, or an outcome like `nah`.")
+        if local and ctx.guild is None:
+            return await ctx.send("`server` boards only work inside a server.")
+        scope = ctx.guild.id if local else 0
+
+        if window is not None:
+            return await self._send_window(ctx, window, scope)
+
+        m = ranking.get_metric(metric)
+        where = "this server" if local else "global"
+        if around:
+            res = await acall(lb_around, metric, ctx.author.id, scope, AROUND_RADIUS)
+            if res["rank"] is None:
+                return await ctx.send(f"You're not on the {m.label} board yet.")
+            title = f"🏆 **{m.label} Leaderboard** ({where}) — you're #{res['rank']} of {res['count']:,}"
+        else:
+            res = await acall(lb_page, metric, scope, page, PER_PAGE)
+            title = f"🏆 **{m.label} Leaderboard** ({where}) — page {res['page']}/{res['pages']}"
+        if not res["rows"]:
+            return await ctx.send("Nobody's on this board yet — time to `!brett`!")
+
+        names = await display_names(self.bot, ctx.guild, [uid for _, uid, _ in res["rows"]])
+        lines = [title]
+        for rank, uid, score in res["rows"]:
+            name = f"__{names[uid]}__" if uid == ctx.author.id else names[uid]
+            lines.append(f"{rank}. **{name}** — {m.show(score)}")
+        if not around and res["page"] < res["pages"]:
+            rest = " ".join(a for a in query.split() if not a.isdigit())
+            lines.append(f"_Next page: `!lb {rest + ' ' if rest else ''}{res['page'] + 1}`_")
+        await ctx.send("\n".join(lines))
+
+    async def _send_window(self, ctx: commands.Context, unit: str, scope: int):
+        rows = [tuple(r) for r in await acall(window_leaderboard, unit, scope or None, PER_PAGE)]
+        if not rows:
+            return await ctx.send("No rolls yet — time to `!brett`!")
+        where = "this server" if scope else "global"
+        names = await display_names(self.bot, ctx.guild, [uid for _, uid in rows])
+        lines = [f"🏆 **Brett Leaderboard** ({where}, {WINDOW_LABELS[unit]})"]
+        for rank, (count, uid) in enumerate(rows, start=1):
+            lines.append(f"{rank}. **{names[uid]}** — {count}")
+        await ctx.send("\n".join(lines))
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Leaderboards(bot))
@@ -0,0 +1,57 @@
+# cogs/profile.py
+from __future__ import annotations
+
+import discord
+from discord.ext import commands
+
+from utils.storage import acall, get_profile
+
+
+class Profile(commands.Cog):
+    """One card with someone's rolls, adventure and wallet."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="profile", aliases=["me", "card"])
+    async def profile_cmd(self, ctx: commands.Context, member: discord.Member | None = None):
+        target = member or ctx.author
+        prof = await acall(get_profile, target.id)
+        rolls, adv = prof["rolls"], prof["adventure"]
+        if not rolls and not adv and not prof["battles"] and not prof["balance"]:
+            return await ctx.send(f"{target.display_name} hasn't done anything yet. Try `!brett`.")
+
+        embed = discord.Embed(title=f"🪪 {target.display_name}", color=discord.Color.blurple())
+        embed.set_thumbnail(url=target.display_avatar.url)
+
+        if rolls and rolls["total"]:
+            lines = [f"**{rolls['total']:,}** rolls"]
+            if prof["rank"]:
+                lines[0] += f" • #{prof['rank']} of {prof['ranked']:,}"
+            if rolls["favourite"]:
+                lines.append(f"Favourite: “{rolls['favourite']}” ×{rolls['favourite_count']:,}")
+            if rolls["streak_days"] > 1:
+                lines.append(f"🔥 {rolls['streak_days']}-day streak")
+            embed.add_field(name="🎲 Brett", value="\n".join(lines), inline=False)
+
+        if adv:
+            embed.add_field(
+                name="🧭 Brettventures",
+                value=(f"Lv **{adv['level']}** ({adv['xp']} XP) • "
+                       f"HP {adv['hp']}/{adv['hp_max']} • STA {adv['stamina']}/{adv['stamina_max']}\n"
+                       f"Quests done this period: {adv['quests_done']}"),
+                inline=False,
+            )
+
+        bt = prof["battles"]
+        if bt:
+            embed.add_field(name="⚔️ Battles",
+                            value=f"{bt['w']}W / {bt['l']}L / {bt['t']}T • Rating {round(bt['elo'])}",
+                            inline=False)
+
+        embed.add_field(name="💰 Wallet", value=f"{prof['balance']:,} 🪙", inline=False)
+        await ctx.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Profile(bot))
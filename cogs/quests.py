@@ -0,0 +1,63 @@
+# cogs/quests.py
+from __future__ import annotations
+
+import time
+
+import discord
+from discord.ext import commands
+
+from utils.brettventures import bv_get_player
+from utils.quests import quest_status
+from utils.storage import acall
+
+PERIOD_LABEL = {"daily": "Daily", "weekly": "Weekly", "once": "Milestones"}
+
+
+def _bar(n: int, goal: int, width: int = 10) -> str:
+    filled = int(width * min(1.0, n / float(goal or 1)))
+    return "█" * filled + "░" * (width - filled)
+
+
+def _reset_in(period: str) -> str:
+    now = int(time.time())
+    if period == "daily":
+        left = 86400 - now % 86400
+    elif period == "weekly":
+        # weeks start Monday 00:00 UTC (see utils.windows.unit_key)
+        left = 7 * 86400 - ((now // 86400 + 3) % 7) * 86400 - now % 86400
+    else:
+        return ""
+    d, h = divmod(left // 3600, 24)
+    return f" — resets in {d}d {h}h" if d else f" — resets in {h}h {(left % 3600) // 60:02d}m"
+
+
+class Quests(commands.Cog):
+    """Daily, weekly and one-off goals that pay out coins."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="quests", aliases=["quest", "q"])
+    async def quests_cmd(self, ctx: commands.Context, member: discord.Member | None = None):
+        target = member or ctx.author
+        if not await acall(bv_get_player, target.id):
+            return await ctx.send("Quests are for adventurers. Use `adventure start` to begin.")
+
+        embed = discord.Embed(title=f"🗺️ {target.display_name}'s quests")
+        by_period = {}
+        for q in await acall(quest_status, target.id):
+            by_period.setdefault(q["period"], []).append(q)
+        for period, rows in by_period.items():
+            lines = []
+            for q in rows:
+                mark = "✅" if q["done"] else "▫️"
+                lines.append(f"{mark} **{q['name']}** — {q['reward']} 🪙\n"
+                             f"`{_bar(q['progress'], q['goal'])}` {q['progress']}/{q['goal']}")
+            embed.add_field(name=PERIOD_LABEL.get(period, period) + _reset_in(period),
+                            value="\n".join(lines), inline=False)
+        embed.set_footer(text="Rewards are paid automatically when a quest completes.")
+        await ctx.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Quests(bot))
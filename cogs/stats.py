@@ -1,24 +1,115 @@
 import io
+import os
 import json
+import time
+import asyncio
+from typing import Optional
+
+import discord
+from discord import app_commands
 from discord.ext import commands
 
-from constants import BRETT_RESPONSES, BRETT_QUOTES, EMOJI_FOR, MILESTONES
-from utils.storage import load_stats, save_stats
+from constants import BRETT_RESPONSES, BRETT_QUOTES, EMOJI_FOR
+from utils.storage import (
+    acall, reset_stats, get_user_stats, get_global_stats, reset_user_stats,
+    get_window_stats, lb_page, list_snapshots, restore_point, achievements_of, guild_seen,
+)
 from utils.helpers import emoji_bar, big_emoji_bar, pct
+from utils.members import top_in_guild, in_guild
+from utils import achievements
+from utils import export as bulk
+from utils.windows import parse_window, WINDOW_LABELS
+from utils.charts import render_cached
+from utils.outbox import bulk_output
+
+
+_AGO_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+# Slash-command choices for the `window` option (prefix commands take any WINDOWS word)
+WINDOW_CHOICES = [app_commands.Choice(name=label, value=word)
+                  for word, label in (("today", "today"), ("week", "this week"),
+                                      ("month", "this month"), ("24h", "last 24h"))]
+
+
+def _parse_when(text: str) -> float | None:
+    """'90m' / '2h' / '1d' ago, or 'YYYY-MM-DD HH:MM' (UTC) -> unix time."""
+    import datetime as dt
+    text = text.strip().lower()
+    if text[-1:] in _AGO_UNITS and text[:-1].isdigit():
+        return time.time() - int(text[:-1]) * _AGO_UNITS[text[-1]]
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return dt.datetime.strptime(text, fmt).replace(tzinfo=dt.timezone.utc).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+def _member_and_window(ctx, *args):
+    """
+    Split `!stats`, `!stats week`, `!stats @user today` style arguments into
+    (member, is_window, unit). Mentions win over the typed argument.
+    """
+    import discord
+    member = ctx.author
+    if ctx.message.mentions and isinstance(ctx.message.mentions[0], discord.Member):
+        member = ctx.message.mentions[0]
+    for a in args:
+        if isinstance(a, discord.Member):
+            member = a
+            continue
+        is_win, unit = parse_window(a if isinstance(a, str) else None)
+        if is_win:
+            return member, True, unit
+    return member, False, None
+
+
+class _ProgressMessage:
+    """One status message, edited at most every `every` seconds."""
+
+    def __init__(self, ctx, verb: str, every: float = 3.0):
+        self.ctx, self.verb, self.every = ctx, verb, every
+        self.msg = None
+        self._last = 0.0
+
+    async def start(self):
+        self.msg = await self.ctx.send(f"⏳ {self.verb}… 0%")
+
+    async def __call__(self, done: int, total: int):
+        now = time.monotonic()
+        if self.msg is None or now - self._last < self.every:
+            return
+        self._last = now
+        try:
+            await self.msg.edit(content=f"⏳ {self.verb}… {pct(done, total)}")
+        except Exception:
+            pass
+
+    async def finish(self, text: str):
+        if self.msg is not None:
+            try:
+                await self.msg.edit(content=text)
+                return
+            except Exception:
+                pass
+        await self.ctx.send(text)
+
 
 class Stats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._bulk_job: asyncio.Task | None = None
     
-    @commands.command(name="stats")
-    async def stats_cmd(self, ctx, member=None):
-        import discord
-        member = member or ctx.author
-        if not isinstance(member, discord.Member):
-            member = ctx.author
+    @commands.hybrid_command(name="stats")
+    @app_commands.choices(window=WINDOW_CHOICES)
+    async def stats_cmd(self, ctx, member: Optional[discord.Member] = None, window: Optional[str] = None):
+        """Your roll stats. Add today / week / month / 24h for a time window."""
+        member, is_window, unit = _member_and_window(ctx, member, window)
+        if is_window:
+            await self._send_window_stats(ctx, member, unit)
+            return
 
-        stats = load_stats(BRETT_RESPONSES)
-        u = stats.get("users", {}).get(str(member.id))
+        u = await acall(get_user_stats, member.id, BRETT_RESPONSES)
         if not u:
             await ctx.send(f"{member.display_name} has no Brett stats yet.")
             return
@@ -34,16 +125,52 @@ class Stats(commands.Cog):
             lines.append(f"🔥 Streak: **{streak_days}** day(s)")
 
         # Next milestone
-        next_m = next((m for m in MILESTONES if total < m), None) if MILESTONES else None
+        next_m = achievements.next_threshold("rolls", total)
         if next_m:
             lines.append(f"🎯 Next milestone: **{next_m}** rolls (need {next_m - total} more)")
 
         await ctx.send("\n".join(lines))
 
-    @commands.command(name="allstats")
+    @commands.hybrid_command(name="achievements", aliases=["ach"])
+    async def achievements_cmd(self, ctx, member: Optional[discord.Member] = None):
+        """Achievements you've unlocked and what's next."""
+        member = member or ctx.author
+        a = await acall(achievements_of, member.id)
+        got = achievements.unpack(a["bits"])
+        lines = [f"🏅 **{member.display_name}** — {len(got)}/{len(achievements.ACHIEVEMENTS)} achievements"]
+        if got:
+            lines.append(", ".join(x.name for x in got))
+        ahead = []
+        for counter, value in a["counters"].items():
+            nxt = achievements.next_threshold(counter, value)
+            if nxt:
+                name = next(x.name for x in achievements.crossed(counter, nxt - 1, nxt))
+                ahead.append(f"- {name}: {value:,}/{nxt:,}")
+        if ahead:
+            lines.append("🎯 Next up:")
+            lines.extend(ahead)
+        await ctx.send("\n".join(lines))
+
+    async def _send_window_stats(self, ctx, member, unit):
+        w = await acall(get_window_stats, member.id, unit)
+        label = WINDOW_LABELS[unit]
+        total = int(w.get("total", 0))
+        if not total:
+            await ctx.send(f"{member.display_name} hasn't rolled {label}.")
+            return
+
+        lines = [f"📊 **{member.display_name}** — {total} roll{'s' if total != 1 else ''} {label}"]
+        outcomes = w.get("outcomes", {})
+        for name in BRETT_RESPONSES if outcomes else ():
+            c = int(outcomes.get(name, 0))
+            lines.append(f"- {name}: **{c}** ({pct(c, total)})  {emoji_bar(c, total)}")
+        await ctx.send("\n".join(lines))
+
+    @commands.hybrid_command(name="allstats")
+    @bulk_output
     async def allstats_cmd(self, ctx):
-        stats = load_stats(BRETT_RESPONSES)
-        g = stats.get("global", {})
+        """Global roll stats, top rollers here and a chart."""
+        g = await acall(get_global_stats, BRETT_RESPONSES)
         total = int(g.get("total", 0))
         outcomes = g.get("outcomes", {})
 
@@ -52,15 +179,13 @@ class Stats(commands.Cog):
             c = int(outcomes.get(name, 0))
             lines.append(f"- {name}: **{c}** ({pct(c, total)})")
 
-        # Server-local top rollers
-        rows = []
-        guild_members = {m.id: m.display_name for m in ctx.guild.members} if ctx.guild else {}
-        for uid_str, u in stats.get("users", {}).items():
-            uid = int(uid_str)
-            if guild_members and uid not in guild_members:
-                continue
-            rows.append((int(u.get("total", 0)), guild_members.get(uid, f"User {uid}")))
-        rows.sort(reverse=True)
+        # Server-local top rollers (member names resolved on demand)
+        board = await acall(lb_page, "rolls", 0, 1, 1000)
+        ranked = [(score, uid) for _, uid, score in board["rows"]]
+        if ctx.guild:
+            rows = await top_in_guild(ctx.guild, ranked, 10)
+        else:
+            rows = [(count, f"User {uid}") for count, uid in ranked[:10]]
 
         if rows:
             top = rows[:10]
@@ -68,17 +193,29 @@ class Stats(commands.Cog):
             for rank, (count, name) in enumerate(top, start=1):
                 lines.append(f"{rank}. **{name}** — {count}")
 
-        await ctx.send("\n".join(lines))
+        chart = None
+        if total:
+            try:
+                png = await render_cached(
+                    ("global", g.get("epoch"), int(g.get("v", 0))),
+                    f"Global Brett stats - {total} rolls",
+                    [(name, int(outcomes.get(name, 0))) for name in BRETT_RESPONSES],
+                )
+                chart = discord.File(fp=io.BytesIO(png), filename="brett_global.png")
+            except Exception:
+                chart = None
+        if chart:
+            await ctx.send("\n".join(lines), file=chart)
+        else:
+            await ctx.send("\n".join(lines))
 
-    @commands.command(name="exportstats")
-    async def exportstats_cmd(self, ctx, member=None):
-        import discord
+    @commands.hybrid_command(name="exportstats")
+    @bulk_output
+    async def exportstats_cmd(self, ctx, member: Optional[discord.Member] = None):
+        """DM a JSON file of your roll stats."""
         member = member or ctx.author
-        if not isinstance(member, discord.Member):
-            member = ctx.author
 
-        stats = load_stats(BRETT_RESPONSES)
-        u = stats.get("users", {}).get(str(member.id))
+        u = await acall(get_user_stats, member.id, BRETT_RESPONSES)
         if not u:
             await ctx.send(f"No stats to export for {member.display_name}.")
             return
@@ -91,17 +228,104 @@ class Stats(commands.Cog):
         else:
             await ctx.send("📩 Sent to your DMs.")
 
-    @commands.command(name="chart")
-    async def chart_cmd(self, ctx, member=None):
-        import discord
-        member = member or ctx.author
-        if not isinstance(member, discord.Member):
-            member = ctx.author
+    # ----------------- Bulk export / import (admin) -----------------
+    def _start_bulk(self, ctx, coro) -> bool:
+        if self._bulk_job and not self._bulk_job.done():
+            coro.close()
+            return False
+        self._bulk_job = asyncio.create_task(coro)
+        return True
+
+    @commands.command(name="exportall")
+    @bulk_output
+    @commands.has_permissions(administrator=True)
+    async def exportall_cmd(self, ctx, *options):
+        """Export every user's stats: `!exportall [jsonl|csv] [gz] [guild]`. Admin only."""
+        opts = {o.lower() for o in options}
+        fmt = "csv" if "csv" in opts else "jsonl"
+        gz = "gz" in opts or "gzip" in opts
+        guild = ctx.guild if "guild" in opts or "server" in opts else None
+        if "guild" in opts and guild is None:
+            await ctx.send("`guild` exports only work inside a server.")
+            return
+        if not self._start_bulk(ctx, self._run_export(ctx, fmt, gz, guild)):
+            await ctx.send("A bulk export/import is already running.")
+
+    async def _run_export(self, ctx, fmt, gz, guild):
+        path = bulk.export_path(fmt, gz, f"guild{guild.id}" if guild else "all")
+        progress = _ProgressMessage(ctx, "Exporting stats")
+        await progress.start()
+        keep = None
+        try:
+            if guild:
+                seen = set(await acall(guild_seen, guild.id))
+                keep = lambda ids: in_guild(guild, ids, seen)
+            n = await bulk.export_users(path, fmt, BRETT_RESPONSES, keep=keep, progress=progress)
+        except Exception as e:
+            await progress.finish(f"❌ Export failed: {e}")
+            return
+
+        size = os.path.getsize(path)
+        limit = getattr(ctx.guild, "filesize_limit", 8 * 1024 * 1024)
+        if size > limit:
+            await progress.finish(f"✅ Exported **{n}** users ({size // 1024} KB) — too big to upload; saved on the host at `{path}`.")
+            return
+        await progress.finish(f"✅ Exported **{n}** users ({size // 1024} KB).")
+        try:
+            await ctx.author.send(file=discord.File(path, filename=os.path.basename(path)))
+        except Exception:
+            await ctx.send(file=discord.File(path, filename=os.path.basename(path)))
+        else:
+            await ctx.send("📩 Sent to your DMs.")
+        os.remove(path)
+
+    @commands.command(name="importstats")
+    @bulk_output
+    @commands.has_permissions(administrator=True)
+    async def importstats_cmd(self, ctx, mode: str = "merge"):
+        """Restore users from an attached `!exportall` file: `!importstats [merge|replace]`. Admin only."""
+        mode = mode.lower()
+        if mode not in ("merge", "replace"):
+            await ctx.send("Mode must be `merge` or `replace`.")
+            return
+        if not ctx.message.attachments:
+            await ctx.send("Attach a `.jsonl`, `.csv` (optionally `.gz`) export to import.")
+            return
+        if not self._start_bulk(ctx, self._run_import(ctx, ctx.message.attachments[0], mode)):
+            await ctx.send("A bulk export/import is already running.")
+
+    async def _run_import(self, ctx, attachment, mode):
+        path = bulk.export_path("import", False, str(ctx.message.id))
+        progress = _ProgressMessage(ctx, "Importing stats")
+        await progress.start()
+        try:
+            await attachment.save(path)
+            n = await bulk.import_file(path, mode, progress=progress)
+        except Exception as e:
+            await progress.finish(f"❌ Import failed: {e}")
+            return
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        await progress.finish(f"✅ Imported **{n}** users ({mode}).")
+
+    @commands.hybrid_command(name="chart")
+    @bulk_output
+    @app_commands.choices(window=WINDOW_CHOICES)
+    async def chart_cmd(self, ctx, member: Optional[discord.Member] = None, window: Optional[str] = None):
+        """Chart of someone's rolls, optionally for today / this week / this month."""
+        member, is_window, unit = _member_and_window(ctx, member, window)
+        if is_window and unit is None:
+            await ctx.send("Charts need an outcome breakdown: use `today`, `week` or `month`.")
+            return
 
-        stats = load_stats(BRETT_RESPONSES)
-        u = stats.get("users", {}).get(str(member.id))
+        if is_window:
+            u = await acall(get_window_stats, member.id, unit)
+        else:
+            u = await acall(get_user_stats, member.id, BRETT_RESPONSES)
         if not u or not int(u.get("total", 0)):
-            await ctx.send(f"{member.display_name} has no stats yet.")
+            when = f" {WINDOW_LABELS[unit]}" if is_window else " yet"
+            await ctx.send(f"{member.display_name} has no stats{when}.")
             return
 
         total = int(u["total"])
@@ -110,8 +334,9 @@ class Stats(commands.Cog):
             key=lambda x: (-x[0], x[1])
         )
 
+        label = f" {WINDOW_LABELS[unit]}" if is_window else ""
         lines = [
-            f"📊 **{member.display_name}** — {total} total roll{'s' if total != 1 else ''}",
+            f"📊 **{member.display_name}** — {total} total roll{'s' if total != 1 else ''}{label}",
             "```"
         ]
         for c, name in rows:
@@ -120,92 +345,98 @@ class Stats(commands.Cog):
         lines.append("```")
 
         top_count, top_name = rows[0]
+        caption = None
         if top_count > 0:
-            lines.append(f"⭐ Most rolled: **{top_name}** × {top_count} ({(100*top_count/total):.1f}%)")
+            caption = f"⭐ Most rolled: **{top_name}** × {top_count} ({(100*top_count/total):.1f}%)"
+            lines.append(caption)
 
-        await ctx.send("\n".join(lines))
+        # Prefer a rendered PNG; the text chart above is the fallback
+        key = ("user", member.id, u.get("epoch"), int(u.get("v", 0)), unit if is_window else "all")
+        try:
+            png = await render_cached(
+                key,
+                f"{member.display_name} - {total} rolls{label}",
+                [(name, c) for c, name in rows],
+            )
+        except Exception:
+            await ctx.send("\n".join(lines))
+            return
+        await ctx.send(caption or lines[0], file=discord.File(fp=io.BytesIO(png), filename="brett_chart.png"))
 
-    @commands.command(name="brettquote")
+    @commands.hybrid_command(name="brettquote")
     async def brettquote_cmd(self, ctx):
+        """A random Brett quote."""
         import random
         await ctx.send(f"📢 **Brett Quote of the Day:** {random.choice(BRETT_QUOTES)}")
 
-    @commands.command(name="streak")
-    async def streak_cmd(self, ctx, member=None):
-        import discord
+    @commands.hybrid_command(name="streak")
+    async def streak_cmd(self, ctx, member: Optional[discord.Member] = None):
+        """Someone's current daily roll streak."""
         member = member or ctx.author
-        if not isinstance(member, discord.Member):
-            member = ctx.author
 
-        stats = load_stats(BRETT_RESPONSES)
-        u = stats.get("users", {}).get(str(member.id))
+        u = await acall(get_user_stats, member.id, BRETT_RESPONSES)
         if not u or int(u.get("streak_days", 0)) == 0:
             await ctx.send(f"{member.display_name} has no current streak.")
             return
 
         await ctx.send(f"🔥 {member.display_name} streak: **{int(u['streak_days'])}** day(s)")
 
-    @commands.command(name="odds")
+    @commands.hybrid_command(name="odds")
     async def odds_cmd(self, ctx):
+        """The chance of each Brett outcome."""
         per = 100 / len(BRETT_RESPONSES)
         lines = ["🎯 **Brett Odds (default)**"]
         for name in BRETT_RESPONSES:
             lines.append(f"- {name}: {per:.1f}%")
         await ctx.send("\n".join(lines))
 
-    @commands.command(name="leaderboard", aliases=["top", "lb"])
-    async def leaderboard_cmd(self, ctx):
-        stats = load_stats(BRETT_RESPONSES)
-        users = stats.get("users", {})
-        rows = sorted(((int(u.get("total", 0)), int(uid)) for uid, u in users.items()),
-                      reverse=True)[:10]
-
-        if not rows:
-            await ctx.send("No rolls yet — time to `!brett`!")
-            return
-
-        lines = ["🏆 **Brett Leaderboard** (global)"]
-        for rank, (count, uid) in enumerate(rows, start=1):
-            name = None
-            if ctx.guild:
-                m = ctx.guild.get_member(uid)
-                if m:
-                    name = m.display_name
-            if not name:
-                try:
-                    usr = await self.bot.fetch_user(uid)
-                    name = usr.name
-                except Exception:
-                    name = f"User {uid}"
-            lines.append(f"{rank}. **{name}** — {count}")
-
-        await ctx.send("\n".join(lines))
-
     # ----------------- Admin/global reset -----------------
     @commands.command(name="resetstats")
     @commands.has_permissions(administrator=True)  # swap to @commands.is_owner() if you prefer
     async def resetstats_cmd(self, ctx):
-        """Reset ALL Brett stats (global + users). Admin only."""
-        blank = {
-            "global": {"total": 0, "outcomes": {k: 0 for k in BRETT_RESPONSES}},
-            "users": {}
-        }
-        save_stats(blank)
-        await ctx.send("🧹 All Brett stats have been reset.")
+        """Reset ALL Brett stats (global + users). Coins and adventures are kept. Admin only."""
+        await acall(reset_stats, BRETT_RESPONSES)
+        await ctx.send("🧹 All Brett stats have been reset. (Undo with `!restorestats 5m`.)")
+
+    @commands.command(name="snapshots")
+    @bulk_output
+    @commands.has_permissions(administrator=True)
+    async def snapshots_cmd(self, ctx):
+        """List the stored stats snapshots. Admin only."""
+        snaps = await acall(list_snapshots)
+        if not snaps:
+            await ctx.send("No snapshots yet (one is taken every hour while stats change).")
+            return
+        lines = ["🗄️ **Stats snapshots** (UTC)"]
+        for seq, ts in snaps[-10:][::-1]:
+            lines.append(f"- {time.strftime('%Y-%m-%d %H:%M', time.gmtime(ts))} — op #{seq}")
+        lines.append("Restore any moment since the oldest with `!restorestats <2h | YYYY-MM-DD HH:MM>`.")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="restorestats")
+    @commands.has_permissions(administrator=True)
+    async def restorestats_cmd(self, ctx, *, when: str = ""):
+        """Roll stats back to a point in time: `!restorestats 2h` or `!restorestats 2025-01-31 18:00`. Coins and adventures are kept. Admin only."""
+        at = _parse_when(when) if when else None
+        if at is None:
+            await ctx.send("Usage: `!restorestats 30m|2h|1d` or `!restorestats YYYY-MM-DD HH:MM` (UTC).")
+            return
+        try:
+            info = await acall(restore_point, at)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        stamp = time.strftime('%Y-%m-%d %H:%M', time.gmtime(at))
+        await ctx.send(f"⏪ Stats restored to **{stamp} UTC** ({info['users']} users, "
+                       f"{info['replayed']} journaled change(s) after snapshot #{info['snapshot_seq']}). "
+                       f"Coins, battles and adventures are unchanged.")
 
     # ----------------- Per-user reset -----------------
-    @commands.command(name="resetmystats")
+    @commands.hybrid_command(name="resetmystats")
     async def reset_my_stats_cmd(self, ctx):
-        """Reset only your Brett stats."""
-        data = load_stats(BRETT_RESPONSES)
-        uid = str(ctx.author.id)
-        data.setdefault("users", {})[uid] = {
-            "total": 0,
-            "outcomes": {k: 0 for k in BRETT_RESPONSES},
-            "streak_days": 0
-        }
-        save_stats(data)
-        await ctx.send("🧼 Your Brett stats have been reset.")
+        """Reset only your Brett stats; achievements you already unlocked are kept."""
+        await acall(reset_user_stats, ctx.author.id, BRETT_RESPONSES)
+        await ctx.send("🧼 Your Brett stats have been reset. (Achievements stay unlocked.)")
 
 
 async def setup(bot):
@@ -0,0 +1,99 @@
+# launcher.py
+"""
+Multi-process launcher: one storage daemon + N shard-group bot processes.
+
+    python launcher.py --shards 8 --procs 4
+
+Each bot process gets SHARD_COUNT/SHARD_IDS for its slice of shards and
+STORAGE_SOCKET pointing at the shared daemon, which is the only process that
+reads or writes STATS_FILE. Crashed bot processes are restarted.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def shard_groups(shards: int, procs: int):
+    """Split shard ids 0..shards-1 into `procs` contiguous groups."""
+    procs = max(1, min(procs, shards))
+    base, extra = divmod(shards, procs)
+    groups, start = [], 0
+    for i in range(procs):
+        n = base + (1 if i < extra else 0)
+        groups.append(list(range(start, start + n)))
+        start += n
+    return groups
+
+
+def _wait_for_socket(path: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if proc.poll() is not None:
+            raise SystemExit("storage daemon exited during startup")
+        if time.monotonic() > deadline:
+            raise SystemExit(f"storage daemon did not create {path}")
+        time.sleep(0.1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run Brett Bot as sharded processes")
+    ap.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "2")))
+    ap.add_argument("--procs", type=int, default=int(os.getenv("SHARD_PROCS", "2")))
+    ap.add_argument("--socket", default=os.getenv("STORAGE_SOCKET") or "/tmp/brett-storage.sock")
+    args = ap.parse_args()
+
+    base_env = dict(os.environ)
+    base_env.pop("STORAGE_SOCKET", None)
+    daemon = subprocess.Popen([sys.executable, "-m", "utils.storage_daemon", "--socket", args.socket],
+                              cwd=HERE, env=base_env)
+    _wait_for_socket(args.socket, daemon)
+
+    groups = shard_groups(args.shards, args.procs)
+    children = {}
+
+    def spawn(i):
+        env = dict(base_env, STORAGE_SOCKET=args.socket,
+                   SHARD_COUNT=str(args.shards),
+                   SHARD_IDS=",".join(map(str, groups[i])))
+        children[i] = subprocess.Popen([sys.executable, "bot.py"], cwd=HERE, env=env)
+        print(f"[LAUNCHER] shard group {i}: shards {groups[i]} (pid {children[i].pid})", flush=True)
+
+    for i in range(len(groups)):
+        spawn(i)
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while not stopping:
+        time.sleep(1)
+        if daemon.poll() is not None:
+            print("[LAUNCHER] storage daemon died; shutting down", flush=True)
+            break
+        for i, proc in list(children.items()):
+            if proc.poll() is not None:
+                print(f"[LAUNCHER] shard group {i} exited ({proc.returncode}); restarting", flush=True)
+                time.sleep(5)
+                spawn(i)
+
+    # Bots first so their last writes land, then the store
+    for proc in children.values():
+        proc.terminate()
+    for proc in children.values():
+        proc.wait(timeout=30)
+    daemon.terminate()
+    daemon.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import storage  # noqa: E402
+
+
+def _reset() -> None:
+    storage.invalidate_cache()
+    if storage._JOURNAL is not None:
+        storage._JOURNAL.close()
+    if storage._COLD is not None:
+        storage._COLD.close()
+    storage._JOURNAL = storage._COLD = None
+    storage._SEQ = 0
+    storage._DIRTY = False
+    storage._LEDGER_SEEN = storage._LEDGER_SEEN_PATH = None
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """utils.storage on an empty store in tmp_path, in this process."""
+    for var in ("ECON_LEDGER_FILE", "SNAPSHOT_DIR", "STORE_COLD_FILE"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(storage, "STATS_FILE", str(tmp_path / "stats.json"))
+    monkeypatch.setattr(storage, "STORAGE_SOCKET", None)
+    _reset()
+    yield storage
+    storage.flush()
+    _reset()
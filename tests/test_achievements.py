@@ -0,0 +1,92 @@
+# tests/test_achievements.py
+import asyncio
+from types import SimpleNamespace
+
+from constants import BRETT_RESPONSES, MILESTONES
+from utils import achievements as ach
+
+
+def _ids(found):
+    return [a.id for a in found]
+
+
+def test_crossed_includes_the_threshold_itself():
+    t = MILESTONES[0]
+    assert _ids(ach.crossed("rolls", t - 1, t)) == [f"rolls_{t}"]
+    assert ach.crossed("rolls", t, t + 1) == []
+    assert ach.crossed("rolls", 0, t - 1) == []
+    assert ach.crossed("rolls", t, t) == []
+    assert ach.crossed("rolls", t + 1, t - 1) == []
+    assert _ids(ach.crossed("rolls", 0, MILESTONES[2])) == [f"rolls_{n}" for n in MILESTONES[:3]]
+    assert ach.crossed("no-such-counter", 0, 10**9) == []
+
+
+def test_backfill_does_not_announce_old_unlocks():
+    # A record from before achievements, already past 10 and 25 rolls
+    u = {"total": 30, "outcomes": {}, "streak_days": 0}
+    assert ach.unlock(u, ach.user_counters, [("rolls", 30, 31)]) == []
+    assert ach.unpack(u["ach"]) == [ach.BY_ID["rolls_10"], ach.BY_ID["rolls_25"]]
+    # The change that crosses a threshold is announced, and only once
+    assert ach.unlock(u, ach.user_counters, [("rolls", 49, 50)]) == ["rolls_50"]
+    assert ach.unlock(u, ach.user_counters, [("rolls", 49, 50)]) == []
+
+
+def test_unlocked_by_the_first_change_is_still_news():
+    u = {"total": 10, "outcomes": {}, "streak_days": 0}
+    assert ach.unlock(u, ach.user_counters, [("rolls", 9, 10)]) == ["rolls_10"]
+
+
+def test_bits_are_stable():
+    # Bits are persisted in stored records: these must never move
+    pinned = {"rolls_10": 0, "rolls_100000": len(MILESTONES) - 1, "streak_3": 32, "streak_365": 36,
+              "wins_1": 40, "wins_500": 44, "level_5": 48, "level_50": 51,
+              "outcome0_100": 64, "outcome0_1000": 65, f"outcome{len(BRETT_RESPONSES) - 1}_1000":
+              64 + 2 * len(BRETT_RESPONSES) - 1}
+    assert {i: ach.BY_ID[i].bit for i in pinned} == pinned
+    bits = [a.bit for a in ach.ACHIEVEMENTS]
+    assert len(set(bits)) == len(bits)
+    assert len(MILESTONES) <= 32
+    assert ach.unpack(ach.bits_of(ach.ACHIEVEMENTS)) == ach.ACHIEVEMENTS
+
+
+class _Ctx:
+    def __init__(self, sent, fails=False):
+        self.bot, self.guild = None, None
+        self.channel = SimpleNamespace(id=1, send=self._channel_send)
+        self._sent, self._fails = sent, fails
+
+    async def send(self, text):
+        if self._fails:
+            raise RuntimeError("interaction expired")
+        self._sent.append(("ctx", text))
+
+    async def _channel_send(self, text):
+        self._sent.append(("channel", text))
+
+
+def test_announcements_batch_and_fall_back_to_the_channel(monkeypatch):
+    monkeypatch.setattr(ach, "ANNOUNCE_DELAY", 0)
+    sent = []
+
+    async def main():
+        ach.announce(_Ctx(sent), 1, ["rolls_10"])
+        ach.announce(_Ctx(sent, fails=True), 2, ["wins_1", "bogus"])
+        await asyncio.gather(*ach._TASKS)
+
+    asyncio.run(main())
+    assert sent == [("channel", "🏅 Someone unlocked **10 rolls**\n🏅 Someone unlocked **1 battle win(s)**")]
+
+
+def test_drain_sends_what_is_pending(monkeypatch):
+    monkeypatch.setattr(ach, "ANNOUNCE_DELAY", 60)
+    sent = []
+
+    async def main():
+        ach.announce(_Ctx(sent), 1, ["rolls_10"])
+        await ach.drain()
+        for t in ach._TASKS:
+            t.cancel()
+
+    asyncio.run(main())
+    assert sent == [("ctx", "🏅 Someone unlocked **10 rolls**")]
+    assert ach._PENDING == {}
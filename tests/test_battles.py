@@ -0,0 +1,52 @@
+# tests/test_battles.py
+import asyncio
+import random
+
+from utils.battles import next_round, seed_bracket
+from utils.locks import GUILDS
+
+
+def _round_two(slots):
+    """Round-two pairs if every duel is won by its first player."""
+    return next_round([s[0] for s in slots])
+
+
+def test_six_player_bracket_byes_meet_winners():
+    rating = {u: 1000 + u for u in range(1, 7)}.__getitem__
+    for seed in range(20):
+        slots = seed_bracket(range(1, 7), rating, random.Random(seed))
+        assert len(slots) == 4
+        byes = [s[0] for s in slots if len(s) == 1]
+        assert sorted(byes) == [5, 6]
+        assert sorted(u for s in slots for u in s) == list(range(1, 7))
+        for a, b in _round_two(slots):
+            # every bye holder faces a first-round winner, never the other bye
+            assert (a in byes) != (b in byes)
+
+
+def test_five_player_bracket_top_seed_meets_the_winner():
+    rating = {u: 1000 + u for u in range(1, 6)}.__getitem__
+    for seed in range(20):
+        slots = seed_bracket(range(1, 6), rating, random.Random(seed))
+        assert [len(s) for s in slots] == [1, 2, 1, 1]
+        assert slots[0] == (5,)
+        (a, b), (c, d) = _round_two(slots)
+        assert a == 5 and b not in (4, 3)
+        assert {c, d} == {4, 3}
+
+
+def test_full_bracket_has_no_byes():
+    slots = seed_bracket(range(8), lambda u: 0, random.Random(1))
+    assert all(len(s) == 2 for s in slots)
+    assert sorted(u for s in slots for u in s) == list(range(8))
+
+
+def test_guild_locks_are_per_guild():
+    async def main():
+        async with GUILDS.hold(1):
+            other = GUILDS.get(2).locked()
+            same = GUILDS.get(1).locked()
+        return other, same, len(GUILDS)
+
+    # any two guild ids must be independent, not just ones that miss a stripe
+    assert asyncio.run(main()) == (False, True, 0)
@@ -0,0 +1,62 @@
+# tests/test_brettventures.py
+import pytest
+
+from utils import brettventures, economy, quests
+
+
+def test_reads_are_copies(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    p = brettventures.bv_get_player(1)
+    p["pow"] += 10
+    assert brettventures.bv_get_player(1)["pow"] == p["pow"] - 10
+
+
+def test_stale_upsert_conflicts(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    p = brettventures.bv_get_player(1)
+    p["stamina"] -= 1
+    brettventures.bv_add_xp(1, 1)   # another command wrote in between
+    with pytest.raises(store.VersionConflict):
+        brettventures.bv_upsert_player(p)
+    fresh = brettventures.bv_get_player(1)
+    fresh["stamina"] -= 1
+    brettventures.bv_upsert_player(fresh)
+    assert brettventures.bv_get_player(1)["stamina"] == fresh["stamina"]
+
+
+def _journal_ops(store):
+    from utils import snapshots
+    return [e["op"] for e in snapshots.entries(store._snap_dir())]
+
+
+def test_explore_is_one_write(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    p = brettventures.bv_get_player(1)
+    p["stamina"] -= 1
+    before = len(_journal_ops(store))
+    res = brettventures.bv_explore(p, 25, 12, "explore:1")
+    assert _journal_ops(store)[before:] == ["bv_explore"]
+    assert res["player"]["level"] == 2 and res["player"]["stamina"] == p["stamina"]
+    assert economy.econ_balance(1) == 12
+    with pytest.raises(store.VersionConflict):
+        brettventures.bv_explore(p, 25, 12, "explore:2")   # p is stale now
+
+
+
+def test_fish_is_one_write(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    before = len(_journal_ops(store))
+    res = brettventures.bv_fish(1, {"perch": 3, "boot": 2}, 5, 5)
+    assert _journal_ops(store)[before:] == ["bv_fish"]
+    assert res["player"]["items"] == {"perch": 3, "boot": 2} and res["player"]["xp"] == 5
+    fish = [q for q in quests.quest_status(1) if q["id"] == "d_fish"]
+    assert fish[0]["progress"] == 5 and res["quests"] == []
+    res = brettventures.bv_fish(1, {"perch": 15}, 15, 15)
+    assert "Cast 20 lines" in res["quests"]
+
+def test_encounter_replays_from_its_seed(store):
+    from cogs.brettventures import _encounter
+    p = brettventures.bv_get_or_create_player(1, "one")
+    a, b = dict(p), dict(p)
+    ra, rb = _encounter(a, 1234), _encounter(b, 1234)
+    assert ra[:7] == rb[:7] and a == b
@@ -0,0 +1,49 @@
+# tests/test_daemon.py
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils import economy, storage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    sock = str(tmp_path / "storage.sock")
+    env = {**os.environ, "STATS_FILE": str(tmp_path / "stats.json"), "STORAGE_SOCKET": ""}
+    proc = subprocess.Popen([sys.executable, "-m", "utils.storage_daemon", "--socket", sock],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(sock):
+        assert proc.poll() is None and time.monotonic() < deadline, "storage daemon didn't start"
+        time.sleep(0.05)
+    monkeypatch.setattr(storage, "STORAGE_SOCKET", sock)
+    yield sock
+    proc.terminate()
+    proc.wait(10)
+
+
+def test_acall_pipelines_on_the_event_loop(daemon):
+    async def main():
+        await asyncio.gather(*(storage.acall(economy.econ_transfer, [["@mint", -1], [uid, 1]], "t")
+                               for uid in range(50)))
+        balances = await asyncio.gather(*(storage.acall(economy.econ_balance, uid) for uid in range(50)))
+        with pytest.raises(ValueError):
+            await storage.acall(economy.econ_transfer, [[1, -5], [2, 5]], "overdraw")
+        return balances
+
+    assert asyncio.run(main()) == [1] * 50
+    assert economy.econ_balance(7) == 1   # the blocking client still works from threads
+
+
+def test_rate_limits_are_shared_through_the_daemon(daemon):
+    from utils.ratelimit import DaemonBackend
+    a, b = DaemonBackend(), DaemonBackend()   # two shards
+    assert a.hit("guild:1", 10, 0, 1000.0) == 0.0
+    assert b.hit_all([("user:2", 10, 0), ("guild:1", 10, 0)], 1001.0) == [0.0, 9.0]
+    assert b.hit("user:2", 10, 0, 1001.0) == 0.0   # the denial above spent nothing
@@ -0,0 +1,111 @@
+# tests/test_economy.py
+import json
+import time
+
+import pytest
+
+from utils import economy
+from utils.economy import MINT
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_append_ledger_skips_requeued_txs(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    seen = economy.ledger_tail(path, 100)
+    a = {"id": 1, "ts": 10.0, "reason": "x", "postings": [[MINT, -1], ["1", 1]]}
+    b = {"id": 2, "ts": 11.0, "reason": "y", "postings": [[MINT, -1], ["1", 1]], "key": "k"}
+    assert economy.append_ledger(path, [a, b], seen, 100) == 2
+    # A replay queues the same transactions again
+    assert economy.append_ledger(path, [a, dict(b, ts=99.0)], economy.ledger_tail(path, 100), 100) == 0
+    assert [tx["id"] for tx in _lines(path)] == [1, 2]
+
+
+def test_append_ledger_keeps_reused_ids(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    seen = economy.ledger_tail(path, 100)
+    economy.append_ledger(path, [{"id": 1, "ts": 10.0, "reason": "x", "postings": []}], seen, 100)
+    # After a reset/restore next_tx starts over: same id, different transaction
+    economy.append_ledger(path, [{"id": 1, "ts": 20.0, "reason": "y", "postings": []}], seen, 100)
+    assert [tx["reason"] for tx in _lines(path)] == ["x", "y"]
+
+
+def test_ledger_tail_is_bounded(tmp_path):
+    path = str(tmp_path / "ledger.jsonl")
+    txs = [{"id": i, "ts": float(i), "reason": "x", "postings": []} for i in range(1, 11)]
+    seen = economy.ledger_tail(path, 3)
+    economy.append_ledger(path, txs, seen, 3)
+    assert list(seen) == [(8, 8.0), (9, 9.0), (10, 10.0)]
+    assert list(economy.ledger_tail(path, 3)) == list(seen)
+
+
+def test_restore_point_keeps_coins_claimed_after_it(store):
+    from constants import BRETT_RESPONSES
+    uid, other = 42, 43
+    store.record_roll(1, uid, BRETT_RESPONSES[0])
+    economy.econ_transfer([[MINT, -5], [uid, 5]], "test", ts=1000.0)
+    store.flush()
+    at = time.time()
+    time.sleep(0.01)
+    store.record_roll(1, uid, BRETT_RESPONSES[0])
+    daily = economy.econ_daily(uid)
+    economy.econ_transfer([[uid, -3], [other, 3]], "pay", key="pay:1")
+    store.flush()
+    store.restore_point(at)
+    # The roll after `at` is rolled back; the coins after it are not
+    assert store.get_user_stats(uid)["total"] == 1
+    assert economy.econ_balance(uid) == 5 + daily["amount"] - 3
+    assert economy.econ_balance(other) == 3
+    with pytest.raises(ValueError):
+        economy.econ_daily(uid)
+    economy.econ_transfer([[uid, -3], [other, 3]], "pay", key="pay:1")   # still deduped
+    assert economy.econ_balance(other) == 3
+    economy.econ_transfer([[MINT, -1], [uid, 1]], "after", ts=3000.0)
+    store.flush()
+    hist = economy.econ_history(uid, 10)
+    assert [tx["reason"] for tx in hist] == ["after", "pay", "daily", "test"]
+    assert len({tx["id"] for tx in hist}) == 4
+    # Recovery from the journal alone replays the restore the same way
+    with open(store.STATS_FILE, "w") as f:
+        f.write("{not json")
+    store.invalidate_cache()
+    assert store.get_user_stats(uid)["total"] == 1
+    assert economy.econ_balance(uid) == 5 + daily["amount"] - 3 + 1
+
+
+def test_history_after_resetstats(store):
+    from constants import BRETT_RESPONSES
+    uid = 7
+    store.record_roll(1, uid, BRETT_RESPONSES[0])
+    economy.econ_transfer([[MINT, -5], [uid, 5]], "before", ts=1000.0)
+    store.flush()
+    store.reset_stats(BRETT_RESPONSES)
+    assert store.get_user_stats(uid) is None
+    assert economy.econ_balance(uid) == 5   # coins aren't roll stats
+    economy.econ_transfer([[MINT, -2], [uid, 2]], "after", ts=2000.0)
+    store.flush()
+    assert [tx["reason"] for tx in economy.econ_history(uid, 10)] == ["after", "before"]
+
+
+def test_journal_replays_unflushed_writes_once(store):
+    from constants import BRETT_RESPONSES
+    uid = 9
+    store.record_roll(1, uid, BRETT_RESPONSES[0])
+    economy.econ_transfer([[MINT, -5], [uid, 5]], "saved", ts=1000.0)
+    store.flush()
+    store.record_roll(1, uid, BRETT_RESPONSES[1])
+    economy.econ_transfer([[MINT, -7], [uid, 7]], "journaled", ts=2000.0, key="k1")
+    # Crash: the in-memory store and the pending ledger lines are gone, the journal isn't
+    store.invalidate_cache()
+    assert store.get_user_stats(uid)["total"] == 2
+    assert economy.econ_balance(uid) == 12
+    # The keyed transfer was replayed, so a retry of it is still recognised
+    economy.econ_transfer([[MINT, -7], [uid, 7]], "journaled", ts=2001.0, key="k1")
+    assert economy.econ_balance(uid) == 12
+    store.flush()
+    store.invalidate_cache()   # a second load replays nothing new
+    assert store.get_user_stats(uid)["total"] == 2
+    assert [tx["reason"] for tx in economy.econ_history(uid, 10)] == ["journaled", "saved"]
@@ -0,0 +1,41 @@
+# tests/test_fishing.py
+from cogs.fishing import ITEMS, LOCATIONS, RARITY_BOOST, loot_table
+from utils import rng
+
+
+def _weights(location, bonus):
+    w = {i: base * max(0.1, 1.0 + bonus * RARITY_BOOST[ITEMS[i][2]]) for i, base in LOCATIONS[location]}
+    total = sum(w.values())
+    return {i: v / total for i, v in w.items()}
+
+
+def _table_odds(table):
+    """Exact chance of each item, read back from the prob/alias columns."""
+    n = len(table)
+    odds = dict.fromkeys(table.items, 0.0)
+    for i, item in enumerate(table.items):
+        odds[item] += table.prob[i] / n
+        odds[table.items[table.alias[i]]] += (1.0 - table.prob[i]) / n
+    return odds
+
+
+def test_loot_tables_match_their_weights():
+    for location in LOCATIONS:
+        for bonus in (0, 7, 20):
+            want, got = _weights(location, bonus), _table_odds(loot_table(location, bonus))
+            assert got.keys() == want.keys()
+            for item in want:
+                assert abs(got[item] - want[item]) < 1e-9
+
+
+def test_sampler_follows_the_table():
+    rng.set_seed(36)
+    draws = 200_000
+    for location, bonus in (("pond", 0), ("sea", 20)):
+        want = _weights(location, bonus)
+        counts = loot_table(location, bonus).counts_n(draws)
+        assert set(counts) <= set(want)
+        for item, p in want.items():
+            # 5 standard deviations of a binomial count, plus a little slack for the rarest items
+            tol = 5 * (draws * p * (1 - p)) ** 0.5 + 5
+            assert abs(counts.get(item, 0) - draws * p) < tol
@@ -0,0 +1,51 @@
+# tests/test_leveling.py
+import random
+
+from utils import leveling
+from utils.leveling import CURVES, Curve
+
+
+def _slow_apply(curve, level, xp, amount):
+    """The per-level loop the table replaces."""
+    xp += amount
+    while level < leveling.MAX_LEVEL and xp >= curve.to_next(level):
+        xp -= curve.to_next(level)
+        level += 1
+    return level, xp
+
+
+def test_apply_matches_the_level_by_level_loop():
+    rnd = random.Random(49)
+    for curve in CURVES.values():
+        for _ in range(300):
+            level = rnd.randint(1, 50)
+            xp = rnd.randrange(curve.to_next(level))
+            amount = rnd.choice([0, 1, rnd.randint(1, 500), rnd.randint(1, 10 ** 6)])
+            assert curve.apply(level, xp, amount) == _slow_apply(curve, level, xp, amount)
+
+
+def test_table_grows_past_its_first_levels():
+    curve = Curve("linear", lambda level: 10 * level)
+    start = len(curve._cum)
+    total = curve.start(leveling.TABLE_LEVELS + 500) + 7
+    assert len(curve._cum) > start
+    assert curve.level_at(total) == (leveling.TABLE_LEVELS + 500, 7)
+
+
+def test_max_level_keeps_the_extra_xp(monkeypatch):
+    monkeypatch.setattr(leveling, "MAX_LEVEL", 20)
+    curve = Curve("linear", lambda level: 10 * level)
+    level, xp = curve.apply(1, 0, 10 ** 6)
+    assert level == 20 and xp == 10 ** 6 - curve.start(20)
+
+
+def test_lost_xp_never_costs_a_level():
+    assert CURVES["linear"].apply(5, 3, -10) == (5, -7)
+
+
+def test_switching_curves_keeps_level_and_progress():
+    lin, quad = CURVES["linear"], CURVES["quadratic"]
+    level, xp = lin.apply(1, 0, 1234)
+    assert quad.apply(level, xp, 0) == (level, xp)
+    # the next level up costs what the new curve says
+    assert quad.apply(level, xp, quad.to_next(level) - xp) == (level + 1, 0)
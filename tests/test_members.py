@@ -0,0 +1,51 @@
+# tests/test_members.py
+import asyncio
+from types import SimpleNamespace
+
+from constants import BRETT_RESPONSES
+from utils import members
+
+
+class _Guild:
+    """No member cache (BOT_LOW_MEMORY=1): every lookup is a gateway query."""
+
+    id = 7
+    chunked = False
+
+    def __init__(self, member_ids):
+        self._ids = set(member_ids)
+        self.queried = []
+
+    def get_member(self, uid):
+        return None
+
+    async def query_members(self, user_ids, cache):
+        self.queried += user_ids
+        return [SimpleNamespace(id=u, display_name=f"u{u}") for u in user_ids if u in self._ids]
+
+
+def test_in_guild_only_queries_users_seen_there(store):
+    store.record_roll(7, 1, BRETT_RESPONSES[0])
+    store.record_roll(7, 2, BRETT_RESPONSES[0])
+    store.record_roll(8, 3, BRETT_RESPONSES[0])
+    guild = _Guild({1, 3})
+    seen = set(store.guild_seen(7))
+    assert asyncio.run(members.in_guild(guild, [1, 2, 3], seen)) == {1}
+    assert sorted(guild.queried) == [1, 2]
+
+
+def test_role_members_without_a_member_cache():
+    class Member(SimpleNamespace):
+        def get_role(self, rid):
+            return rid if rid in self.roles else None
+
+    class Guild:
+        chunked = False
+
+        async def chunk(self, cache):
+            assert cache is False
+            return [Member(id=1, roles={5}), Member(id=2, roles=set()), Member(id=3, roles={5, 6})]
+
+    # role.members reads the (empty) member cache
+    role = SimpleNamespace(id=5, members=[])
+    assert [m.id for m in asyncio.run(members.role_members(Guild(), role))] == [1, 3]
@@ -0,0 +1,95 @@
+# tests/test_outbox.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from discord.ext import commands
+
+from utils import outbox
+from utils.outbox import BULK, INTERACTIVE, Outbox
+from utils.ratelimit import Rule
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Messages that reached Discord, in order; each send returns its own stand-in Message."""
+    out = []
+
+    async def fake_send(ctx, content=None, **kwargs):
+        if content == "boom":
+            raise RuntimeError("send failed")
+        out.append((content, kwargs))
+        return SimpleNamespace(n=len(out), content=content)
+
+    monkeypatch.setattr(commands.Context, "send", fake_send)
+    return out
+
+
+def _ctx(cid=1):
+    return SimpleNamespace(channel=SimpleNamespace(id=cid))
+
+
+def test_short_replies_merge_into_one_message(sent):
+    box = Outbox(Rule(100, 1))
+
+    async def main():
+        return await asyncio.gather(*(box.send(_ctx(), c, {}) for c in ("a", "b", "c")))
+
+    msgs = asyncio.run(main())
+    assert sent == [("a\nb\nc", {})]
+    assert msgs[0] is msgs[1] is msgs[2]   # every caller gets the merged message
+    assert (box.sent, box.merged, len(box)) == (1, 2, 0)
+
+
+def test_merge_limits(sent):
+    box = Outbox(Rule(100, 1))
+    long = "y" * (outbox.COALESCE_MAX + 1)
+    fill = "x" * outbox.COALESCE_MAX
+
+    async def main():
+        await asyncio.gather(box.send(_ctx(), "a", {}), box.send(_ctx(), long, {}),
+                             box.send(_ctx(), "b", {"delete_after": 5}), box.send(_ctx(), "c", {}),
+                             *(box.send(_ctx(), fill, {}) for _ in range(5)))
+
+    asyncio.run(main())
+    # too long, or sent with options: on its own; a merged message never passes MESSAGE_MAX
+    assert [c for c, _ in sent] == ["a", long, "b", "\n".join(["c"] + [fill] * 4), fill]
+    assert sent[2][1] == {"delete_after": 5}
+    assert all(len(c) <= outbox.MESSAGE_MAX for c, _ in sent)
+
+
+def test_interactive_replies_go_before_bulk(sent):
+    box = Outbox(Rule(100, 1))
+
+    async def main():
+        await asyncio.gather(box.send(_ctx(), "board 1", {}, BULK), box.send(_ctx(), "board 2", {}, BULK),
+                             box.send(_ctx(), "pong", {}, INTERACTIVE))
+
+    asyncio.run(main())
+    # bulk output is never merged, and waits for interactive replies queued with it
+    assert [c for c, _ in sent] == ["pong", "board 1", "board 2"]
+
+
+def test_each_caller_gets_its_own_outcome(sent):
+    box = Outbox(Rule(1, 60))   # one send, then the channel is out of budget
+
+    async def main():
+        first = await box.send(_ctx(), "first", {})
+        gone = asyncio.ensure_future(box.send(_ctx(), "gone", {}))
+        other = asyncio.ensure_future(box.send(_ctx(2), "other channel", {}))
+        await asyncio.sleep(0)
+        gone.cancel()
+        return first, await other
+
+    first, other = asyncio.run(main())
+    assert first.content == "first" and other.content == "other channel"
+    assert [c for c, _ in sent] == ["first", "other channel"]   # the cancelled reply never went out
+
+    box = Outbox(Rule(100, 1))
+
+    async def failing():
+        return await asyncio.gather(box.send(_ctx(), "boom", {"embed": None}), box.send(_ctx(), "fine", {}),
+                                    return_exceptions=True)
+
+    err, ok = asyncio.run(failing())
+    assert isinstance(err, RuntimeError) and ok.content == "fine"
@@ -0,0 +1,47 @@
+# tests/test_prefixes.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import prefixes
+
+BOT = SimpleNamespace(user=SimpleNamespace(id=42), all_commands={"fish": None, "brett": None})
+
+
+def could(content, guild=1):
+    msg = SimpleNamespace(content=content, guild=SimpleNamespace(id=guild) if guild else None)
+    return prefixes.could_be_command(BOT, msg)
+
+
+@pytest.fixture
+def fresh(store, monkeypatch):
+    monkeypatch.setattr(prefixes, "_CACHE", None)
+    monkeypatch.setattr(prefixes, "_FIRST", frozenset("!<"))
+    return store
+
+
+def test_custom_prefix(fresh):
+    prefixes.load()
+    assert asyncio.run(prefixes.set_prefix(1, "??")) == "??"
+    assert could("??fish 3 river")
+    assert not could("!fish")                  # this guild changed its prefix
+    assert not could("??nope") and not could("?? fish") and not could("hello")
+    assert could("!brett", guild=2) and not could("??brett", guild=2)
+    assert could("!fish", guild=None)          # DMs use the default
+    assert asyncio.run(prefixes.set_prefix(1, None)) == "!" and could("!fish")
+
+
+def test_mention_prefix(fresh):
+    prefixes.load()
+    assert could("<@42> fish") and could("<@!42> brett")
+    assert not could("<@7> fish")              # someone else
+    assert not could("<@42> hello") and not could("<@42>fish")
+
+
+def test_before_the_first_load(fresh):
+    fresh.set_prefix(1, "$")                   # stored by another process; nothing cached here yet
+    assert prefixes._CACHE is None
+    assert could("$fish")
+    assert prefixes._CACHE == {1: "$"} and "$" in prefixes._FIRST
+    assert not could("%fish")
@@ -0,0 +1,46 @@
+# tests/test_quests.py
+from utils import brettventures, economy, quests
+
+DAY = 86400
+T0 = 1_700_000_000 - 1_700_000_000 % DAY + 10 * 3600
+
+
+def _progress(p, qid, now=T0):
+    return next((n, done) for q, n, done in quests.status(p, now) if q.id == qid)
+
+
+def test_progress_completes_once_and_caps_at_the_goal():
+    p = {}
+    assert quests.emit(p, "fish", 15, T0) == []
+    assert _progress(p, "d_fish") == (15, False)
+    assert [q.id for q in quests.emit(p, "fish", 10, T0)] == ["d_fish"]
+    assert _progress(p, "d_fish") == (20, True)
+    assert quests.emit(p, "fish", 5, T0) == []    # done quests don't complete again
+
+
+def test_daily_progress_resets_with_the_period():
+    p = {}
+    quests.emit(p, "explore", 2, T0)
+    assert _progress(p, "d_explore", T0 + DAY) == (0, False)
+    quests.emit(p, "explore", 1, T0 + DAY)
+    assert _progress(p, "d_explore", T0 + DAY) == (1, False)
+
+
+def test_matched_quests_only_count_their_outcome():
+    p = {}
+    quests.emit(p, "roll", 1, T0, outcome="Nah.")
+    quests.emit(p, "roll", 1, T0, outcome="You betcha.")
+    assert _progress(p, "d_roll") == (2, False)
+    assert _progress(p, "w_betcha") == (1, False)
+    assert _progress(p, "o_nah") == (1, False)
+    assert quests.emit(p, "no_such_event", 1, T0) == [] and quests.interested("no_such_event", {}) == []
+
+
+def test_completion_pays_the_reward(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    assert quests.quest_event(1, "explore", 2) == []
+    assert quests.quest_event(1, "explore") == ["Go exploring 3 times"]
+    assert economy.econ_balance(1) == quests.BY_ID["d_explore"].reward
+    done = {q["id"]: q for q in quests.quest_status(1)}["d_explore"]
+    assert done["progress"] == 3 and done["done"]
+    assert quests.quest_event(2, "explore") == []   # no character, no quests
@@ -0,0 +1,57 @@
+# tests/test_ranking.py
+import random
+
+from utils import ranking
+from utils.ranking import RankIndex
+
+
+def _expected(scores):
+    """(rank, uid, score) rows the slow way: sort everything, ties share a rank."""
+    keys = sorted((-s, u) for u, s in scores.items() if s > 0)
+    rows = []
+    for i, (neg, uid) in enumerate(keys):
+        rank = rows[-1][0] if rows and rows[-1][2] == -neg else i + 1
+        rows.append((rank, uid, -neg))
+    return rows
+
+
+def _check(ix, scores):
+    rows = _expected(scores)
+    assert len(ix) == len(rows)
+    assert ix.rows(0, len(rows) + 5) == rows
+    for pos, (rank, uid, score) in enumerate(rows):
+        assert ix.rank(uid) == rank
+        assert ix.position(uid) == pos
+        assert ix.rows(pos, 3) == rows[pos:pos + 3]
+        assert ix.rank_of_score(score) == rank
+    for uid, s in scores.items():
+        if s <= 0:
+            assert ix.rank(uid) is None and ix.position(uid) is None
+
+
+def test_rank_index_matches_a_full_sort(monkeypatch):
+    # Small blocks so inserts split blocks and removals empty them
+    monkeypatch.setattr(ranking, "LOAD", 4)
+    rnd = random.Random(7)
+    scores = {u: rnd.randint(0, 6) for u in range(40)}
+    ix = RankIndex(scores.items())
+    _check(ix, scores)
+    for _ in range(400):
+        uid, score = rnd.randrange(60), rnd.randint(0, 6)
+        ix.set(uid, score)
+        scores[uid] = score
+        _check(ix, scores)
+    for uid in list(scores):
+        ix.set(uid, 0)
+        scores[uid] = 0
+    _check(ix, scores)
+    assert ix.rows(0, 10) == []
+
+
+def test_rank_of_score_for_unlisted_scores():
+    ix = RankIndex([(1, 10), (2, 10), (3, 5)])
+    assert ix.rank_of_score(11) == 1
+    assert ix.rank_of_score(10) == 1
+    assert ix.rank_of_score(7) == 3
+    assert ix.rank_of_score(1) == 4
+    assert ix.rows(-1, 2) == [] and ix.rows(3, 2) == [] and ix.rows(0, 0) == []
@@ -0,0 +1,60 @@
+# tests/test_ratelimit.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from discord.ext import commands
+
+from utils import ratelimit
+from utils.ratelimit import MemoryBackend, Rule, SQLiteBackend
+
+
+def test_gcra_paces_after_the_burst():
+    b, rule = MemoryBackend(), Rule(2, 10, burst=3)   # one use per 5s, three at once
+    t = 1000.0
+    assert [b.hit("k", rule.interval, rule.tolerance, t) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert b.hit("k", rule.interval, rule.tolerance, t) == pytest.approx(5.0)
+    assert b.hit("k", rule.interval, rule.tolerance, t + 4.9) == pytest.approx(0.1)
+    assert b.hit("k", rule.interval, rule.tolerance, t + 5) == 0.0
+    # back on the schedule: the next use is 5s later, not a fresh burst
+    assert b.hit("k", rule.interval, rule.tolerance, t + 5) > 0
+    assert b.hit("k", rule.interval, rule.tolerance, t + 10) == 0.0
+
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryBackend(), lambda tmp: SQLiteBackend(str(tmp / "rl.db"))])
+def test_denied_checks_spend_nothing(make, tmp_path):
+    b = make(tmp_path)
+    t = 1000.0
+    assert b.hit("guild", 10, 0, t) == 0.0
+    # the user's own limit allows it, the guild budget doesn't: neither is spent
+    assert b.hit_all([("user", 10, 0), ("guild", 10, 0)], t + 1) == [0.0, pytest.approx(9.0)]
+    assert b.hit("user", 10, 0, t + 1) == 0.0
+    assert b.hit("user", 10, 0, t + 1) == pytest.approx(10.0)
+
+
+def test_before_invoke_spends_nothing_on_denial(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_BACKEND", MemoryBackend())
+    monkeypatch.setattr(ratelimit, "GUILD_BUDGET", Rule(1, 60))
+    monkeypatch.setattr(ratelimit, "GLOBAL_BUDGET", None)
+    cmd = SimpleNamespace(qualified_name="fish", callback=None, extras={"rate_limits": [Rule(1, 15)]})
+
+    def ctx(uid):
+        return SimpleNamespace(command=cmd, author=SimpleNamespace(id=uid),
+                               guild=SimpleNamespace(id=9), channel=SimpleNamespace(id=5))
+
+    asyncio.run(ratelimit.before_invoke(ctx(1)))
+    with pytest.raises(commands.CommandOnCooldown) as err:
+        asyncio.run(ratelimit.before_invoke(ctx(2)))
+    assert err.value.retry_after > 15   # the longer (guild) wait is the one reported
+    assert "cmd:fish:user:2" not in ratelimit._BACKEND._tat
+
+
+def test_memory_backend_evicts_past_a_long_lived_key():
+    b = MemoryBackend()
+    b.hit("slow", 3600, 0, 0.0)
+    for i in range(100):
+        b.hit(f"fast{i}", 1, 0, 0.0)
+    assert len(b) == 101
+    b.hit("other", 1, 0, 10.0)
+    # every expired key goes, even though "slow" was hit first and is still live
+    assert len(b) == 2 and sorted(b._tat) == ["other", "slow"]
@@ -0,0 +1,43 @@
+# tests/test_stats.py
+import pytest
+
+from constants import BRETT_RESPONSES
+
+
+def test_chart_keys_change_across_reset(store):
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    before = store.get_user_stats(1)
+    store.reset_stats(BRETT_RESPONSES)
+    store.record_roll(1, 1, BRETT_RESPONSES[1])
+    after = store.get_user_stats(1)
+    # "v" starts over with the new store; the epoch is what tells them apart
+    assert after["v"] == before["v"]
+    assert after["epoch"] != before["epoch"]
+    assert store.get_global_stats(BRETT_RESPONSES)["epoch"] == after["epoch"]
+
+
+def test_load_stats_never_wipes_the_store(store):
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    root = store._root()
+    root["users"]["2"] = "not a record"
+    store._NORMALIZED_FOR.clear()
+    assert store.load_stats(BRETT_RESPONSES)["users"]["1"]["total"] == 1   # the bad record is skipped
+    root["global"] = []
+    store._NORMALIZED_FOR.clear()
+    with pytest.raises(Exception):
+        store.load_stats(BRETT_RESPONSES)
+    assert store._root()["users"]["1"]["total"] == 1
+    root["global"] = {}
+    root["users"].pop("2")
+
+
+def test_reset_user_stats_keeps_achievements(store):
+    unlocked = [a for _ in range(10) for a in store.record_roll(1, 1, BRETT_RESPONSES[0])]
+    assert "rolls_10" in unlocked
+    bits = store._root()["users"]["1"]["ach"]
+    store.reset_user_stats(1, BRETT_RESPONSES)
+    assert store.get_user_stats(1)["total"] == 0
+    assert store._root()["users"]["1"]["ach"] == bits
+    # earning it again isn't news
+    again = [a for _ in range(10) for a in store.record_roll(1, 1, BRETT_RESPONSES[0])]
+    assert "rolls_10" not in again
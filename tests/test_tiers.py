@@ -0,0 +1,132 @@
+# tests/test_tiers.py
+import os
+import time
+
+from constants import BRETT_RESPONSES
+from utils import brettventures, tiers
+
+FAR = time.time() + 10 * tiers.COLD_AFTER
+
+
+def _demote_all(store):
+    moved = store._sweep_tiers(now=FAR, force=True)
+    store.flush()
+    return moved
+
+
+def test_resetstats_keeps_cold_players(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    assert _demote_all(store) == 2
+    store.reset_stats(BRETT_RESPONSES)
+    assert store.get_user_stats(1) is None
+    assert brettventures.bv_get_player(1)["name"] == "one"
+
+
+def _snapshot(store):
+    pid, _ = store.take_snapshot()
+    if pid:
+        os.waitpid(pid, 0)
+    time.sleep(1.01 - time.time() % 1)   # snapshot names carry whole seconds
+
+
+def _xp(p):
+    return (p["level"], p["xp"])
+
+
+def test_recovery_from_snapshot_ignores_newer_cold_rows(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    _demote_all(store)
+    _snapshot(store)   # player cold in the snapshot
+    brettventures.bv_add_xp(1, 3)
+    expected = _xp(brettventures.bv_get_player(1))
+    _demote_all(store)   # a newer cold row, already including the XP
+    with open(store.STATS_FILE, "w") as f:
+        f.write("{not json")
+    store.invalidate_cache()
+    # snapshot + journal replay: the XP is applied once, onto the player as of the snapshot
+    assert _xp(brettventures.bv_get_player(1)) == expected
+
+
+def test_versions_migrate_from_unversioned_rows(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "cold.sqlite")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE cold (gen INTEGER NOT NULL, ns TEXT NOT NULL, uid TEXT NOT NULL, blob BLOB, "
+               "UNIQUE (gen, ns, uid))")
+    db.executemany("INSERT INTO cold VALUES (?, ?, ?, ?)",
+                   [(1, "users", "b", tiers._encode({"n": 2})), (1, "users", "a", None)])
+    db.commit()
+    db.close()
+    cold = tiers.ColdStore(path)
+    assert cold.count(1, "users") == 2
+    assert [uid for _, uid, _ in cold.page(1, "users")] == ["b", "a"]
+    assert cold.get(1, "users", "b") == {"n": 2} and cold.get(1, "users", "a") is None
+    cold.close()
+
+
+def _rolls(store):
+    return store.get_user_stats(1)["total"]
+
+
+def test_restore_point_reads_cold_tier_as_of_snapshot(store):
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    _demote_all(store)
+    _snapshot(store)   # user cold in the snapshot
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    time.sleep(0.01)
+    at = time.time()
+    time.sleep(0.01)
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    _demote_all(store)   # the newest cold row has all three rolls
+    store.restore_point(at)
+    assert _rolls(store) == 2
+
+
+def test_restore_point_keeps_other_timelines(store):
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    _demote_all(store)
+    _snapshot(store)
+    time.sleep(0.01)
+    before = time.time()
+    store.record_roll(1, 1, BRETT_RESPONSES[0])
+    _demote_all(store)
+    _snapshot(store)
+    time.sleep(0.01)
+    later = time.time()
+    time.sleep(0.01)
+    store.restore_point(before)
+    assert _rolls(store) == 1
+    store.restore_point(later)   # forward again, to the timeline that was rolled back
+    assert _rolls(store) == 2
+
+
+def test_restore_point_leaves_adventurers_alone(store):
+    brettventures.bv_get_or_create_player(1, "one")
+    _demote_all(store)
+    _snapshot(store)
+    time.sleep(0.01)
+    at = time.time()
+    time.sleep(0.01)
+    brettventures.bv_add_xp(1, 3)
+    expected = _xp(brettventures.bv_get_player(1))
+    _demote_all(store)   # cold, with the XP
+    gens = store._cold()._db.execute("SELECT COUNT(DISTINCT gen) FROM reg WHERE ns = 'players'").fetchone()[0]
+    store.restore_point(at)
+    assert _xp(brettventures.bv_get_player(1)) == expected
+    # The players fork the replay ran on is gone again
+    assert store._cold()._db.execute("SELECT COUNT(DISTINCT gen) FROM reg WHERE ns = 'players'").fetchone()[0] == gens
+
+
+def test_prune_keeps_what_snapshots_need(tmp_path):
+    seq = [0]
+    cold = tiers.ColdStore(str(tmp_path / "cold.sqlite"), clock=lambda: seq[0])
+    gen = cold.new_gen()
+    cold.register(gen, "users", ["a"])
+    for seq[0] in (1, 5, 9):
+        cold.put(gen, "users", [("a", {"at": seq[0]})])
+    cold.prune(6)
+    assert cold.get(cold.fork(gen, "users", 6), "users", "a") == {"at": 5}
+    assert cold.get(cold.fork(gen, "users", 4), "users", "a") is None   # no snapshot this old is kept
+    assert cold.get(gen, "users", "a") == {"at": 9}
+    cold.close()
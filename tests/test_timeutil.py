@@ -0,0 +1,43 @@
+# tests/test_timeutil.py
+import calendar
+
+import pytest
+
+from utils.timeutil import Cron
+
+
+def _ts(*tm):
+    """Unix time of a UTC (year, month, day, hour, minute)."""
+    return float(calendar.timegm((*tm, 0, 0, 0, 0)))
+
+
+@pytest.mark.parametrize("spec, after, expected", [
+    ("@hourly", (2024, 1, 1, 10, 0), (2024, 1, 1, 11, 0)),       # strictly after, even on a match
+    ("@hourly", (2024, 1, 1, 10, 59), (2024, 1, 1, 11, 0)),
+    ("@daily", (2024, 12, 31, 23, 30), (2025, 1, 1, 0, 0)),      # year rollover
+    ("@weekly", (2024, 1, 1, 0, 0), (2024, 1, 7, 0, 0)),         # 2024-01-01 is a Monday
+    ("@monthly", (2024, 1, 31, 12, 0), (2024, 2, 1, 0, 0)),
+    ("*/15 * * * *", (2024, 1, 1, 10, 16), (2024, 1, 1, 10, 30)),
+    ("30 9-17/4 * * *", (2024, 1, 1, 13, 31), (2024, 1, 1, 17, 30)),
+    ("0 0 29 2 *", (2023, 3, 1, 0, 0), (2024, 2, 29, 0, 0)),     # leap day
+    ("0 12 * * 7", (2024, 1, 1, 0, 0), (2024, 1, 7, 12, 0)),     # 7 is Sunday too
+    ("0 0 13 * 5", (2024, 1, 1, 0, 0), (2024, 1, 5, 0, 0)),      # day and weekday: either matches
+    ("5 4 * * 1-5", (2024, 1, 5, 4, 5), (2024, 1, 8, 4, 5)),     # Friday -> Monday
+])
+def test_next_after(spec, after, expected):
+    assert Cron(spec).next_after(_ts(*after)) == _ts(*expected)
+
+
+def test_next_after_mid_minute():
+    assert Cron("* * * * *").next_after(_ts(2024, 1, 1, 10, 0) + 59.9) == _ts(2024, 1, 1, 10, 1)
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "60 * * * *", "0 0 32 * *", "5-1 * * * *", "*/0 * * * *"])
+def test_bad_specs(spec):
+    with pytest.raises(ValueError):
+        Cron(spec)
+
+
+def test_spec_that_never_fires():
+    with pytest.raises(ValueError):
+        Cron("0 0 31 2 *").next_after(_ts(2024, 1, 1, 0, 0))
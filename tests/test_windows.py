@@ -0,0 +1,53 @@
+# tests/test_windows.py
+from utils import windows
+
+DAY = 86400
+T0 = 1_700_000_000 - 1_700_000_000 % DAY + 10 * 3600   # a UTC day at 10:00
+
+
+def test_day_bucket_rolls_over_at_midnight():
+    node = {}
+    windows.bump(node, T0, "Yes")
+    windows.bump(node, T0 + 3600, "Nah.")
+    assert windows.current(node, "day", T0 + 7200) == {"total": 2, "outcomes": {"Yes": 1, "Nah.": 1}, "users": {}}
+    tomorrow = T0 + DAY
+    assert windows.current(node, "day", tomorrow)["total"] == 0
+    windows.bump(node, tomorrow, "Yes")
+    assert windows.current(node, "day", tomorrow)["total"] == 1
+    # the ring keeps eight days: yesterday's bucket is still there until its slot comes round
+    assert windows.current(node, "day", T0)["total"] == 2
+    windows.bump(node, T0 + 8 * DAY, "Yes")
+    assert windows.current(node, "day", T0)["total"] == 0
+
+
+def test_late_event_never_clobbers_a_newer_bucket():
+    node = {}
+    windows.bump(node, T0 + 8 * DAY, "Yes")
+    windows.bump(node, T0, "Nah.")        # same slot, eight days older
+    assert windows.current(node, "day", T0 + 8 * DAY)["outcomes"] == {"Yes": 1}
+
+
+def test_last_24h_sums_the_hour_ring():
+    node = {}
+    for h in range(30):
+        windows.bump(node, T0 + h * 3600, "Yes")
+    assert windows.current(node, None, T0 + 29 * 3600)["total"] == 24
+
+
+def test_top_users_for_the_current_bucket():
+    scope = {}
+    for uid, n in ((1, 3), (2, 5), (3, 1), (4, 5)):
+        for _ in range(n):
+            windows.bump(scope, T0, "Yes", uid)
+    assert windows.top_users(scope, "day", 3, T0) == [(5, 4), (5, 2), (3, 1)]
+    assert windows.top_users(scope, "week", 10, T0)[-1] == (1, 3)
+    assert windows.top_users(scope, "day", 10, T0 + DAY) == []
+    # hours keep totals only
+    assert windows.current(scope, "hour", T0)["users"] == {}
+
+
+def test_expire_drops_buckets_out_of_range():
+    node = {}
+    windows.bump(node, T0, "Yes")
+    assert windows.expire(node, T0 + 3600) == 0
+    assert windows.expire(node, T0 + 90 * DAY) == 4 and "win" not in node
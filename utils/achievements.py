@@ -0,0 +1,232 @@
+# utils/achievements.py
+"""
+Achievement definitions, the counter -> threshold index that detects unlocks,
+and the per-channel batching of unlock announcements.
+
+Achievements are data (ACHIEVEMENTS below): "counter reached threshold", over
+the counters storage already keeps:
+
+    rolls            a user's total rolls
+    outcome:<name>   how often they rolled one outcome
+    streak           their daily roll streak
+    battle_wins      Brett Battle wins
+    level            Brettventures level
+
+At import they are compiled into one sorted threshold list per counter, so a
+counter moving from `old` to `new` finds what it crossed with one bisect
+(crossed()), and in the usual case of crossing nothing, that bisect is the
+whole cost. Nothing ever scans users or the achievement list.
+
+Unlocks are stored as a bitset (an int, "ach") on the record that owns the
+counter: the roll stats record for rolls/outcomes/streaks, the battle record
+for wins, the Brettventures player for levels. Every achievement has its own
+fixed bit, so a user's full set is those ints OR'd together. Bits are
+persisted: never renumber or reuse one.
+"""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from constants import BRETT_RESPONSES, MILESTONES
+
+
+class Achievement(NamedTuple):
+    bit: int
+    id: str
+    name: str
+    counter: str
+    threshold: int
+
+
+def _series(base: int, counter: str, thresholds: Iterable[int], name: str, slug: str) -> List[Achievement]:
+    # Bits base, base+1, ... in threshold order; a series may only grow at the end
+    return [Achievement(base + i, f"{slug}_{t}", name.format(n=t), counter, t)
+            for i, t in enumerate(thresholds)]
+
+
+ACHIEVEMENTS: List[Achievement] = [
+    *_series(0, "rolls", MILESTONES, "{n:,} rolls", "rolls"),                        # bits 0-31
+    *_series(32, "streak", (3, 7, 30, 100, 365), "{n}-day streak", "streak"),         # 32-39
+    *_series(40, "battle_wins", (1, 10, 50, 100, 500), "{n} battle win(s)", "wins"),  # 40-47
+    *_series(48, "level", (5, 10, 20, 50), "Level {n}", "level"),                     # 48-55
+]
+# Two per outcome from bit 64, in BRETT_RESPONSES order: only append outcomes
+for _i, _o in enumerate(BRETT_RESPONSES):
+    ACHIEVEMENTS += _series(64 + 2 * _i, "outcome:" + _o, (100, 1000), f"“{_o}” ×{{n:,}}", f"outcome{_i}")
+
+BY_ID: Dict[str, Achievement] = {a.id: a for a in ACHIEVEMENTS}
+
+
+def _compile(achievements: List[Achievement]) -> Dict[str, Tuple[List[int], List[Achievement]]]:
+    index: Dict[str, List[Achievement]] = {}
+    for a in achievements:
+        index.setdefault(a.counter, []).append(a)
+    out = {}
+    for counter, items in index.items():
+        items.sort(key=lambda a: a.threshold)
+        out[counter] = ([a.threshold for a in items], items)
+    return out
+
+
+INDEX = _compile(ACHIEVEMENTS)
+
+
+def crossed(counter: str, old: int, new: int) -> List[Achievement]:
+    """Achievements whose threshold lies in (old, new]."""
+    entry = INDEX.get(counter)
+    if entry is None or new <= old:
+        return []
+    thresholds, items = entry
+    i = bisect_right(thresholds, old)
+    if i == len(thresholds) or thresholds[i] > new:
+        return []
+    return items[i:bisect_right(thresholds, new, i)]
+
+
+def reached(counter: str, value: int) -> List[Achievement]:
+    """Every achievement of this counter at or below `value`."""
+    entry = INDEX.get(counter)
+    if entry is None:
+        return []
+    thresholds, items = entry
+    return items[:bisect_right(thresholds, value)]
+
+
+def next_threshold(counter: str, value: int) -> int | None:
+    """The next threshold above `value` for this counter, if any."""
+    entry = INDEX.get(counter)
+    if entry is None:
+        return None
+    thresholds, _ = entry
+    i = bisect_right(thresholds, value)
+    return thresholds[i] if i < len(thresholds) else None
+
+
+def bits_of(achievements: Iterable[Achievement]) -> int:
+    bits = 0
+    for a in achievements:
+        bits |= 1 << a.bit
+    return bits
+
+
+def unpack(bits: int) -> List[Achievement]:
+    """The achievements set in a bitset, in definition order."""
+    return [a for a in ACHIEVEMENTS if bits >> a.bit & 1]
+
+
+# ---- counters, per record kind ----
+def user_counters(u: Dict[str, Any]) -> Dict[str, int]:
+    out = {"rolls": int(u.get("total", 0)), "streak": int(u.get("streak_days", 0))}
+    for name, n in u.get("outcomes", {}).items():
+        out["outcome:" + name] = int(n)
+    return out
+
+
+def battler_counters(p: Dict[str, Any]) -> Dict[str, int]:
+    return {"battle_wins": int(p.get("w", 0))}
+
+
+def player_counters(p: Dict[str, Any]) -> Dict[str, int]:
+    return {"level": int(p.get("level", 1))}
+
+
+def bits_for(rec: Dict[str, Any] | None, counters: Callable[[Dict[str, Any]], Dict[str, int]]) -> int:
+    """A record's unlock bits; one that predates achievements counts what it has reached."""
+    if not rec:
+        return 0
+    if "ach" in rec:
+        return int(rec["ach"])
+    return bits_of(a for counter, value in counters(rec).items() for a in reached(counter, value))
+
+
+def unlock(rec: Dict[str, Any], counters: Callable[[Dict[str, Any]], Dict[str, int]],
+           changes: Iterable[Tuple[str, int, int]]) -> List[str]:
+    """
+    Set the bits for the thresholds each (counter, old, new) change crossed on
+    `rec`; returns the ids newly set. A record without "ach" yet is first
+    credited with everything its counters(rec) had already reached, silently,
+    so only this change's unlocks are news.
+    """
+    hits = [a for counter, old, new in changes for a in crossed(counter, old, new)]
+    if "ach" not in rec:
+        base = 0
+        for counter, value in counters(rec).items():
+            base |= bits_of(reached(counter, value))
+        rec["ach"] = base & ~bits_of(hits)
+    if not hits:
+        return []
+    bits, new = int(rec["ach"]), []
+    for a in hits:
+        if not bits >> a.bit & 1:
+            bits |= 1 << a.bit
+            new.append(a.id)
+    rec["ach"] = bits
+    return new
+
+
+# ---- announcements ----
+# Unlocks are collected per channel for ANNOUNCE_DELAY and go out as one
+# message (a tournament round or !doublebrett can unlock several at once).
+# The message goes through the newest context queued for the channel (the
+# first may be a slash command whose interaction has since expired), then
+# straight to the channel if that fails. drain() sends whatever is still
+# waiting when the bot shuts down. A lost announcement loses no unlock: the
+# bits are already stored and !achievements shows them.
+ANNOUNCE_DELAY = 1.0
+
+_PENDING: Dict[int, Tuple[Any, Dict[int, List[str]]]] = {}
+_TASKS: Set[asyncio.Task] = set()
+
+
+def announce(ctx, user_id: int, ids: Iterable[str]) -> None:
+    """Queue unlock announcements for the context's channel."""
+    ids = [i for i in ids if i in BY_ID]
+    if not ids:
+        return
+    cid = ctx.channel.id
+    entry = _PENDING.get(cid)
+    if entry is None:
+        task = asyncio.create_task(_flush(cid))
+        _TASKS.add(task)
+        task.add_done_callback(_TASKS.discard)
+        unlocked = {}
+    else:
+        unlocked = entry[1]
+    _PENDING[cid] = (ctx, unlocked)
+    unlocked.setdefault(int(user_id), []).extend(ids)
+
+
+async def _flush(cid: int) -> None:
+    await asyncio.sleep(ANNOUNCE_DELAY)
+    await _deliver(cid)
+
+
+async def _deliver(cid: int) -> None:
+    ctx, unlocked = _PENDING.pop(cid, (None, None))
+    if not unlocked:
+        return
+    from utils.members import display_names
+    try:
+        names = await display_names(ctx.bot, ctx.guild, list(unlocked)) if ctx.guild else {}
+    except Exception:
+        names = {}
+    lines = []
+    for uid, ids in unlocked.items():
+        got = ", ".join(f"**{BY_ID[i].name}**" for i in ids)
+        lines.append(f"🏅 {names.get(uid, 'Someone')} unlocked {got}")
+    text = "\n".join(lines)
+    try:
+        await ctx.send(text)
+    except Exception:
+        try:
+            await ctx.channel.send(text)
+        except Exception as e:
+            print(f"[ACHIEVEMENTS] announcement of {sum(map(len, unlocked.values()))} unlock(s) "
+                  f"in channel {cid} failed: {e}")
+
+
+async def drain() -> None:
+    """Send every queued announcement now instead of after ANNOUNCE_DELAY (shutdown)."""
+    await asyncio.gather(*(_deliver(cid) for cid in list(_PENDING)))
@@ -0,0 +1,169 @@
+# utils/battles.py
+"""
+Brett Battle results: win/loss/tie records, head-to-head tallies and Elo.
+
+Everything lives under root["battles"]:
+
+    {"players": {uid: {"w": 3, "l": 1, "t": 0, "elo": 1032.5}},
+     "h2h": {"<lo uid>:<hi uid>": [lo wins, hi wins, ties]}}
+
+Head-to-head is sparse: only pairs that have actually met get a key, so it
+grows with the number of distinct matchups, never players squared.
+
+record_battles, battle_stats and battle_ratings at the bottom are the store
+ops the cogs call.
+"""
+from __future__ import annotations
+
+import os
+import random
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from utils import achievements, storage
+from utils.storage import _journaled, _remote
+
+ELO_START = float(os.getenv("BATTLE_ELO_START", "1000"))
+ELO_K = float(os.getenv("BATTLE_ELO_K", "32"))
+
+# result of a battle from the first player's side
+WIN, LOSS, TIE = 1.0, 0.0, 0.5
+
+
+def node(root: Dict[str, Any]) -> Dict[str, Any]:
+    b = root.setdefault("battles", {})
+    b.setdefault("players", {})
+    b.setdefault("h2h", {})
+    return b
+
+
+def _player(b: Dict[str, Any], uid: str) -> Dict[str, Any]:
+    p = b["players"].get(uid)
+    if p is None:
+        p = b["players"][uid] = {"w": 0, "l": 0, "t": 0, "elo": ELO_START}
+    return p
+
+
+def pair_key(a: int | str, b: int | str) -> Tuple[str, bool]:
+    """(h2h key, whether `a` is the low side)."""
+    a, b = int(a), int(b)
+    return (f"{a}:{b}", True) if a < b else (f"{b}:{a}", False)
+
+
+def expected(ra: float, rb: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((rb - ra) / 400.0))
+
+
+def record(b: Dict[str, Any], a: int | str, c: int | str, result: float) -> Dict[str, Any]:
+    """Apply one battle (`result` from a's side); returns both ratings before/after."""
+    if result not in (WIN, LOSS, TIE):
+        raise ValueError("result must be 1 (win), 0 (loss) or 0.5 (tie)")
+    if int(a) == int(c):
+        raise ValueError("a player can't battle themselves")
+    pa, pc = _player(b, str(int(a))), _player(b, str(int(c)))
+    ra, rc = pa["elo"], pc["elo"]
+    ea = expected(ra, rc)
+    pa["elo"] = round(ra + ELO_K * (result - ea), 2)
+    pc["elo"] = round(rc + ELO_K * ((1 - result) - (1 - ea)), 2)
+
+    if result == WIN:
+        pa["w"] += 1
+        pc["l"] += 1
+    elif result == LOSS:
+        pa["l"] += 1
+        pc["w"] += 1
+    else:
+        pa["t"] += 1
+        pc["t"] += 1
+
+    key, a_low = pair_key(a, c)
+    h = b["h2h"].setdefault(key, [0, 0, 0])
+    if result == TIE:
+        h[2] += 1
+    else:
+        h[0 if (result == WIN) == a_low else 1] += 1
+    return {"a": int(a), "b": int(c), "result": result,
+            "elo_a": [ra, pa["elo"]], "elo_b": [rc, pc["elo"]]}
+
+
+def head_to_head(b: Dict[str, Any], a: int | str, c: int | str) -> Tuple[int, int, int]:
+    """(a's wins, c's wins, ties) between two players."""
+    key, a_low = pair_key(a, c)
+    lo, hi, ties = b["h2h"].get(key, (0, 0, 0))
+    return (lo, hi, ties) if a_low else (hi, lo, ties)
+
+
+# ---- tournaments ----
+def seed_bracket(entrants: Sequence[int], rating: Callable[[int], float],
+                 rng: random.Random | None = None) -> List[Tuple[int, ...]]:
+    """
+    First-round slots in bracket order: (a, b) is a duel, (a,) a bye. Entrants
+    are shuffled, then the best rated get the byes needed to bring the field
+    down to a power of two. Duels take the odd slots first, so each bye holder
+    meets a first-round winner in round two, best rated first, and two bye
+    holders only meet when byes outnumber duels.
+    """
+    rng = rng or random
+    field = list(dict.fromkeys(entrants))
+    rng.shuffle(field)
+    size = 1 << (len(field) - 1).bit_length()
+    half, n_byes = size // 2, size - len(field)
+    by_rating = sorted(field, key=rating, reverse=True)
+    byes = by_rating[:n_byes]
+    rest = [u for u in field if u not in set(byes)]
+    duel_at = set((list(range(1, half, 2)) + list(range((half - 1) & ~1, -1, -2)))[:half - n_byes])
+    duels, held = iter(zip(rest[0::2], rest[1::2])), iter(byes)
+    return [next(duels) if i in duel_at else (next(held),) for i in range(half)]
+
+
+def next_round(field: Sequence[int]) -> List[Tuple[int, ...]]:
+    """Pair the players left in bracket order: slot 0 against slot 1, and so on."""
+    return list(zip(field[0::2], field[1::2]))
+
+
+# ---- store ops ----
+@_remote
+@_journaled
+def record_battles(results: List[List[Any]], ts: float | None = None) -> List[Dict[str, Any]]:
+    """
+    Apply [[a, b, result], ...] in order (result from a's side: 1 win, 0 loss,
+    0.5 tie) with a single store write, e.g. one tournament round.
+    Returns each battle's ratings before and after, and under "unlocked"
+    the [user_id, achievement_id] pairs it unlocked.
+    """
+    b = node(storage._root())
+    out = []
+    for a, c, r in results:
+        res = record(b, a, c, float(r))
+        res["unlocked"] = []
+        winners = {WIN: (res["a"],), LOSS: (res["b"],)}.get(res["result"], ())
+        for uid in winners:
+            p = b["players"][str(uid)]
+            for ach in achievements.unlock(p, achievements.battler_counters, [("battle_wins", p["w"] - 1, p["w"])]):
+                res["unlocked"].append([uid, ach])
+        out.append(res)
+    for res in out:
+        storage._lb_touch(res["a"], ("elo", "wins"))
+        storage._lb_touch(res["b"], ("elo", "wins"))
+    if out:
+        storage._save_soon()
+    return out
+
+
+@_remote
+def battle_stats(user_id: int, vs: int | None = None) -> Dict[str, Any] | None:
+    """{"w", "l", "t", "elo", "rank", "ranked"[, "h2h": [w, l, t]]}, or None if they never battled."""
+    b = storage._root().get("battles", {})
+    p = b.get("players", {}).get(str(user_id))
+    if not p:
+        return None
+    board = storage._board("elo")
+    out = {**p, "rank": board.rank(int(user_id)), "ranked": len(board)}
+    if vs is not None:
+        out["h2h"] = list(head_to_head(node(storage._root()), user_id, vs))
+    return out
+
+
+@_remote
+def battle_ratings(user_ids: List[int]) -> Dict[str, float]:
+    players = storage._root().get("battles", {}).get("players", {})
+    return {str(u): players.get(str(u), {}).get("elo", ELO_START) for u in user_ids}
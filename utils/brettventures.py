@@ -0,0 +1,353 @@
+# utils/brettventures.py
+"""
+Brettventures players: the store ops behind the adventure, shop and fishing cogs.
+
+Players live under root["brettventures"]["players"], keyed by user id:
+
+    {"user_id": 1, "name": "...", "level": 3, "xp": 12, "hp": 20, "hp_max": 24,
+     "stamina": 4, "stamina_max": 7, "pow": 2, "smt": 1, "luck": 0,
+     "items": {item_id: n}, "flags": {...}, "stamina_ts": 1700000000, "v": 9}
+
+Gold isn't a player field; it is the player's balance in utils/economy. Every
+write bumps "v", and a record read earlier only goes back through
+bv_upsert_player (or bv_explore) if "v" hasn't moved, so two commands for the
+same player can't silently overwrite each other. Reads hand out copies.
+"""
+from __future__ import annotations
+
+import copy
+import os
+import time
+from typing import Any, Dict, List
+
+from utils import achievements, economy, leveling, quests, storage
+from utils.storage import VersionConflict, _journaled, _remote
+
+# Stamina regen: default 1 point every 3 hours
+BV_STAMINA_REGEN_SECS = int(os.getenv("BV_STAMINA_REGEN_SECS", str(3 * 3600)))
+BV_HP_PER_STAMINA = int(os.getenv("BV_HP_PER_STAMINA", "5"))   # fight wounds heal as stamina comes back
+
+
+def _players() -> Dict[str, Any]:
+    return storage._root().setdefault("brettventures", {}).setdefault("players", {})
+
+
+def _blank_player(user_id: int, name: str) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "name": name,
+        "level": 1,
+        "xp": 0,
+        "hp": 20, "hp_max": 20,
+        "stamina": 5, "stamina_max": 5,
+        "pow": 1, "smt": 1, "luck": 0,
+        "inventory": [],
+        "items": {},                     # item_id -> count
+        "flags": {},
+        "stamina_ts": int(time.time()),
+    }
+
+
+def _detach(p: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A player record to hand out: a copy, like the daemon's JSON reply, so a
+    caller's edits only land through bv_upsert_player and its version check.
+    """
+    return copy.deepcopy(p)
+
+
+def bump(p: Dict[str, Any]) -> None:
+    """New version of a player record (stamina regen alone doesn't count)."""
+    p["v"] = int(p.get("v", 0)) + 1
+
+
+def _add_xp_inplace(p: Dict[str, Any], amount: int) -> int:
+    """Add XP, applying any level-ups at once (see utils/leveling.py); returns levels gained."""
+    level = p["level"]
+    p["level"], p["xp"] = leveling.CURVE.apply(level, p["xp"], amount)
+    gained = p["level"] - level
+    if gained:
+        p["hp_max"] += 2 * gained
+        p["stamina_max"] += gained
+        achievements.unlock(p, achievements.player_counters, [("level", level, p["level"])])
+    return gained
+
+
+def _tick_stamina_inplace(p: Dict[str, Any], now: int | None = None) -> int:
+    """
+    Apply time-based stamina regen in-place; each point back also heals
+    BV_HP_PER_STAMINA HP. Returns how many stamina points were regenerated.
+    """
+    if not p or BV_STAMINA_REGEN_SECS <= 0:
+        return 0
+    now = int(now or time.time())
+    p.setdefault("stamina_ts", now)
+    if p["stamina"] >= p["stamina_max"]:
+        # Keep ts “caught up” so next ETA is sane
+        p["stamina_ts"] = now
+        return 0
+
+    elapsed = max(0, now - int(p["stamina_ts"]))
+    if elapsed < BV_STAMINA_REGEN_SECS:
+        return 0
+
+    ticks = elapsed // BV_STAMINA_REGEN_SECS
+    if ticks <= 0:
+        return 0
+
+    before = p["stamina"]
+    p["stamina"] = min(p["stamina_max"], p["stamina"] + int(ticks))
+    # Advance ts by the number of full-interval ticks actually applied.
+    applied = p["stamina"] - before
+    if applied > 0:
+        p["stamina_ts"] = int(p["stamina_ts"]) + applied * BV_STAMINA_REGEN_SECS
+        p["hp"] = min(p["hp_max"], p["hp"] + applied * BV_HP_PER_STAMINA)
+    else:
+        # If we were already full by the time we checked, catch up ts to now.
+        p["stamina_ts"] = now
+    return applied
+
+
+def _put_player(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a player read earlier (VersionConflict if it changed since); returns the stored record."""
+    economy.live_node()  # gold lives in the economy; make sure old fields are migrated first
+    players = _players()
+    cur = players.get(str(p["user_id"]))
+    if cur is not None and int(p.get("v", 0)) != int(cur.get("v", 0)):
+        raise VersionConflict(f"player {p['user_id']} changed (v{cur.get('v', 0)}, write based on v{p.get('v', 0)})")
+    p = _detach(p)   # the caller keeps theirs; the store gets its own
+    p.pop("gold", None)
+    bump(p)
+    players[str(p["user_id"])] = p
+    storage._lb_touch(p["user_id"], ("level",))
+    return p
+
+
+def _require(user_id: int) -> Dict[str, Any]:
+    p = storage._root().get("brettventures", {}).get("players", {}).get(str(user_id))
+    if not p:
+        raise ValueError("No such player")
+    return p
+
+
+def _add_items(p: Dict[str, Any], items: Dict[str, int], xp: int) -> None:
+    bag = p.setdefault("items", {})
+    for item_id, n in items.items():
+        bag[item_id] = int(bag.get(item_id, 0)) + int(n)
+    if xp:
+        _add_xp_inplace(p, xp)
+        storage._lb_touch(p["user_id"], ("level",))
+    bump(p)
+
+
+# ---- reads ----
+@_remote
+def bv_get_player(user_id: int) -> Dict[str, Any] | None:
+    p = storage._root().get("brettventures", {}).get("players", {}).get(str(user_id))
+    if not p:
+        return None
+    # Apply regen every read
+    if _tick_stamina_inplace(p):
+        storage._save_soon()
+    return _detach(p)
+
+
+@_remote
+def bv_next_stamina_eta(user_id: int) -> int | None:
+    """
+    Seconds until next stamina point for this user.
+    Returns 0 if a point is ready now, None if already full.
+    """
+    p = storage._root().get("brettventures", {}).get("players", {}).get(str(user_id))
+    if not p:
+        return None
+    now = int(time.time())
+    _tick_stamina_inplace(p, now)
+    storage._save_soon()
+
+    if p["stamina"] >= p["stamina_max"]:
+        return None
+    due = int(p.get("stamina_ts", now)) + BV_STAMINA_REGEN_SECS
+    return max(0, due - now)
+
+
+# ---- writes ----
+@_remote
+@_journaled
+def bv_get_or_create_player(user_id: int, name: str) -> Dict[str, Any]:
+    players = _players()
+    if str(user_id) in players:
+        p = players[str(user_id)]
+        if _tick_stamina_inplace(p):
+            storage._save_soon()
+        return _detach(p)
+    p = _blank_player(user_id, name)
+    bump(p)
+    players[str(user_id)] = p
+    storage._lb_touch(user_id, ("level",))
+    storage._save_soon()
+    return _detach(p)
+
+
+@_remote
+@_journaled
+def bv_upsert_player(p: Dict[str, Any]) -> None:
+    """
+    Write back a player read earlier. Raises VersionConflict if the stored
+    record changed in between (its "v" moved on), rather than overwriting it.
+    """
+    _put_player(p)
+    storage._save_soon()
+
+
+@_remote
+@_journaled
+def bv_explore(p: Dict[str, Any], xp: int, gold: int, key: str, ts: float | None = None) -> Dict[str, Any]:
+    """
+    Settle one explore in a single write: the player as the encounter left
+    them (version-checked like bv_upsert_player), XP and level-ups, loot from
+    the mint and the "explore" quest event. Returns {"player", "quests"}
+    (names of quests it completed).
+    """
+    p = _put_player(p)
+    uid = int(p["user_id"])
+    if gold:
+        economy.post([(economy.MINT, -gold), (str(uid), gold)], "adventure:explore", key, ts)
+    if xp:
+        _add_xp_inplace(p, xp)
+        storage._lb_touch(uid, ("level",))
+    finished = quests.emit_for(uid, "explore", 1, ts)
+    storage._save_soon()
+    return {"player": _detach(p), "quests": finished}
+
+
+@_remote
+@_journaled
+def bv_buy(user_id: int, item: str, price: int, effects: Dict[str, int],
+           key: str | None = None) -> Dict[str, Any]:
+    """
+    Buy a shop item: pay `price` to the shop and apply stat `effects` in one
+    step. "hp"/"stamina" are capped at their max. Returns the updated player.
+    """
+    p = _require(user_id)
+    res = economy.post([(str(user_id), -price), (economy.SHOP, price)], f"shop:{item}", key, None)
+    if res["applied"]:
+        for stat, delta in effects.items():
+            cap = p.get(f"{stat}_max")
+            p[stat] = int(p.get(stat, 0)) + delta
+            if cap is not None:
+                p[stat] = min(int(cap), p[stat])
+        bump(p)
+        storage._save_soon()
+    return {**_detach(p), "gold": res["balances"][str(user_id)]}
+
+
+@_remote
+@_journaled
+def bv_add_xp(user_id: int, amount: int) -> Dict[str, Any]:
+    p = _require(user_id)
+    _add_xp_inplace(p, amount)
+    bump(p)
+    storage._lb_touch(user_id, ("level",))
+    storage._save_soon()
+    return _detach(p)
+
+
+@_remote
+@_journaled
+def bv_add_items(user_id: int, items: Dict[str, int], xp: int = 0) -> Dict[str, Any]:
+    """
+    Add item counts ({item_id: n}) and XP to a player in one batched write.
+    Items live in p["items"] as item_id -> count, not in the legacy list.
+    """
+    p = _require(user_id)
+    _add_items(p, items, xp)
+    storage._save_soon()
+    return _detach(p)
+
+
+@_remote
+@_journaled
+def bv_fish(user_id: int, catch: Dict[str, int], casts: int, xp: int,
+            ts: float | None = None) -> Dict[str, Any]:
+    """
+    Settle one !fish in a single write: the catch and XP (as bv_add_items)
+    plus `casts` "fish" quest events. Returns {"player", "quests"} (names of
+    quests it completed).
+    """
+    p = _require(user_id)
+    _add_items(p, catch, xp)
+    finished = quests.emit_for(user_id, "fish", casts, ts)
+    storage._save_soon()
+    return {"player": _detach(p), "quests": finished}
+
+
+@_remote
+@_journaled
+def bv_grant(grants: List[List[int]], reason: str, key: str | None = None,
+             ts: float | None = None) -> Dict[str, Any]:
+    """
+    Give [[user_id, xp, gold], ...] to many players in one store write and one
+    ledger transaction (gold is minted), e.g. event rewards or compensation.
+    Users without a character get nothing and are listed under "missing".
+    A repeated `key` is a no-op ("applied": False).
+    Returns {"applied", "players", "xp", "gold", "missing", "levels": {uid: [before, after]}}.
+    """
+    econ = economy.live_node()
+    out = {"applied": False, "players": 0, "xp": 0, "gold": 0, "missing": [], "levels": {}}
+    if key is not None and key in econ["idem"]:
+        return out
+    players = storage._root().get("brettventures", {}).get("players", {})
+    found, postings = [], []
+    for user_id, xp, gold in grants:
+        xp, gold = int(xp), int(gold)
+        if xp < 0 or gold < 0:
+            raise ValueError("grants can't take XP or gold away")
+        p = players.get(str(user_id))
+        if not p:
+            out["missing"].append(int(user_id))
+            continue
+        found.append((int(user_id), p, xp))
+        if gold:
+            postings.append((economy.account(user_id), gold))
+    # The ledger part is the one that can fail, so it goes first; nothing is touched before it
+    gold = sum(d for _, d in postings)
+    if postings or key is not None:
+        # Also recorded without gold when keyed, so the key is remembered
+        tx, _ = economy.apply(econ, [(economy.MINT, -gold)] + postings, f"grant:{reason}", key, ts)
+        storage._LEDGER_PENDING.append(tx)
+    for user_id, p, xp in found:
+        if xp:
+            level = p["level"]
+            if _add_xp_inplace(p, xp):
+                out["levels"][str(user_id)] = [level, p["level"]]
+            storage._lb_touch(user_id, ("level",))
+        bump(p)
+    for acct, _ in postings:
+        storage._lb_touch(acct, ("gold",))
+    if found:
+        storage._save_soon()
+    out.update(applied=True, players=len(found), xp=sum(xp for _, _, xp in found), gold=gold)
+    return out
+
+
+@_remote
+@_journaled
+def bv_sell_items(user_id: int, prices: Dict[str, int], key: str | None = None) -> Dict[str, Any]:
+    """
+    Sell every held item listed in `prices` (item_id -> coins each) to the
+    shop. Items are removed and coins credited in the same step.
+    """
+    p = _require(user_id)
+    bag = p.setdefault("items", {})
+    sold = {i: int(bag[i]) for i in prices if int(bag.get(i, 0)) > 0}
+    coins = sum(prices[i] * n for i, n in sold.items())
+    if not sold:
+        return {"sold": {}, "coins": 0, "balance": economy.econ_balance(user_id)}
+    res = economy.post([(economy.MINT, -coins), (str(user_id), coins)], "shop:sell", key, None)
+    if res["applied"]:
+        for i in sold:
+            del bag[i]
+        bump(p)
+        storage._save_soon()
+    return {"sold": sold, "coins": coins, "balance": res["balances"][str(user_id)]}
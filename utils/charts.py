@@ -0,0 +1,242 @@
+# utils/charts.py
+"""
+PNG bar charts for !chart / !allstats, rendered off the event loop.
+
+The renderer is pure Python (zlib + struct, built-in 5x7 bitmap font) so it
+needs no extra dependency and can run in a ProcessPoolExecutor. Rendered
+bytes are cached by a caller-supplied key that includes a stats version, so a
+repeated !chart on unchanged stats is a dict lookup.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+RGB = Tuple[int, int, int]
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_CACHE_MAX = int(os.getenv("CHART_CACHE_MAX", "256"))
+
+BG: RGB = (47, 49, 54)          # Discord dark theme
+FG: RGB = (235, 235, 235)
+MUTED: RGB = (150, 152, 158)
+TRACK: RGB = (64, 68, 75)
+PALETTE: List[RGB] = [
+    (87, 242, 135), (237, 66, 69), (254, 231, 92),
+    (88, 101, 242), (235, 69, 158), (255, 163, 26),
+    (26, 188, 156), (155, 89, 182), (52, 152, 219),
+]
+
+# ---- 5x7 bitmap font (uppercase, digits, common punctuation) ----
+# Each glyph is 7 rows of 5 columns, written row by row.
+_FONT_ROWS = {
+    "A": ".###. #...# #...# ##### #...# #...# #...#",
+    "B": "####. #...# #...# ####. #...# #...# ####.",
+    "C": ".###. #...# #.... #.... #.... #...# .###.",
+    "D": "####. #...# #...# #...# #...# #...# ####.",
+    "E": "##### #.... #.... ####. #.... #.... #####",
+    "F": "##### #.... #.... ####. #.... #.... #....",
+    "G": ".###. #...# #.... #.### #...# #...# .####",
+    "H": "#...# #...# #...# ##### #...# #...# #...#",
+    "I": ".###. ..#.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "J": "..### ...#. ...#. ...#. ...#. #..#. .##..",
+    "K": "#...# #..#. #.#.. ##... #.#.. #..#. #...#",
+    "L": "#.... #.... #.... #.... #.... #.... #####",
+    "M": "#...# ##.## #.#.# #.#.# #...# #...# #...#",
+    "N": "#...# #...# ##..# #.#.# #..## #...# #...#",
+    "O": ".###. #...# #...# #...# #...# #...# .###.",
+    "P": "####. #...# #...# ####. #.... #.... #....",
+    "Q": ".###. #...# #...# #...# #.#.# #..#. .##.#",
+    "R": "####. #...# #...# ####. #.#.. #..#. #...#",
+    "S": ".#### #.... #.... .###. ....# ....# ####.",
+    "T": "##### ..#.. ..#.. ..#.. ..#.. ..#.. ..#..",
+    "U": "#...# #...# #...# #...# #...# #...# .###.",
+    "V": "#...# #...# #...# #...# #...# .#.#. ..#..",
+    "W": "#...# #...# #...# #.#.# #.#.# #.#.# .#.#.",
+    "X": "#...# #...# .#.#. ..#.. .#.#. #...# #...#",
+    "Y": "#...# #...# .#.#. ..#.. ..#.. ..#.. ..#..",
+    "Z": "##### ....# ...#. ..#.. .#... #.... #####",
+    "0": ".###. #...# #..## #.#.# ##..# #...# .###.",
+    "1": "..#.. .##.. ..#.. ..#.. ..#.. ..#.. .###.",
+    "2": ".###. #...# ....# ...#. ..#.. .#... #####",
+    "3": "####. ....# ....# .###. ....# ....# ####.",
+    "4": "...#. ..##. .#.#. #..#. ##### ...#. ...#.",
+    "5": "##### #.... ####. ....# ....# #...# .###.",
+    "6": ".###. #.... #.... ####. #...# #...# .###.",
+    "7": "##### ....# ...#. ..#.. .#... .#... .#...",
+    "8": ".###. #...# #...# .###. #...# #...# .###.",
+    "9": ".###. #...# #...# .#### ....# ....# .###.",
+    " ": "..... ..... ..... ..... ..... ..... .....",
+    ".": "..... ..... ..... ..... ..... .##.. .##..",
+    ",": "..... ..... ..... ..... .##.. ..#.. .#...",
+    "'": "..#.. ..#.. .#... ..... ..... ..... .....",
+    "-": "..... ..... ..... .###. ..... ..... .....",
+    "+": "..... ..#.. ..#.. ##### ..#.. ..#.. .....",
+    "*": "..... ..#.. #.#.# .###. #.#.# ..#.. .....",
+    "%": "##..# ##..# ...#. ..#.. .#... #..## #..##",
+    "(": "...#. ..#.. .#... .#... .#... ..#.. ...#.",
+    ")": ".#... ..#.. ...#. ...#. ...#. ..#.. .#...",
+    "!": "..#.. ..#.. ..#.. ..#.. ..#.. ..... ..#..",
+    "?": ".###. #...# ....# ...#. ..#.. ..... ..#..",
+    ":": "..... .##.. .##.. ..... .##.. .##.. .....",
+    "/": "....# ...#. ...#. ..#.. .#... .#... #....",
+    "#": ".#.#. .#.#. ##### .#.#. ##### .#.#. .#.#.",
+}
+_GLYPHS = {ch: rows.replace(" ", "") for ch, rows in _FONT_ROWS.items()}
+_TRANSLATE = str.maketrans({"’": "'", "‘": "'", "—": "-", "–": "-", "×": "X", "“": "'", "”": "'", '"': "'"})
+_GW, _GH = 5, 7
+
+
+def _glyph(ch: str) -> str:
+    return _GLYPHS.get(ch) or _GLYPHS["?"]
+
+
+def _normalize(text: str) -> str:
+    return text.translate(_TRANSLATE).upper()
+
+
+def text_width(text: str, scale: int) -> int:
+    return len(text) * (_GW + 1) * scale
+
+
+class _Canvas:
+    def __init__(self, w: int, h: int, bg: RGB):
+        self.w, self.h = w, h
+        self.px = bytearray(bytes(bg) * (w * h))
+
+    def rect(self, x: int, y: int, w: int, h: int, color: RGB) -> None:
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.w, x + w), min(self.h, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        row = bytes(color) * (x1 - x0)
+        for yy in range(y0, y1):
+            i = (yy * self.w + x0) * 3
+            self.px[i:i + len(row)] = row
+
+    def text(self, x: int, y: int, text: str, color: RGB, scale: int = 2) -> int:
+        """Draw text with its top-left at (x, y); returns the x after the text."""
+        for ch in _normalize(text):
+            bits = _glyph(ch)
+            for gy in range(_GH):
+                for gx in range(_GW):
+                    if bits[gy * _GW + gx] == "#":
+                        self.rect(x + gx * scale, y + gy * scale, scale, scale, color)
+            x += (_GW + 1) * scale
+        return x
+
+    def png(self) -> bytes:
+        stride = self.w * 3
+        raw = b"".join(b"\x00" + bytes(self.px[y * stride:(y + 1) * stride]) for y in range(self.h))
+
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+        ihdr = struct.pack(">IIBBBBB", self.w, self.h, 8, 2, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr)
+                + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def render_bar_chart(title: str, rows: Sequence[Tuple[str, int]], subtitle: str = "",
+                     width: int = 720) -> bytes:
+    """
+    Horizontal bar chart as PNG bytes. rows: [(label, count), ...] drawn in the
+    given order. Pure function of its arguments (safe for a process pool).
+    """
+    scale = 2
+    line_h = _GH * scale
+    pad = 16
+    row_h = line_h + 14
+    label_chars = max([len(r[0]) for r in rows] + [4])
+    label_w = min(text_width("W" * label_chars, scale), width // 3)
+    count_w = text_width("00000 (100.0%)", scale)
+    bar_x = pad + label_w + 12
+    bar_w = max(40, width - bar_x - count_w - pad - 12)
+
+    header_h = pad + line_h + (line_h + 8 if subtitle else 0) + 14
+    height = header_h + row_h * max(1, len(rows)) + pad
+    c = _Canvas(width, height, BG)
+
+    c.text(pad, pad, title[: (width - 2 * pad) // ((_GW + 1) * scale)], FG, scale)
+    if subtitle:
+        c.text(pad, pad + line_h + 8, subtitle, MUTED, scale)
+
+    total = sum(max(0, n) for _, n in rows)
+    top = max([n for _, n in rows] + [1])
+    y = header_h
+    for i, (label, n) in enumerate(rows):
+        color = PALETTE[i % len(PALETTE)]
+        max_chars = label_w // ((_GW + 1) * scale)
+        c.text(pad, y + 4, label[:max_chars], FG, scale)
+        c.rect(bar_x, y + 2, bar_w, line_h + 4, TRACK)
+        filled = int(round(bar_w * (n / top))) if n > 0 else 0
+        c.rect(bar_x, y + 2, filled, line_h + 4, color)
+        share = f"{(100 * n / total):.1f}%" if total else "0.0%"
+        c.text(bar_x + bar_w + 12, y + 4, f"{n} ({share})", FG, scale)
+        y += row_h
+    return c.png()
+
+
+# ---- worker pool + render cache ----
+_POOL: Executor | None = None
+_CACHE: "OrderedDict[Hashable, bytes]" = OrderedDict()
+_INFLIGHT: Dict[Hashable, "asyncio.Future[bytes]"] = {}
+STATS = {"hits": 0, "misses": 0}
+
+
+def _pool() -> Executor:
+    global _POOL
+    if _POOL is None:
+        try:
+            _POOL = ProcessPoolExecutor(max_workers=max(1, CHART_WORKERS))
+        except (OSError, NotImplementedError):
+            # Some hosts forbid subprocesses; threads still keep the loop free
+            _POOL = ThreadPoolExecutor(max_workers=max(1, CHART_WORKERS), thread_name_prefix="chart")
+    return _POOL
+
+
+def shutdown() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+async def render_cached(key: Hashable, title: str, rows: Sequence[Tuple[str, int]],
+                        subtitle: str = "") -> bytes:
+    """
+    PNG bytes for `key`, rendering in the worker pool on a miss. Concurrent
+    requests for the same key share one render.
+    """
+    png = _CACHE.get(key)
+    if png is not None:
+        _CACHE.move_to_end(key)
+        STATS["hits"] += 1
+        return png
+
+    fut = _INFLIGHT.get(key)
+    if fut is not None:
+        return await asyncio.shield(fut)
+
+    STATS["misses"] += 1
+    loop = asyncio.get_running_loop()
+    fut = loop.run_in_executor(_pool(), render_bar_chart, title, list(rows), subtitle)
+    _INFLIGHT[key] = fut
+    try:
+        png = await fut
+    finally:
+        _INFLIGHT.pop(key, None)
+
+    _CACHE[key] = png
+    while len(_CACHE) > CHART_CACHE_MAX:
+        _CACHE.popitem(last=False)
+    return png
@@ -0,0 +1,151 @@
+# utils/combat.py
+"""
+Turn-based Brettventures fights, resolved in one call.
+
+resolve() plays a whole fight between a player's stats and a Monster on the
+fight's own RNG stream (rng.Stream, seeded per fight, so a seed always
+replays the same fight; or a Stream the caller already drew the lead-up
+from) and returns a Fight with the outcome and totals. It
+touches nothing else: no storage, no awaits. The caller applies the result to
+the player and persists once. simulate() runs fights headless in bulk for
+balancing (python -m bench.combat_sim).
+
+Whoever wins initiative (d20 + smt) swings first each turn:
+
+    to hit   d100 + 2 * (smt - foe's smt) >= HIT_DC; advantage if luckier than
+             the foe, disadvantage for a player under a quarter of max HP
+    damage   gauss_bounded around 2 + pow, doubled on a crit
+    crit     CRIT_BASE + chance_from_stat(luck) / 4
+    dodge    a hit is shrugged off with chance_from_stat(smt) / 5
+
+After MAX_TURNS the player backs off and the fight is a draw.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Mapping
+
+from utils.rng import Stream, chance_from_stat
+
+HIT_DC = 45
+CRIT_BASE = 0.05
+MAX_TURNS = 30
+SCALE_PER_LEVEL = 0.08     # monster HP and POW grow this much per player level over 1
+
+
+class Monster:
+    __slots__ = ("id", "name", "hp", "pow", "smt", "luck")
+
+    def __init__(self, id: str, name: str, hp: int, pow: int, smt: int = 0, luck: int = 0):
+        self.id, self.name = id, name
+        self.hp, self.pow, self.smt, self.luck = hp, pow, smt, luck
+
+    def scaled(self, level: int) -> Monster:
+        """This monster as met by a player of `level`."""
+        f = 1 + SCALE_PER_LEVEL * (max(1, level) - 1)
+        return Monster(self.id, self.name, round(self.hp * f), round(self.pow * f), self.smt, self.luck)
+
+    def __repr__(self) -> str:
+        return f"Monster({self.id!r}, hp={self.hp}, pow={self.pow}, smt={self.smt}, luck={self.luck})"
+
+
+MONSTERS: Dict[str, Monster] = {m.id: m for m in (
+    Monster("slime", "Stray Slime", hp=6, pow=0),
+    Monster("goose", "Aggressive Goose", hp=5, pow=0, smt=1),
+    Monster("goblin_scout", "Goblin Scout", hp=9, pow=1, smt=1),
+    Monster("hornets", "Hornet Swarm", hp=7, pow=0, smt=4),
+    Monster("highwayman", "Highwayman", hp=12, pow=1, smt=2, luck=1),
+    Monster("shade", "Spectral Shade", hp=10, pow=2, smt=3),
+    Monster("boar", "Wild Boar", hp=14, pow=2),
+    Monster("rival", "Rival Adventurer", hp=13, pow=1, smt=3, luck=2),
+    Monster("greedy_goblin", "Greedy Goblin", hp=18, pow=2, smt=2, luck=3),
+)}
+
+
+class Fight:
+    __slots__ = ("won", "turns", "hp", "dealt", "taken", "crits", "dodges")   # crits/dodges: the player's
+
+    def __init__(self):
+        self.won: bool | None = None   # None: a draw
+        self.turns = self.hp = self.dealt = self.taken = self.crits = self.dodges = 0
+
+
+def resolve(p: Mapping[str, Any], monster: Monster, seed: int | Stream) -> Fight:
+    """
+    Fight `monster` with a player's stats (hp, hp_max, pow, smt, luck; not
+    modified). fight.hp is the player's HP afterwards, 0 if they lost.
+    """
+    r = seed if isinstance(seed, Stream) else Stream(seed)
+    roll, percent, gauss = r.roll, r.percent, r.gauss_bounded
+    hp, hp_max = int(p["hp"]), int(p["hp_max"])
+    pw, smt, luck = int(p["pow"]), int(p["smt"]), int(p["luck"])
+    m_hp, m_pow, m_smt, m_luck = monster.hp, monster.pow, monster.smt, monster.luck
+
+    # Per-fight constants, worked out once
+    p_edge, m_edge = 2 * (smt - m_smt), 2 * (m_smt - smt)
+    p_adv, m_adv = luck > m_luck, m_luck > luck
+    p_crit, m_crit = CRIT_BASE + chance_from_stat(luck) / 4, CRIT_BASE + chance_from_stat(m_luck) / 4
+    p_dodge, m_dodge = chance_from_stat(smt) / 5, chance_from_stat(m_smt) / 5
+    p_mean, m_mean = 2 + pw, 2 + m_pow
+    weak = hp_max // 4
+    player_first = roll(20) + smt >= roll(20) + m_smt
+
+    f = Fight()
+    for turn in range(1, MAX_TURNS + 1):
+        f.turns = turn
+        for side in ((0, 1) if player_first else (1, 0)):
+            if side == 0:
+                # the player swings
+                d = r.dis() if hp <= weak else r.adv() if p_adv else roll()
+                if d + p_edge < HIT_DC or percent(m_dodge):
+                    continue
+                dmg = round(gauss(p_mean, 1 + p_mean / 4, 1, 2 * p_mean))
+                if percent(p_crit):
+                    dmg *= 2
+                    f.crits += 1
+                m_hp -= dmg
+                f.dealt += dmg
+                if m_hp <= 0:
+                    f.won, f.hp = True, hp
+                    return f
+            else:
+                d = r.adv() if m_adv else roll()
+                if d + m_edge < HIT_DC:
+                    continue
+                if percent(p_dodge):
+                    f.dodges += 1
+                    continue
+                dmg = round(gauss(m_mean, 1 + m_mean / 4, 1, 2 * m_mean))
+                if percent(m_crit):
+                    dmg *= 2
+                hp -= dmg
+                f.taken += dmg
+                if hp <= 0:
+                    f.won, f.hp = False, 0
+                    return f
+    f.hp = hp
+    return f
+
+
+def simulate(p: Mapping[str, Any], monster: Monster, n: int, seed: int = 0) -> Dict[str, Any]:
+    """Fight the same matchup n times (seeds seed..seed+n-1); outcome rates and averages."""
+    won = lost = turns = taken = 0
+    t0 = time.perf_counter()
+    for i in range(n):
+        f = resolve(p, monster, seed + i)
+        won += f.won is True
+        lost += f.won is False
+        turns += f.turns
+        taken += f.taken
+    secs = time.perf_counter() - t0
+    n = max(1, n)
+    return {"monster": monster.id, "fights": n, "win_rate": round(won / n, 3),
+            "loss_rate": round(lost / n, 3), "draw_rate": round((n - won - lost) / n, 3),
+            "avg_turns": round(turns / n, 2), "avg_taken": round(taken / n, 2),
+            "fights_per_s": round(n / secs) if secs else None}
+
+
+def fights_for(p: Mapping[str, Any], monsters: List[Monster], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """simulate() against each monster, scaled to the player's level."""
+    level = int(p.get("level", 1))
+    return [simulate(p, m.scaled(level), n, seed) for m in monsters]
@@ -0,0 +1,291 @@
+# utils/economy.py
+"""
+Coin economy: an append-only transaction ledger plus a materialized balance table.
+
+The store keeps only the current balances (and a little bookkeeping) under
+root["economy"]:
+
+    {"balances": {account: coins}, "next_tx": 42,
+     "idem": {key: tx_id}, "daily": {user_id: [day, streak]}}
+
+Every change is a transaction of postings [(account, delta), ...] that sums to
+zero, so coins are never created or destroyed: rewards come from the "@mint"
+account, bets go to and from "@house", purchases to "@shop". System accounts
+(leading "@") may go negative; user accounts never can. A transaction either
+applies completely or raises ValueError and changes nothing.
+
+Applied transactions queue up in memory and are appended to the ledger file
+(JSONL, one transaction per line) whenever the store is flushed, so a burst of
+coin changes costs one store write instead of one per change.
+
+The econ_* ops at the bottom run this against the live store; utils/storage
+journals them and forwards them to the storage daemon.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from utils import quests, storage
+from utils.storage import _journaled, _remote
+
+MINT = "@mint"
+HOUSE = "@house"
+SHOP = "@shop"
+
+DAILY_BASE = int(os.getenv("ECON_DAILY_BASE", "50"))
+DAILY_STREAK_BONUS = int(os.getenv("ECON_DAILY_STREAK_BONUS", "10"))
+DAILY_STREAK_CAP = 7
+# Idempotency keys remembered (oldest dropped first)
+IDEM_MAX = int(os.getenv("ECON_IDEM_MAX", "20000"))
+
+Posting = Tuple[str, int]
+
+
+def account(user_id: int | str) -> str:
+    return str(user_id)
+
+
+def is_system(acct: str) -> bool:
+    return acct.startswith("@")
+
+
+def node(root: Dict[str, Any]) -> Dict[str, Any]:
+    econ = root.setdefault("economy", {})
+    econ.setdefault("balances", {})
+    econ.setdefault("next_tx", 1)
+    econ.setdefault("idem", {})
+    econ.setdefault("daily", {})
+    return econ
+
+
+def balance(econ: Dict[str, Any], acct: str) -> int:
+    return int(econ["balances"].get(acct, 0))
+
+
+def apply(econ: Dict[str, Any], postings: Sequence[Posting], reason: str,
+          key: str | None = None, ts: float | None = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    Apply one transaction atomically. Returns (tx, applied); with an already
+    seen idempotency key nothing happens and `tx` is a stub for the original.
+    """
+    if key is not None and key in econ["idem"]:
+        return {"id": econ["idem"][key], "key": key}, False
+
+    merged: Dict[str, int] = {}
+    for acct, delta in postings:
+        if not isinstance(delta, int) or isinstance(delta, bool):
+            raise ValueError("amounts must be whole coins")
+        merged[str(acct)] = merged.get(str(acct), 0) + delta
+    if sum(merged.values()) != 0:
+        raise ValueError("transaction doesn't balance")
+    bal = econ["balances"]
+    for acct, delta in merged.items():
+        if delta < 0 and not is_system(acct) and int(bal.get(acct, 0)) + delta < 0:
+            raise ValueError("insufficient funds")
+
+    # validated: from here on nothing can fail
+    for acct, delta in merged.items():
+        new = int(bal.get(acct, 0)) + delta
+        if new:
+            bal[acct] = new
+        else:
+            bal.pop(acct, None)
+    tx_id = int(econ["next_tx"])
+    econ["next_tx"] = tx_id + 1
+    if key is not None:
+        idem = econ["idem"]
+        idem[key] = tx_id
+        while len(idem) > IDEM_MAX:
+            del idem[next(iter(idem))]
+    tx = {"id": tx_id, "ts": ts if ts is not None else time.time(), "reason": reason,
+          "postings": [[a, d] for a, d in merged.items() if d]}
+    if key is not None:
+        tx["key"] = key
+    return tx, True
+
+
+def daily_amount(streak: int) -> int:
+    return DAILY_BASE + DAILY_STREAK_BONUS * (min(streak, DAILY_STREAK_CAP) - 1)
+
+
+def claim_daily(econ: Dict[str, Any], acct: str, ts: float) -> Tuple[int, int, int]:
+    """
+    (day, streak, amount) for a claim at `ts` (UTC days). Raises ValueError
+    if today's reward was already claimed. Doesn't move any coins itself.
+    """
+    day = int(ts) // 86400
+    last_day, streak = econ["daily"].get(acct, [None, 0])
+    if last_day == day:
+        raise ValueError("already claimed today")
+    streak = streak + 1 if last_day == day - 1 else 1
+    econ["daily"][acct] = [day, streak]
+    return day, streak, daily_amount(streak)
+
+
+# ---- ledger file ----
+def ledger_path(stats_file: str) -> str:
+    return os.getenv("ECON_LEDGER_FILE") or os.path.join(os.path.dirname(stats_file) or ".", "economy_ledger.jsonl")
+
+
+def _lines_backwards(path: str, block: int = 64 * 1024) -> Iterator[bytes]:
+    """The ledger's lines, last first, reading the file in blocks from the end."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        carry = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b"\n")
+            carry = lines.pop(0) if pos > 0 else b""
+            yield from reversed(lines)
+
+
+def fingerprint(tx: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    What identifies a transaction in the ledger. Ids alone don't: a reset or
+    restore rolls next_tx back and hands the same ids to new transactions.
+    """
+    return (tx["id"], tx.get("key")) if tx.get("key") is not None else (tx["id"], tx.get("ts"))
+
+
+def ledger_tail(path: str, n: int) -> Dict[Tuple[Any, ...], None]:
+    """Fingerprints of the last `n` transactions in the ledger, oldest first."""
+    seen: List[Tuple[Any, ...]] = []
+    for line in _lines_backwards(path):
+        if len(seen) >= n:
+            break
+        try:
+            seen.append(fingerprint(json.loads(line)))
+        except (ValueError, KeyError, TypeError):
+            continue  # torn write
+    return dict.fromkeys(reversed(seen))
+
+
+def append_ledger(path: str, txs: Iterable[Dict[str, Any]], seen: Dict[Tuple[Any, ...], None],
+                  keep: int) -> int:
+    """
+    Append txs not already in `seen` (journal replays re-queue written ones)
+    and remember them there, forgetting the oldest past `keep`; returns how
+    many were written.
+    """
+    lines = []
+    for tx in txs:
+        fp = fingerprint(tx)
+        if fp not in seen:
+            seen[fp] = None
+            lines.append(json.dumps(tx, separators=(",", ":")))
+    while len(seen) > keep:
+        del seen[next(iter(seen))]
+    if lines:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def history(path: str, acct: str, n: int = 10) -> List[Dict[str, Any]]:
+    """The last `n` transactions touching `acct`, newest first (reads the file backwards)."""
+    out: List[Dict[str, Any]] = []
+    needle = json.dumps(acct).encode("utf-8")
+    for line in _lines_backwards(path):
+        if len(out) >= n:
+            break
+        if needle not in line:
+            continue
+        try:
+            tx = json.loads(line)
+        except ValueError:
+            continue
+        if any(a == acct for a, _ in tx.get("postings", ())):
+            out.append(tx)
+    return out
+
+
+# ---- store ops (utils/storage journals them and forwards them to the daemon) ----
+def live_node() -> Dict[str, Any]:
+    """The live store's economy node; legacy Brettventures gold is moved in on first use."""
+    root = storage._root()
+    econ = node(root)
+    if not econ.get("bv_gold_migrated"):
+        # Brettventures gold used to be a player field; move it into balances
+        for uid, p in root.get("brettventures", {}).get("players", {}).items():
+            gold = int(p.pop("gold", 0) or 0)
+            if gold > 0:
+                tx, _ = apply(econ, [(MINT, -gold), (uid, gold)], "migrate:bv_gold", key=f"bv_gold:{uid}")
+                storage._LEDGER_PENDING.append(tx)
+        econ["bv_gold_migrated"] = True
+        storage._BOARDS.pop("gold", None)
+        storage._save_soon()
+    return econ
+
+
+def post(postings: Sequence[Posting], reason: str, key: str | None, ts: float | None) -> Dict[str, Any]:
+    """
+    apply() against the live store from inside a store op: queues the ledger
+    line, touches the gold board and counts minted coins as "gold_earned".
+    """
+    econ = live_node()
+    tx, applied = apply(econ, postings, reason, key, ts)
+    if applied:
+        storage._LEDGER_PENDING.append(tx)
+        storage._save_soon()
+        for acct, _ in tx["postings"]:
+            if not is_system(acct):
+                storage._lb_touch(acct, ("gold",))
+        if any(a == MINT for a, _ in tx["postings"]):
+            # Newly minted coins (loot, daily, sales) count as "earned"
+            for acct, delta in tx["postings"]:
+                if delta > 0 and not is_system(acct):
+                    quests.emit_for(int(acct), "gold_earned", delta, tx["ts"])
+    touched = [a for a, _ in postings if not is_system(str(a))]
+    return {"id": tx["id"], "applied": applied,
+            "balances": {str(a): balance(econ, str(a)) for a in touched}}
+
+
+@_remote
+def econ_balance(user_id: int) -> int:
+    return balance(live_node(), account(user_id))
+
+
+@_remote
+@_journaled
+def econ_transfer(postings: List[List[Any]], reason: str, key: str | None = None,
+                  ts: float | None = None) -> Dict[str, Any]:
+    """
+    Apply one balanced transaction [[account, delta], ...] atomically.
+    Raises ValueError (nothing applied) if it doesn't balance or would overdraw
+    a user. A repeated `key` is a no-op that returns the original tx id.
+    """
+    return post([(str(a), d) for a, d in postings], reason, key, ts)
+
+
+@_remote
+@_journaled
+def econ_daily(user_id: int, ts: float | None = None) -> Dict[str, Any]:
+    """Pay today's !daily reward; ValueError if it was already claimed."""
+    econ = live_node()
+    acct = account(user_id)
+    ts = time.time() if ts is None else ts
+    day, streak, amount = claim_daily(econ, acct, ts)
+    res = post([(MINT, -amount), (acct, amount)], "daily", f"daily:{acct}:{day}", ts)
+    return {"amount": amount, "streak": streak, "balance": res["balances"][acct],
+            "next_ts": (day + 1) * 86400}
+
+
+@_remote
+def econ_history(user_id: int, n: int = 10) -> List[Dict[str, Any]]:
+    """Newest-first transactions touching the user (unflushed ones included)."""
+    acct = account(user_id)
+    recent = [tx for tx in reversed(storage._LEDGER_PENDING) if any(a == acct for a, _ in tx["postings"])][:n]
+    if len(recent) < n:
+        recent += history(ledger_path(storage.STATS_FILE), acct, n - len(recent))
+    return recent
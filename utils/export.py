@@ -0,0 +1,200 @@
+# utils/export.py
+"""
+Streaming bulk export/import of user stats (JSONL or CSV, optionally gzip).
+
+Users come out of storage in chunks (`storage.users_chunk`) and go straight to
+the file, so neither the export nor the import ever builds the whole document
+in memory. Each chunk is read and encoded on the event loop (a dict slice plus
+a few hundred small json.dumps, so the loop never shares live records with
+another thread); compression and file I/O run in a worker thread.
+
+JSONL rows are `{"user_id": ..., **record}` and round-trip every field. CSV
+rows are flat (user_id, total, streak_days, last_roll_date, one column per
+outcome) and restore just those fields.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, IO, Iterator, List, Sequence, Set, Tuple
+
+from utils import storage
+
+FORMATS = ("jsonl", "csv")
+EXPORT_DIR = os.getenv("EXPORT_DIR", "").strip() or tempfile.gettempdir()
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "500"))
+
+_CSV_FIXED = ["user_id", "total", "streak_days", "last_roll_date"]
+
+Row = Tuple[int, Dict[str, Any]]
+Progress = Callable[[int, int], Awaitable[None]]
+
+
+def export_path(fmt: str, gz: bool, tag: str = "all") -> str:
+    name = f"brett_stats_{tag}_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}" + (".gz" if gz else "")
+    return os.path.join(EXPORT_DIR, name)
+
+
+class _Writer:
+    """Encodes rows and appends them to a (possibly gzip) text file."""
+
+    def __init__(self, path: str, fmt: str, outcomes: Sequence[str]):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}")
+        self.fmt = fmt
+        self.outcomes = list(outcomes)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".gz"):
+            self._f: IO[str] = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self._f = open(path, "w", encoding="utf-8", newline="")
+        if fmt == "csv":
+            self._f.write(self._csv_line(_CSV_FIXED + self.outcomes))
+
+    @staticmethod
+    def _csv_line(cells: Sequence[Any]) -> str:
+        buf = io.StringIO()
+        csv.writer(buf).writerow(cells)
+        return buf.getvalue()
+
+    def encode(self, rows: Sequence[Row]) -> str:
+        """Serialize a chunk. Runs on the loop: records are live store dicts."""
+        if self.fmt == "csv":
+            return "".join(
+                self._csv_line([uid, int(u.get("total", 0)), int(u.get("streak_days", 0)),
+                                u.get("last_roll_date") or ""]
+                               + [int(u.get("outcomes", {}).get(name, 0)) for name in self.outcomes])
+                for uid, u in rows
+            )
+        return "".join(json.dumps({"user_id": uid, **u}, separators=(",", ":")) + "\n" for uid, u in rows)
+
+    def write(self, text: str) -> None:
+        self._f.write(text)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+async def export_users(path: str, fmt: str = "jsonl", outcomes: Sequence[str] | None = None,
+                       keep: Callable[[List[int]], Awaitable[Set[int]]] | None = None,
+                       progress: Progress | None = None, chunk: int = EXPORT_CHUNK) -> int:
+    """
+    Stream every user (or those `keep` returns for each chunk of ids) to
+    `path`. Calls progress(scanned, total) after each chunk; returns rows written.
+    """
+    if outcomes is None:
+        from constants import BRETT_RESPONSES as outcomes
+    total = await storage.acall(storage.user_count)
+    writer = await asyncio.to_thread(_Writer, path, fmt, outcomes)
+    written = scanned = 0
+    try:
+        while True:
+            batch = [(int(uid), u) for uid, u in await storage.acall(storage.users_chunk, scanned, chunk)]
+            scanned += len(batch)
+            rows = batch
+            if keep is not None and rows:
+                wanted = await keep([uid for uid, _ in rows])
+                rows = [r for r in rows if r[0] in wanted]
+            if rows:
+                await asyncio.to_thread(writer.write, writer.encode(rows))
+                written += len(rows)
+            if progress is not None:
+                await progress(scanned, max(total, scanned))
+            if len(batch) < chunk:
+                break
+    finally:
+        await asyncio.to_thread(writer.close)
+    return written
+
+
+# ---- import ----
+def _open_text(path: str) -> IO[str]:
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _int(v: Any) -> int:
+    return int(v) if v not in (None, "") else 0
+
+
+def read_rows(f: IO[str]) -> Iterator[Row]:
+    """Yield (user_id, record) from a JSONL or CSV export (format sniffed)."""
+    first = f.readline()
+    if not first.strip():
+        return
+    if first.lstrip().startswith("{"):
+        for line in _chain(first, f):
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            uid = int(rec.pop("user_id"))
+            yield uid, rec
+        return
+
+    header = next(csv.reader([first]))
+    if header[0] != "user_id":
+        raise ValueError("not a stats export (expected JSONL or a CSV with a user_id column)")
+    outcome_cols = header[len(_CSV_FIXED):]
+    for cells in csv.reader(f):
+        if not cells:
+            continue
+        row = dict(zip(header, cells))
+        yield int(row["user_id"]), {
+            "total": _int(row.get("total")),
+            "streak_days": _int(row.get("streak_days")),
+            "last_roll_date": row.get("last_roll_date") or None,
+            "outcomes": {name: _int(row.get(name)) for name in outcome_cols},
+        }
+
+
+def _chain(first: str, rest: IO[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def _next_chunk(it: Iterator[Row], n: int) -> List[Row]:
+    out: List[Row] = []
+    for row in it:
+        out.append(row)
+        if len(out) >= n:
+            break
+    return out
+
+
+async def import_file(path: str, mode: str = "merge", progress: Progress | None = None,
+                      chunk: int = EXPORT_CHUNK) -> int:
+    """
+    Stream an export back into storage, `chunk` rows per storage call, and
+    write the store to disk once at the end. Returns rows imported.
+    """
+    if mode not in ("merge", "replace"):
+        raise ValueError(f"unknown import mode {mode!r}")
+    size = os.path.getsize(path)
+    f = await asyncio.to_thread(_open_text, path)
+    done = 0
+    try:
+        rows_iter = read_rows(f)
+        raw = getattr(f.buffer, "fileobj", None) or f.buffer  # compressed offset for .gz
+        while True:
+            rows = await asyncio.to_thread(_next_chunk, rows_iter, chunk)
+            if not rows:
+                break
+            payload = [[uid, rec] for uid, rec in rows]
+            await storage.acall(storage.import_users, payload, mode, False)
+            done += len(rows)
+            if progress is not None:
+                await progress(min(raw.tell(), size), size)
+    finally:
+        await asyncio.to_thread(f.close)
+    await storage.acall(storage.import_users, [], mode, True)
+    return done
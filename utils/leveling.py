@@ -0,0 +1,69 @@
+# utils/leveling.py
+"""
+The Brettventures level curve.
+
+A curve is just what each level costs to clear (cost(level) XP). Curve turns
+that into a cumulative table, cum[i] = XP from level 1 to the start of level
+i + 1, so "where does this much XP put you" is one bisect however many levels
+a grant crosses, not a loop per level. The table is precomputed to
+TABLE_LEVELS and doubles on demand up to MAX_LEVEL; XP past the start of
+MAX_LEVEL just accumulates there.
+
+Players keep storing (level, xp into that level). apply() converts to total
+XP, adds and converts back, so switching curves (BV_LEVEL_CURVE, one of
+CURVES) never rewrites a record: everyone keeps their level and progress and
+the new costs apply from their next level up.
+"""
+from __future__ import annotations
+
+import os
+from bisect import bisect_right
+from typing import Callable, Dict, List, Tuple
+
+XP_PER_LEVEL_BASE = 10
+TABLE_LEVELS = 1000
+MAX_LEVEL = int(os.getenv("BV_MAX_LEVEL", "10000"))
+
+
+class Curve:
+    def __init__(self, name: str, cost: Callable[[int], int]):
+        self.name, self.cost = name, cost
+        self._cum: List[int] = [0]
+        self._grow(TABLE_LEVELS)
+
+    def _grow(self, levels: int) -> None:
+        cum = self._cum
+        for level in range(len(cum), min(levels, MAX_LEVEL)):
+            cum.append(cum[-1] + max(1, int(self.cost(level))))   # strictly increasing, or bisect lies
+
+    def to_next(self, level: int) -> int:
+        """XP that clears `level`."""
+        return max(1, int(self.cost(level)))
+
+    def start(self, level: int) -> int:
+        """Total XP at the start of `level`."""
+        level = max(1, min(level, MAX_LEVEL))
+        if level > len(self._cum):
+            self._grow(max(level, 2 * len(self._cum)))
+        return self._cum[level - 1]
+
+    def level_at(self, total: int) -> Tuple[int, int]:
+        """(level, xp into it) for a total XP."""
+        cum = self._cum
+        while cum[-1] <= total and len(cum) < MAX_LEVEL:
+            self._grow(2 * len(cum))
+        level = max(1, bisect_right(cum, total))
+        return level, total - cum[level - 1]
+
+    def apply(self, level: int, xp: int, amount: int) -> Tuple[int, int]:
+        """(level, xp) after gaining `amount`; XP taken away never costs a level."""
+        if amount <= 0:
+            return level, xp + amount
+        return self.level_at(self.start(level) + xp + amount)
+
+
+CURVES: Dict[str, Curve] = {
+    "linear": Curve("linear", lambda level: XP_PER_LEVEL_BASE * level),        # 10, 20, 30, ...
+    "quadratic": Curve("quadratic", lambda level: XP_PER_LEVEL_BASE * level * level // 2 + 5),
+}
+CURVE = CURVES[os.getenv("BV_LEVEL_CURVE", "linear")]
@@ -0,0 +1,67 @@
+# utils/locks.py
+"""
+Per-entity asyncio locks for commands that read a record, await, then write.
+
+Storage calls themselves are atomic (they run to completion on the event loop,
+or one at a time in the storage daemon), but a command that reads a player,
+awaits Discord and writes the player back can interleave with another command
+for the same user. Holding that user's lock across the read-modify-write
+serializes same-user commands while different users still run in parallel.
+
+    async with USERS.hold(ctx.author.id):
+        ...
+
+KeyedLocks hands out one lock per key and keeps them in a WeakValueDictionary,
+so a lock disappears as soon as nobody holds or waits on it. With `stripes`
+set it hashes keys onto a fixed set of locks instead: memory stays constant,
+at the price of unrelated keys occasionally sharing a lock.
+
+Across processes (sharded bots sharing a storage daemon) these locks don't
+reach; player records also carry a version ("v") that bv_upsert_player checks,
+so a stale write fails with VersionConflict instead of silently winning.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import weakref
+from typing import AsyncIterator, Hashable, List
+
+
+class KeyedLocks:
+    def __init__(self, stripes: int = 0):
+        self._stripes = [asyncio.Lock() for _ in range(stripes)]
+        self._locks: "weakref.WeakValueDictionary[Hashable, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def get(self, key: Hashable) -> asyncio.Lock:
+        if self._stripes:
+            return self._stripes[hash(key) % len(self._stripes)]
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def __len__(self) -> int:
+        """Locks currently alive (striped: the stripe count)."""
+        return len(self._stripes) or len(self._locks)
+
+    @contextlib.asynccontextmanager
+    async def hold(self, *keys: Hashable) -> AsyncIterator[None]:
+        """Hold the locks for all `keys`, taken in a fixed order so two holders can't deadlock."""
+        locks: List[asyncio.Lock] = []
+        for lock in sorted({id(l): l for l in map(self.get, keys)}.values(), key=id):
+            locks.append(lock)  # keep strong refs until released
+        taken: List[asyncio.Lock] = []
+        try:
+            for lock in locks:
+                await lock.acquire()
+                taken.append(lock)
+            yield
+        finally:
+            for lock in reversed(taken):
+                lock.release()
+
+
+# One lock per user and one per guild; a guild's tournament never waits on another guild's
+USERS = KeyedLocks()
+GUILDS = KeyedLocks()
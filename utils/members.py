@@ -0,0 +1,168 @@
+# utils/members.py
+"""
+On-demand member lookups for when the member cache is off (BOT_LOW_MEMORY=1).
+
+Leaderboards only need a display name for ~10 user ids, so instead of caching
+every member of every guild we ask the gateway for just those ids
+(`Guild.query_members`, up to 100 per request) and keep a small LRU of names.
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Container, Dict, Iterable, List, Sequence, Tuple
+
+# (guild_id, user_id) -> (display_name, cached_at)
+_NAME_CACHE_MAX = int(os.getenv("MEMBER_NAME_CACHE", "5000"))
+_NAME_TTL = int(os.getenv("MEMBER_NAME_TTL", "3600"))
+_names: "OrderedDict[Tuple[int, int], Tuple[str, float]]" = OrderedDict()
+
+# Discord's limit for user_ids in one member query
+_QUERY_BATCH = 100
+
+
+def _remember(gid: int, uid: int, name: str) -> None:
+    key = (gid, uid)
+    _names[key] = (name, time.monotonic())
+    _names.move_to_end(key)
+    while len(_names) > _NAME_CACHE_MAX:
+        _names.popitem(last=False)
+
+
+def _cached(gid: int, uid: int) -> str | None:
+    hit = _names.get((gid, uid))
+    if not hit:
+        return None
+    name, at = hit
+    if time.monotonic() - at > _NAME_TTL:
+        _names.pop((gid, uid), None)
+        return None
+    _names.move_to_end((gid, uid))
+    return name
+
+
+def expire_names() -> int:
+    """Drop names older than the TTL (lookups also skip them); returns how many."""
+    cutoff = time.monotonic() - _NAME_TTL
+    stale = [key for key, (_, at) in _names.items() if at < cutoff]
+    for key in stale:
+        del _names[key]
+    return len(stale)
+
+
+def cache_size() -> int:
+    return len(_names)
+
+
+def _has_full_cache(guild) -> bool:
+    """True when guild.members is trustworthy (chunked, normal cache flags)."""
+    return bool(getattr(guild, "chunked", False))
+
+
+async def _query(guild, user_ids: Sequence[int]) -> Dict[int, str]:
+    found: Dict[int, str] = {}
+    for i in range(0, len(user_ids), _QUERY_BATCH):
+        batch = list(user_ids[i:i + _QUERY_BATCH])
+        try:
+            members = await guild.query_members(user_ids=batch, cache=False)
+        except Exception:
+            break
+        for m in members:
+            found[m.id] = m.display_name
+            _remember(guild.id, m.id, m.display_name)
+    return found
+
+
+async def display_names(bot, guild, user_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Best display name for each id: cached member, LRU, gateway query, then a
+    global user fetch. Never raises; unknown users become "User <id>".
+    """
+    out: Dict[int, str] = {}
+    missing: List[int] = []
+    gid = guild.id if guild else 0
+    for uid in user_ids:
+        m = guild.get_member(uid) if guild else None
+        name = m.display_name if m else _cached(gid, uid)
+        if name:
+            out[uid] = name
+        else:
+            missing.append(uid)
+
+    if guild and missing and not _has_full_cache(guild):
+        out.update(await _query(guild, missing))
+        missing = [uid for uid in missing if uid not in out]
+
+    for uid in missing:
+        try:
+            usr = bot.get_user(uid) or await bot.fetch_user(uid)
+            out[uid] = usr.name
+            _remember(0, uid, usr.name)
+        except Exception:
+            out[uid] = f"User {uid}"
+    return out
+
+
+async def top_in_guild(guild, ranked: Sequence[Tuple[int, int]], n: int = 10,
+                       scan_limit: int = 1000) -> List[Tuple[int, str]]:
+    """
+    First `n` (score, name) rows of `ranked` [(score, user_id), ...] whose user
+    is in `guild`. Uses the member cache when it is complete, otherwise checks
+    candidates with batched gateway queries (at most `scan_limit` ids).
+    """
+    rows: List[Tuple[int, str]] = []
+    if _has_full_cache(guild):
+        for score, uid in ranked:
+            m = guild.get_member(uid)
+            if m:
+                rows.append((score, m.display_name))
+                if len(rows) >= n:
+                    break
+        return rows
+
+    for i in range(0, min(len(ranked), scan_limit), _QUERY_BATCH):
+        window = ranked[i:i + _QUERY_BATCH]
+        known = {}
+        unknown = []
+        for _, uid in window:
+            m = guild.get_member(uid)
+            name = m.display_name if m else _cached(guild.id, uid)
+            if name:
+                known[uid] = name
+            else:
+                unknown.append(uid)
+        if unknown:
+            known.update(await _query(guild, unknown))
+        for score, uid in window:
+            if uid in known:
+                rows.append((score, known[uid]))
+                if len(rows) >= n:
+                    return rows
+    return rows
+
+
+async def in_guild(guild, user_ids: Sequence[int], seen: Container[int] | None = None) -> set:
+    """
+    The subset of `user_ids` that are members of `guild` (batched queries when
+    uncached). Without a member cache, `seen` (the ids recorded in this guild,
+    storage.guild_seen) limits the queries to users who could be members;
+    anyone never seen there is left out.
+    """
+    if _has_full_cache(guild):
+        return {uid for uid in user_ids if guild.get_member(uid)}
+    found = {uid for uid in user_ids if guild.get_member(uid) or _cached(guild.id, uid)}
+    rest = [uid for uid in user_ids if uid not in found and (seen is None or uid in seen)]
+    if rest:
+        found.update(await _query(guild, rest))
+    return found
+
+
+async def role_members(guild, role) -> list:
+    """
+    Members holding `role`. role.members only sees the member cache, so without
+    a full cache the whole guild is fetched once (not cached) and filtered.
+    """
+    if _has_full_cache(guild):
+        return list(role.members)
+    return [m for m in await guild.chunk(cache=False) if m.get_role(role.id) is not None]
@@ -0,0 +1,175 @@
+# utils/outbox.py
+"""
+Outbound send scheduler: every ctx.send goes through one queue per channel.
+
+Discord allows about 5 messages per 5 seconds per channel; past that the
+library gets 429s and backs off, and every reply in the channel waits. The
+outbox spends that budget itself (a GCRA bucket per channel, SEND_RATE) so
+sends wait locally instead, and while they wait:
+
+  * short plain-text replies queued for the same channel are merged into one
+    message (each caller still gets that Message back; replies sent with
+    options such as delete_after or an embed always go out on their own),
+    and a channel that sent within the last HOT_SECS holds a reply for
+    COALESCE_WINDOW first so bursts merge instead of queueing;
+  * interactive replies go before bulk output (leaderboards, exports, charts),
+    which commands mark with @bulk_output and which is never merged. As
+    slash commands, bulk commands defer() straight away (defer_bulk).
+
+A quiet channel with budget left sends immediately, so nothing is added to
+the common case. Channels are dropped from the outbox as soon as their queue
+drains. SEND_QUEUE=0 turns the whole thing off.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from discord.ext import commands
+
+from utils import ratelimit
+
+INTERACTIVE, BULK = 0, 1
+
+ENABLED = os.getenv("SEND_QUEUE", "1").strip() != "0"
+SEND_RULE = ratelimit.parse_rule(os.getenv("SEND_RATE", "5/5")) or ratelimit.Rule(5, 5.0)
+COALESCE_WINDOW = float(os.getenv("SEND_COALESCE_MS", "60")) / 1000
+HOT_SECS = 2.0
+COALESCE_MAX = 400          # longer replies always go out on their own
+MESSAGE_MAX = 2000
+
+
+class _Pending:
+    __slots__ = ("ctx", "content", "kwargs", "future")
+
+    def __init__(self, ctx, content, kwargs, future):
+        self.ctx, self.content, self.kwargs, self.future = ctx, content, kwargs, future
+
+    @property
+    def mergeable(self) -> bool:
+        return not self.kwargs and isinstance(self.content, str) and len(self.content) <= COALESCE_MAX
+
+
+class _Channel:
+    __slots__ = ("queues", "task", "last_sent")
+
+    def __init__(self):
+        self.queues: Tuple[Deque[_Pending], Deque[_Pending]] = (deque(), deque())
+        self.task: asyncio.Task | None = None
+        self.last_sent = float("-inf")
+
+    def head(self) -> Deque[_Pending] | None:
+        return self.queues[INTERACTIVE] or self.queues[BULK] or None
+
+
+class Outbox:
+    def __init__(self, rule: ratelimit.Rule = SEND_RULE):
+        self.rule = rule
+        self._bucket = ratelimit.MemoryBackend()
+        self._channels: Dict[int, _Channel] = {}
+        self.sent = 0       # messages actually sent
+        self.merged = 0     # replies folded into another reply's message
+
+    def __len__(self) -> int:
+        """Replies waiting to go out."""
+        return sum(len(q) for ch in self._channels.values() for q in ch.queues)
+
+    async def send(self, ctx: commands.Context, content: Any, kwargs: Dict[str, Any], priority: int = INTERACTIVE):
+        cid = ctx.channel.id
+        ch = self._channels.get(cid)
+        if ch is None:
+            ch = self._channels[cid] = _Channel()
+        future = asyncio.get_running_loop().create_future()
+        ch.queues[priority].append(_Pending(ctx, content, kwargs, future))
+        if ch.task is None:
+            ch.task = asyncio.create_task(self._drain(cid, ch))
+        return await future
+
+    async def _drain(self, cid: int, ch: _Channel) -> None:
+        try:
+            while (q := ch.head()) is not None:
+                now = time.monotonic()
+                wait = self._bucket.hit(str(cid), self.rule.interval, self.rule.tolerance, now)
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                interactive = q is ch.queues[INTERACTIVE]
+                if interactive and q[0].mergeable and now - ch.last_sent < HOT_SECS:
+                    await asyncio.sleep(COALESCE_WINDOW)
+                batch = self._take(q, merge=interactive)
+                if batch:
+                    await self._send(batch)
+                    ch.last_sent = time.monotonic()
+        finally:
+            ch.task = None
+            if self._channels.get(cid) is ch and ch.head() is None:
+                del self._channels[cid]
+
+    @staticmethod
+    def _take(q: Deque[_Pending], merge: bool = True) -> List[_Pending]:
+        """The head reply plus, if `merge`, any short ones right behind it that fit in one message."""
+        while q and q[0].future.done():      # caller went away
+            q.popleft()
+        if not q:
+            return []
+        batch = [q.popleft()]
+        if merge and batch[0].mergeable:
+            size = len(batch[0].content)
+            while q and q[0].mergeable and size + 1 + len(q[0].content) <= MESSAGE_MAX:
+                if not q[0].future.done():
+                    batch.append(q[0])
+                    size += 1 + len(q[0].content)
+                q.popleft()
+        return batch
+
+    async def _send(self, batch: List[_Pending]) -> None:
+        head = batch[0]
+        content = "\n".join(p.content for p in batch) if len(batch) > 1 else head.content
+        try:
+            msg = await commands.Context.send(head.ctx, content, **head.kwargs)
+        except Exception as e:
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+        self.sent += 1
+        self.merged += len(batch) - 1
+        for p in batch:
+            if not p.future.done():
+                p.future.set_result(msg)
+
+
+OUTBOX = Outbox()
+
+
+def bulk_output(func):
+    """Mark a command's replies as bulk: they queue behind interactive ones and are never merged."""
+    if isinstance(func, commands.Command):
+        func.extras["send_priority"] = BULK
+    else:
+        func.__send_priority__ = BULK
+    return func
+
+
+def _priority(cmd: commands.Command | None) -> int:
+    if cmd is None:
+        return INTERACTIVE
+    return cmd.extras.get("send_priority", getattr(cmd.callback, "__send_priority__", INTERACTIVE))
+
+
+async def defer_bulk(ctx: commands.Context) -> None:
+    """Slash invocations of bulk commands acknowledge at once; the reply follows when it's ready."""
+    if ctx.interaction is not None and _priority(ctx.command) == BULK and not ctx.interaction.response.is_done():
+        await ctx.defer()
+
+
+class QueuedContext(commands.Context):
+    """Context whose send goes through the outbox (slash-command replies answer the interaction directly)."""
+
+    async def send(self, content=None, **kwargs):
+        if not ENABLED or self.interaction is not None:
+            return await super().send(content, **kwargs)
+        return await OUTBOX.send(self, content, kwargs, _priority(self.command))
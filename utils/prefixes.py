@@ -0,0 +1,94 @@
+# utils/prefixes.py
+"""
+Per-guild command prefixes, served from memory, plus the on_message pre-filter.
+
+Every guild message reaches on_message (message_content is on), and most are
+chat. could_be_command() turns those away before discord.py builds a Context:
+the first character has to start some prefix or a mention, then the word
+after the prefix has to name a registered command.
+
+Prefixes live in the store (storage.get_prefixes / set_prefix) but are only
+read from there by load(): at startup, before the bot connects, and every
+REFRESH_SECS when shards share a storage daemon (another process may have
+changed one). A change made here updates the cache immediately, so prefix
+lookups never touch storage. Until the first load the pre-filter can't know
+which characters start a prefix, so it lets every message through.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Dict, FrozenSet
+
+from discord.ext import commands
+
+DEFAULT_PREFIX = "!"
+MAX_LEN = 5
+REFRESH_SECS = 60
+
+# discord.py's when_mentioned prefixes are "<@id> " and "<@!id> "
+_MENTION = re.compile(r"<@!?(\d+)> ")
+
+_CACHE: Dict[int, str] | None = None
+_FIRST: FrozenSet[str] = frozenset(DEFAULT_PREFIX[0] + "<")
+
+
+def _install(table: Dict[int, str]) -> None:
+    global _CACHE, _FIRST
+    _CACHE = table
+    _FIRST = frozenset({DEFAULT_PREFIX[0], "<"} | {p[0] for p in table.values()})
+
+
+def load() -> None:
+    """(Re)read every guild's prefix from storage."""
+    from utils import storage
+    _install({int(gid): p for gid, p in storage.get_prefixes().items()})
+
+
+async def refresh() -> None:
+    """Pick up prefixes changed by other shard processes (scheduled every REFRESH_SECS)."""
+    await asyncio.to_thread(load)
+
+
+def prefix_for(guild_id: int | None) -> str:
+    if _CACHE is None:
+        load()
+    return _CACHE.get(guild_id or 0, DEFAULT_PREFIX)
+
+
+async def set_prefix(guild_id: int, prefix: str | None) -> str:
+    """Store a guild's prefix (None or the default clears it); returns the prefix now in effect."""
+    from utils import storage
+    prefix = (prefix or "").strip() or DEFAULT_PREFIX
+    if len(prefix) > MAX_LEN or any(c.isspace() for c in prefix) or prefix[0] in "<@#`":
+        raise ValueError(f"a prefix is 1-{MAX_LEN} characters, no spaces, and can't start with < @ # or `")
+    await storage.acall(storage.set_prefix, guild_id, None if prefix == DEFAULT_PREFIX else prefix)
+    table = dict(_CACHE if _CACHE is not None else {})
+    if prefix == DEFAULT_PREFIX:
+        table.pop(guild_id, None)
+    else:
+        table[guild_id] = prefix
+    _install(table)
+    return prefix
+
+
+def command_prefix(bot: commands.Bot, message) -> list:
+    """command_prefix callable: this guild's prefix, or a mention."""
+    return commands.when_mentioned_or(prefix_for(message.guild.id if message.guild else 0))(bot, message)
+
+
+def could_be_command(bot: commands.Bot, message) -> bool:
+    """False for messages that certainly aren't commands (cheap; no Context is built)."""
+    content = message.content
+    if not content or (_CACHE is not None and content[0] not in _FIRST):
+        return False
+    prefix = prefix_for(message.guild.id if message.guild else 0)
+    if content.startswith(prefix):
+        rest = content[len(prefix):]
+    else:
+        m = _MENTION.match(content)
+        if m is None or bot.user is None or int(m.group(1)) != bot.user.id:
+            return False
+        rest = content[m.end():]
+    word = rest.split(None, 1)[0] if rest and not rest[0].isspace() else ""
+    return word in bot.all_commands
@@ -0,0 +1,156 @@
+# utils/quests.py
+"""
+Quest definitions and the event -> quest index that drives progress.
+
+Quests are data (QUESTS below). At import they are compiled into INDEX, keyed
+by ("event",) for "any event of this type" and ("event", attr, value) for
+quests that only care about e.g. one roll outcome. Storage calls emit() when
+something happens (a roll, an explore, coins earned); emit() looks up just the
+interested quests and bumps their counters, so nothing ever scans players or
+quest lists.
+
+Progress lives on the Brettventures player, in p["flags"]["quests"]:
+
+    {quest_id: [period_key, progress, done]}
+
+where period_key is the UTC day/week index for daily/weekly quests (a stale
+key means "new period, start from zero") and 0 for one-off quests.
+
+emit_for() is the store-side entry point: it finds the adventurer, applies
+the event and pays completed quests from the mint, inside whatever store op
+is running (quest_event when a cog reports an event on its own).
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from utils import brettventures, economy, storage, windows
+from utils.storage import _journaled, _remote
+
+
+class Quest(NamedTuple):
+    id: str
+    name: str
+    event: str                    # "roll", "explore", "fish", "gold_earned"
+    goal: int
+    reward: int                   # coins, paid from the mint on completion
+    period: str = "daily"         # "daily" | "weekly" | "once"
+    match: Tuple[str, Any] | None = None   # (attr, value) the event must carry
+
+
+QUESTS: List[Quest] = [
+    Quest("d_roll", "Roll Brett 10 times", "roll", 10, 25),
+    Quest("d_explore", "Go exploring 3 times", "explore", 3, 30),
+    Quest("d_fish", "Cast 20 lines", "fish", 20, 20),
+    Quest("w_betcha", "Get “You betcha.” 10 times", "roll", 10, 60, "weekly", ("outcome", "You betcha.")),
+    Quest("w_gold", "Earn 500 coins", "gold_earned", 500, 100, "weekly"),
+    Quest("o_nah", "Hear “Nah.” 100 times", "roll", 100, 250, "once", ("outcome", "Nah.")),
+]
+
+BY_ID: Dict[str, Quest] = {q.id: q for q in QUESTS}
+
+
+def _compile(quests: List[Quest]) -> Dict[tuple, List[Quest]]:
+    index: Dict[tuple, List[Quest]] = {}
+    for q in quests:
+        key = (q.event,) + tuple(q.match) if q.match else (q.event,)
+        index.setdefault(key, []).append(q)
+    return index
+
+
+INDEX = _compile(QUESTS)
+
+
+def period_key(q: Quest, now: float) -> int:
+    if q.period == "daily":
+        return windows.unit_key("day", now)
+    if q.period == "weekly":
+        return windows.unit_key("week", now)
+    return 0
+
+
+def interested(event: str, attrs: Dict[str, Any]) -> List[Quest]:
+    """Quests listening for this event (and these attribute values)."""
+    found = list(INDEX.get((event,), ()))
+    for k, v in attrs.items():
+        found.extend(INDEX.get((event, k, v), ()))
+    return found
+
+
+def emit(p: Dict[str, Any], event: str, amount: int = 1, now: float | None = None,
+         **attrs: Any) -> List[Quest]:
+    """Apply one event to a player's quests; returns the quests it completed."""
+    quests = interested(event, attrs)
+    if not quests:
+        return []
+    now = time.time() if now is None else now
+    progress = p.setdefault("flags", {}).setdefault("quests", {})
+    completed = []
+    for q in quests:
+        pk = period_key(q, now)
+        entry = progress.get(q.id)
+        if entry is None or entry[0] != pk:
+            entry = progress[q.id] = [pk, 0, False]
+        if entry[2]:
+            continue
+        entry[1] = min(q.goal, entry[1] + amount)
+        if entry[1] >= q.goal:
+            entry[2] = True
+            completed.append(q)
+    return completed
+
+
+def status(p: Dict[str, Any] | None, now: float | None = None) -> List[Tuple[Quest, int, bool]]:
+    """[(quest, progress, done)] for every quest in the current period."""
+    now = time.time() if now is None else now
+    progress = (p or {}).get("flags", {}).get("quests", {})
+    out = []
+    for q in QUESTS:
+        entry = progress.get(q.id)
+        if entry and entry[0] == period_key(q, now):
+            out.append((q, int(entry[1]), bool(entry[2])))
+        else:
+            out.append((q, 0, False))
+    return out
+
+
+# ---- store ops ----
+def emit_for(user_id: int, event: str, amount: int = 1, now: float | None = None,
+             **attrs: Any) -> List[str]:
+    """Feed one event to the user's quests and pay out any it completes."""
+    if not interested(event, attrs):
+        return []
+    p = storage._root().get("brettventures", {}).get("players", {}).get(str(user_id))
+    if not p:
+        return []  # quests are tracked for adventurers only
+    now = time.time() if now is None else now
+    done = emit(p, event, amount, now, **attrs)
+    brettventures.bump(p)
+    if done:
+        econ = economy.live_node()
+        for q in done:
+            # Paid straight from the mint, so rewards never count as "earned"
+            tx, applied = economy.apply(econ, [(economy.MINT, -q.reward), (str(user_id), q.reward)],
+                                        f"quest:{q.id}", f"quest:{user_id}:{q.id}:{period_key(q, now)}", now)
+            if applied:
+                storage._LEDGER_PENDING.append(tx)
+                storage._lb_touch(user_id, ("gold",))
+    storage._save_soon()
+    return [q.name for q in done]
+
+
+@_remote
+@_journaled
+def quest_event(user_id: int, event: str, amount: int = 1, ts: float | None = None,
+                attrs: Dict[str, Any] | None = None) -> List[str]:
+    """Report a game event (e.g. "explore", "fish"); returns names of quests it completed."""
+    return emit_for(user_id, event, amount, ts, **(attrs or {}))
+
+
+@_remote
+def quest_status(user_id: int) -> List[Dict[str, Any]]:
+    p = storage._root().get("brettventures", {}).get("players", {}).get(str(user_id))
+    return [{"id": q.id, "name": q.name, "progress": n, "goal": q.goal, "done": done,
+             "reward": q.reward, "period": q.period}
+            for q, n, done in status(p)]
@@ -0,0 +1,261 @@
+# utils/ranking.py
+"""
+Leaderboard engine: one order-statistic index per (metric, scope).
+
+RankIndex keeps (-score, user_id) keys in a list of sorted blocks (at most
+2 * LOAD keys each) plus a Fenwick tree over the block sizes, so
+
+    set(uid, score)      O(log n + LOAD)    (writers call this on every change)
+    rank(uid)            O(log n)           1-based, ties share a rank
+    rows(start, n)       O(log n + n)       one page of the board
+    position(uid)        O(log n)           0-based, for "around me"
+
+and nothing ever sorts or scans all users after the first build. Users with a
+score of 0 are left off the board.
+
+Metrics say where a score lives in the store (see METRICS); storage builds an
+index the first time a board is asked for and keeps it current from then on.
+"""
+from __future__ import annotations
+
+import bisect
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+LOAD = 256
+
+
+class RankIndex:
+    def __init__(self, items: Iterable[Tuple[int, int]] = ()):
+        self._score: Dict[int, int] = {}
+        keys = []
+        for uid, score in items:
+            if score > 0:
+                self._score[uid] = score
+                keys.append((-score, uid))
+        keys.sort()
+        self._blocks: List[List[Tuple[int, int]]] = [keys[i:i + LOAD] for i in range(0, len(keys), LOAD)]
+        self._reindex()
+
+    def __len__(self) -> int:
+        return len(self._score)
+
+    def score(self, uid: int) -> int:
+        return self._score.get(uid, 0)
+
+    # ---- Fenwick tree over block sizes ----
+    def _reindex(self) -> None:
+        """Rebuild the block maxima and size tree (only when blocks split or vanish)."""
+        self._maxes = [b[-1] for b in self._blocks]
+        n = len(self._blocks)
+        tree = [0] * (n + 1)
+        for i, b in enumerate(self._blocks, start=1):
+            tree[i] += len(b)
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _grow(self, i: int, delta: int) -> None:
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, i: int) -> int:
+        """Keys in blocks [0, i)."""
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, pos: int) -> Tuple[int, int]:
+        """(block, offset) of the key at 0-based position `pos`."""
+        i, step = 0, 1 << (len(self._tree).bit_length())
+        while step:
+            j = i + step
+            if j < len(self._tree) and self._tree[j] <= pos:
+                pos -= self._tree[j]
+                i = j
+            step >>= 1
+        return i, pos
+
+    # ---- updates ----
+    def set(self, uid: int, score: int) -> None:
+        old = self._score.get(uid, 0)
+        if old == score:
+            return
+        if old > 0:
+            self._remove((-old, uid))
+            del self._score[uid]
+        if score > 0:
+            self._insert((-score, uid))
+            self._score[uid] = score
+
+    def _insert(self, key: Tuple[int, int]) -> None:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._reindex()
+            return
+        i = min(bisect.bisect_left(self._maxes, key), len(self._blocks) - 1)
+        b = self._blocks[i]
+        bisect.insort(b, key)
+        self._maxes[i] = b[-1]
+        if len(b) > 2 * LOAD:
+            self._blocks[i:i + 1] = [b[:LOAD], b[LOAD:]]
+            self._reindex()
+        else:
+            self._grow(i, 1)
+
+    def _remove(self, key: Tuple[int, int]) -> None:
+        i = bisect.bisect_left(self._maxes, key)
+        b = self._blocks[i]
+        del b[bisect.bisect_left(b, key)]
+        if b:
+            self._maxes[i] = b[-1]
+            self._grow(i, -1)
+        else:
+            del self._blocks[i]
+            self._reindex()
+
+    # ---- queries ----
+    def _count_below(self, key: tuple) -> int:
+        i = bisect.bisect_left(self._maxes, key)
+        n = self._before(i)
+        if i < len(self._blocks):
+            n += bisect.bisect_left(self._blocks[i], key)
+        return n
+
+    def rank_of_score(self, score: int) -> int:
+        """1 + how many users score strictly higher."""
+        return self._count_below((-score,)) + 1
+
+    def rank(self, uid: int) -> int | None:
+        score = self._score.get(uid)
+        return self.rank_of_score(score) if score else None
+
+    def position(self, uid: int) -> int | None:
+        score = self._score.get(uid)
+        return self._count_below((-score, uid)) if score else None
+
+    def rows(self, start: int, n: int) -> List[Tuple[int, int, int]]:
+        """[(rank, user_id, score), ...] for positions [start, start + n)."""
+        out: List[Tuple[int, int, int]] = []
+        if start < 0 or start >= len(self._score) or n <= 0:
+            return out
+        bi, off = self._locate(start)
+        prev, rank = None, 0
+        for key in self._iter_from(bi, off):
+            score = -key[0]
+            if score != prev:
+                rank = self.rank_of_score(score) if prev is None else start + len(out) + 1
+                prev = score
+            out.append((rank, key[1], score))
+            if len(out) >= n:
+                break
+        return out
+
+    def _iter_from(self, bi: int, off: int) -> Iterator[Tuple[int, int]]:
+        for b in self._blocks[bi:]:
+            yield from b[off:]
+            off = 0
+
+
+# ---- metrics ----
+class Metric(NamedTuple):
+    name: str
+    label: str
+    source: Callable[[Dict[str, Any]], Iterable[str]]   # every user id (str) that may score
+    score: Callable[[Dict[str, Any], str], int]
+    show: Callable[[int], str] = lambda n: f"{n:,}"
+
+
+def _users(root):
+    return root.get("users", {})
+
+
+def _players(root):
+    return root.get("brettventures", {}).get("players", {})
+
+
+def _balances(root):
+    return root.get("economy", {}).get("balances", {})
+
+
+def _battlers(root):
+    return root.get("battles", {}).get("players", {})
+
+
+# Level boards order by level, then XP inside the level
+_LEVEL_SPAN = 1_000_000
+
+
+def _level_score(root, uid):
+    p = _players(root).get(uid)
+    return int(p.get("level", 1)) * _LEVEL_SPAN + int(p.get("xp", 0)) if p else 0
+
+
+def _show_level(n: int) -> str:
+    level, xp = divmod(n, _LEVEL_SPAN)
+    return f"Lv {level} ({xp} XP)"
+
+
+METRICS: Dict[str, Metric] = {m.name: m for m in (
+    Metric("rolls", "Rolls", _users,
+           lambda root, uid: int(_users(root).get(uid, {}).get("total", 0))),
+    Metric("streak", "Streak", _users,
+           lambda root, uid: int(_users(root).get(uid, {}).get("streak_days", 0)),
+           lambda n: f"{n} day{'s' if n != 1 else ''}"),
+    Metric("level", "Level", _players, _level_score, _show_level),
+    Metric("elo", "Battle Rating", _battlers,
+           lambda root, uid: round(_battlers(root).get(uid, {}).get("elo", 0))),
+    Metric("wins", "Battle Wins", _battlers,
+           lambda root, uid: int(_battlers(root).get(uid, {}).get("w", 0))),
+    Metric("gold", "Coins", lambda root: [a for a in _balances(root) if not a.startswith("@")],
+           lambda root, uid: int(_balances(root).get(uid, 0)),
+           lambda n: f"{n:,} 🪙"),
+)}
+
+# Metric names accepted from users
+ALIASES = {
+    "roll": "rolls", "total": "rolls", "brett": "rolls",
+    "streaks": "streak",
+    "lvl": "level", "xp": "level", "levels": "level",
+    "coins": "gold", "money": "gold", "balance": "gold", "rich": "gold",
+    "rating": "elo", "battle": "elo", "battles": "elo", "win": "wins",
+}
+
+OUTCOME_PREFIX = "outcome:"
+
+
+def outcome_metric(outcome: str) -> Metric:
+    """Board for one roll outcome, e.g. most "Nah." results."""
+    name = OUTCOME_PREFIX + outcome
+    if name not in METRICS:
+        METRICS[name] = Metric(
+            name, f"“{outcome}”", _users,
+            lambda root, uid: int(_users(root).get(uid, {}).get("outcomes", {}).get(outcome, 0)))
+    return METRICS[name]
+
+
+def get_metric(name: str) -> Metric:
+    if name.startswith(OUTCOME_PREFIX):
+        return outcome_metric(name[len(OUTCOME_PREFIX):])
+    try:
+        return METRICS[name]
+    except KeyError:
+        raise ValueError(f"unknown metric {name!r}") from None
+
+
+def resolve(word: str | None, outcomes: Iterable[str] = ()) -> str | None:
+    """Metric name for a user-typed word ("gold", "nah", "lvl"), or None."""
+    if not word:
+        return "rolls"
+    w = word.strip().lower()
+    w = ALIASES.get(w, w)
+    if w in METRICS and not w.startswith(OUTCOME_PREFIX):
+        return w
+    for o in outcomes:
+        if o.lower().rstrip(".").startswith(w.rstrip(".")):
+            return OUTCOME_PREFIX + o
+    return None
@@ -0,0 +1,275 @@
+# utils/ratelimit.py
+"""
+Command rate limits that survive restarts and hold across shard processes.
+
+Limits use GCRA (the generic cell rate algorithm, a token bucket kept as one
+number): each key stores a "theoretical arrival time" (TAT). A limit of
+`rate` uses per `per` seconds spaces uses T = per / rate apart and lets a
+caller run up to (burst - 1) * T ahead of that schedule:
+
+    tat = max(stored, now)
+    if tat - now > (burst - 1) * T:  denied, retry after the difference
+    else:                            stored = tat + T
+
+so a check is one read and one write, and a key whose TAT has passed is
+indistinguishable from a missing one, which is what lets backends evict
+expired keys lazily without changing any answer. A command usually has
+several limits (its own plus the guild and global budgets); hit_all checks
+them together and spends them only if every one allows the use, so a denied
+command costs nothing.
+
+Backends (RATE_LIMIT_BACKEND):
+  memory  per-process dict (the default for a single process)
+  daemon  the storage daemon's memory, shared by every shard (the default
+          when STORAGE_SOCKET is set)
+  sqlite  a SQLite file (RATE_LIMIT_DB), shared by processes on one host and
+          kept across restarts of everything
+
+Commands opt in with @limit(...) in place of @commands.cooldown(...); the
+bot-wide before_invoke hook enforces those plus the optional per-guild and
+global budgets (RATE_LIMIT_GUILD / RATE_LIMIT_GLOBAL, "uses/seconds").
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:   # discord stays out of the storage daemon, which imports this module
+    from discord.ext import commands
+
+# Checks between sweeps of expired keys (sqlite)
+SQLITE_SWEEP_EVERY = 1000
+
+# (key, interval, tolerance) as the backends take it
+Check = Tuple[str, float, float]
+
+
+class Rule(NamedTuple):
+    rate: int
+    per: float
+    scope: str = "user"            # "user" | "channel" | "guild" | "global"
+    burst: int | None = None       # defaults to `rate`
+
+    @property
+    def interval(self) -> float:
+        return self.per / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        return (max(1, self.burst or self.rate) - 1) * self.interval
+
+
+# ---- backends ----
+class MemoryBackend:
+    """
+    key -> TAT, plus a heap of (TAT, key) so expired keys come off in TAT
+    order whatever their interval; heap entries left behind by a later hit
+    on the same key are skipped when they surface.
+    """
+
+    blocking = False
+
+    def __init__(self):
+        self._tat: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def hit(self, key: str, interval: float, tolerance: float, now: float) -> float:
+        return self.hit_all([(key, interval, tolerance)], now)[0]
+
+    def hit_all(self, checks: Sequence[Check], now: float) -> List[float]:
+        """Spend one use of every check, or of none if any is denied; the wait per check."""
+        with self._lock:
+            self._evict(now)
+            waits, spent = _gcra(checks, self._tat.get, now)
+            if not any(waits):
+                for key, tat in spent.items():
+                    self._tat[key] = tat
+                    heapq.heappush(self._expiry, (tat, key))
+            return waits
+
+    def _evict(self, now: float) -> None:
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            tat, key = heapq.heappop(heap)
+            if self._tat.get(key) == tat:
+                del self._tat[key]
+
+
+def _gcra(checks: Sequence[Check], stored, now: float) -> Tuple[List[float], Dict[str, float]]:
+    """(wait per check, new TAT per key) for `checks` against the `stored` TAT lookup."""
+    waits: List[float] = []
+    spent: Dict[str, float] = {}
+    for key, interval, tolerance in checks:
+        tat = max(spent[key] if key in spent else (stored(key) or now), now)
+        waits.append(max(0.0, tat - now - tolerance))
+        spent[key] = tat + interval
+    return waits, spent
+
+
+class DaemonBackend:
+    """Forwards to the storage daemon, which keeps a MemoryBackend for all shards."""
+
+    blocking = True
+
+    def hit(self, key: str, interval: float, tolerance: float, now: float) -> float:
+        return self.hit_all([(key, interval, tolerance)], now)[0]
+
+    def hit_all(self, checks: Sequence[Check], now: float) -> List[float]:
+        from utils import storage
+        return storage.rate_hit_all([list(c) for c in checks], now)
+
+
+class SQLiteBackend:
+    blocking = False   # a local file; a check is well under a millisecond
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS rate (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+        self._db.execute("CREATE INDEX IF NOT EXISTS rate_tat ON rate (tat)")
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key: str, interval: float, tolerance: float, now: float) -> float:
+        return self.hit_all([(key, interval, tolerance)], now)[0]
+
+    def hit_all(self, checks: Sequence[Check], now: float) -> List[float]:
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                def stored(key: str) -> float | None:
+                    row = db.execute("SELECT tat FROM rate WHERE key = ?", (key,)).fetchone()
+                    return row[0] if row else None
+
+                waits, spent = _gcra(checks, stored, now)
+                if not any(waits):
+                    db.executemany("INSERT INTO rate (key, tat) VALUES (?, ?) "
+                                   "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat", spent.items())
+                    self._hits += 1
+                    if self._hits % SQLITE_SWEEP_EVERY == 0:
+                        db.execute("DELETE FROM rate WHERE tat <= ?", (now,))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return waits
+
+
+_BACKEND = None
+
+
+def backend():
+    global _BACKEND
+    if _BACKEND is None:
+        from utils import storage
+        kind = os.getenv("RATE_LIMIT_BACKEND", "").strip().lower() or ("daemon" if storage.STORAGE_SOCKET else "memory")
+        if kind == "daemon":
+            _BACKEND = DaemonBackend()
+        elif kind == "sqlite":
+            default = os.path.join(os.path.dirname(storage.STATS_FILE) or ".", "ratelimit.db")
+            _BACKEND = SQLiteBackend(os.getenv("RATE_LIMIT_DB") or default)
+        else:
+            _BACKEND = MemoryBackend()
+    return _BACKEND
+
+
+async def hit(key: str, rule: Rule, now: float | None = None) -> float:
+    """Spend one use of `rule` for `key`; 0.0 if allowed, else seconds until it would be."""
+    return (await hit_all([(key, rule)], now))[0]
+
+
+async def hit_all(checks: Sequence[Tuple[str, Rule]], now: float | None = None) -> List[float]:
+    """
+    Spend one use of every (key, rule), or of none if any is denied.
+    Returns the wait per check: all 0.0 when the use was spent.
+    """
+    now = time.time() if now is None else now
+    b = backend()
+    raw = [(key, rule.interval, rule.tolerance) for key, rule in checks]
+    if b.blocking:
+        return await asyncio.to_thread(b.hit_all, raw, now)
+    return b.hit_all(raw, now)
+
+
+# ---- discord.py glue ----
+SCOPES = ("user", "channel", "guild", "global")
+
+
+def parse_rule(text: str) -> Optional[Rule]:
+    """'60/30' -> 60 uses per 30 seconds; empty or 0 disables."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    uses, _, secs = text.partition("/")
+    rule = Rule(int(uses), float(secs or 1))
+    return rule if rule.rate > 0 and rule.per > 0 else None
+
+
+GUILD_BUDGET = parse_rule(os.getenv("RATE_LIMIT_GUILD", ""))
+GLOBAL_BUDGET = parse_rule(os.getenv("RATE_LIMIT_GLOBAL", ""))
+
+
+def limit(rate: int, per: float, scope: str = "user", burst: int | None = None):
+    """
+    Shared replacement for @commands.cooldown: `rate` uses per `per` seconds
+    for each user / channel / guild, or bot-wide with scope="global".
+    Works above or below @commands.command.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"unknown rate limit scope {scope!r}")
+    rule = Rule(rate, per, scope, burst)
+
+    def decorator(func):
+        from discord.ext import commands
+        if isinstance(func, commands.Command):
+            func.extras.setdefault("rate_limits", []).append(rule)
+        else:
+            func.__dict__.setdefault("__rate_limits__", []).append(rule)
+        return func
+
+    return decorator
+
+
+def _rules(cmd: commands.Command) -> List[Rule]:
+    return getattr(cmd.callback, "__rate_limits__", []) + cmd.extras.get("rate_limits", [])
+
+
+def _scope_id(ctx: commands.Context, scope: str) -> int:
+    if scope == "user":
+        return ctx.author.id
+    if scope == "channel":
+        return ctx.channel.id
+    if scope == "guild":
+        return ctx.guild.id if ctx.guild else ctx.author.id   # DMs count per user
+    return 0
+
+
+async def before_invoke(ctx: commands.Context) -> None:
+    """Bot-wide before_invoke hook: raises CommandOnCooldown like a built-in cooldown."""
+    from discord.ext import commands
+    checks = [(f"cmd:{ctx.command.qualified_name}:{r.scope}:{_scope_id(ctx, r.scope)}", r)
+              for r in _rules(ctx.command)]
+    if GUILD_BUDGET and ctx.guild:
+        checks.append((f"guild:{ctx.guild.id}", GUILD_BUDGET._replace(scope="guild")))
+    if GLOBAL_BUDGET:
+        checks.append(("global", GLOBAL_BUDGET._replace(scope="global")))
+    if not checks:
+        return
+    # Nothing is spent unless every limit allows the use; report the longest wait
+    retry, rule = max(zip(await hit_all(checks), (r for _, r in checks)), key=lambda wr: wr[0])
+    if retry:
+        bucket = commands.BucketType.default if rule.scope == "global" else commands.BucketType[rule.scope]
+        raise commands.CommandOnCooldown(commands.Cooldown(rule.rate, rule.per), retry, bucket)
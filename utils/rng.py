@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import os
 import random
-from typing import Sequence, TypeVar
+from typing import Dict, Generic, List, Sequence, TypeVar
 
 T = TypeVar("T")
 
@@ -19,6 +19,8 @@ __all__ = [
     "dice",
     "nudge",
     "chance_from_stat",
+    "Stream",
+    "AliasTable",
 ]
 
 # Single RNG instance so outcomes are consistent across imports
@@ -168,3 +170,96 @@ def chance_from_stat(stat: int, cap: int = 50) -> float:
     Example: stat 0 -> 0.00, stat 25 -> 0.25, stat 80 -> 0.5 if cap=50.
     """
     return max(0.0, min(1.0, stat / float(cap)))
+
+
+# Independent streams ---------------------------------------------------
+
+class Stream(random.Random):
+    """
+    An RNG of its own with the roll helpers above as methods. Seed one per
+    fight (or any event that must replay): the same seed gives the same
+    draws whatever else has used the shared RNG in the meantime.
+    """
+
+    def roll(self, n: int = 100) -> int:
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        return self.randint(1, n)
+
+    def adv(self, n: int = 100) -> int:
+        a, b = self.randint(1, n), self.randint(1, n)
+        return a if a >= b else b
+
+    def dis(self, n: int = 100) -> int:
+        a, b = self.randint(1, n), self.randint(1, n)
+        return a if a <= b else b
+
+    def percent(self, p: float) -> bool:
+        return p >= 1 or (p > 0 and self.random() < p)
+
+    def gauss_bounded(self, mean: float, sd: float, lo: float, hi: float) -> float:
+        if lo > hi:
+            lo, hi = hi, lo
+        if sd <= 0:
+            return max(lo, min(hi, mean))
+        return min(hi, max(lo, self.gauss(mean, sd)))
+
+
+# Precomputed weighted sampling ----------------------------------------
+
+class AliasTable(Generic[T]):
+    """
+    Walker/Vose alias table: O(n) to build, O(1) per draw, one uniform each.
+    Build once per loot table and reuse it for every draw.
+    """
+
+    __slots__ = ("items", "prob", "alias")
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights) or not items:
+            raise ValueError("items and weights must be same length and non-empty")
+        if any(w < 0 for w in weights):
+            raise ValueError("weights must be non-negative")
+        n = len(items)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights] if total > 0 else [1.0] * n
+        self.items: List[T] = list(items)
+        self.prob: List[float] = [1.0] * n
+        self.alias: List[int] = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # leftovers are 1.0 up to float error; prob/alias already say "keep"
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self) -> T:
+        u = _RNG.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if u - i < self.prob[i] else self.items[self.alias[i]]
+
+    def sample_n(self, k: int) -> List[T]:
+        """k independent draws in one pass (locals bound once, no per-draw calls into the table)."""
+        rnd = _RNG.random
+        items, prob, alias = self.items, self.prob, self.alias
+        n = len(items)
+        out: List[T] = []
+        for _ in range(k):
+            u = rnd() * n
+            i = int(u)
+            out.append(items[i] if u - i < prob[i] else items[alias[i]])
+        return out
+
+    def counts_n(self, k: int) -> Dict[T, int]:
+        """Histogram of k draws: {item: times drawn}."""
+        counts: Dict[T, int] = {}
+        for item in self.sample_n(k):
+            counts[item] = counts.get(item, 0) + 1
+        return counts
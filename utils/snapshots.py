@@ -0,0 +1,270 @@
+# utils/snapshots.py
+"""
+Point-in-time backups for the stats store: gzip snapshots plus an op journal.
+
+Every mutating storage op is appended to the journal (one JSON line, with its
+sequence number and timestamp) before it is applied. Snapshots are full copies
+of the store taken every SNAPSHOT_EVERY seconds; each one starts a new journal
+segment. Any point in time is then "newest snapshot at or before T, plus the
+journal entries after it up to T", and a crash or corrupt stats file is the
+same thing with T = now.
+
+Snapshots are written by a forked child (copy-on-write pages of the parent's
+in-memory store), so the event loop only pays for the fork. Where fork isn't
+available the store is serialized inline and compressed in a thread.
+
+Layout (SNAPSHOT_DIR, default "<stats dir>/snapshots"):
+    stats-<seq>-<unix ts>.json.gz     snapshot containing ops 1..seq
+    journal-<first seq>.jsonl         {"seq", "ts", "op", "args", "kwargs"} per line
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+SNAPSHOT_EVERY = int(os.getenv("SNAPSHOT_EVERY", "3600"))
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", "24"))
+JOURNAL_ENABLED = os.getenv("STATS_JOURNAL", "1") != "0"
+
+_SNAP_RE = re.compile(r"^stats-(\d+)-(\d+)\.json\.gz$")
+_SEG_RE = re.compile(r"^journal-(\d+)\.jsonl$")
+
+# Trailing key the store writer appends; see seal()/unseal()
+_SEAL = ',\n  "_checksum": "'
+
+
+class Snapshot(NamedTuple):
+    seq: int
+    ts: int
+    path: str
+
+
+def snapshot_dir(stats_file: str) -> str:
+    return os.getenv("SNAPSHOT_DIR") or os.path.join(os.path.dirname(stats_file) or ".", "snapshots")
+
+
+# ---- checksummed store file ----
+def seal(text: str) -> str:
+    """
+    Append a "_checksum" key (sha256 of everything before it) to a JSON object
+    serialized with indent=2. The result is still plain JSON.
+    """
+    if not text.endswith("\n}"):
+        return text  # empty object: nothing worth protecting
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return text[:-2] + _SEAL + digest + '"\n}'
+
+
+_ENCODER = json.JSONEncoder(indent=2)
+_WRITE_CHUNK = 1 << 16
+
+
+def write_sealed(f, obj: Dict[str, Any]) -> None:
+    """
+    seal(json.dumps(obj, indent=2)) written to `f` as it is encoded, so the
+    whole text (tens of MB at 100k users) never sits in memory at once.
+    """
+    digest = hashlib.sha256()
+    parts: List[str] = []
+    size, held = 0, ""
+    for chunk in _ENCODER.iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= _WRITE_CHUNK:
+            # Hold the last two characters back: the seal goes in front of "\n}"
+            text = held + "".join(parts)
+            text, held = text[:-2], text[-2:]
+            digest.update(text.encode("utf-8"))
+            f.write(text)
+            parts, size = [], 0
+    text = held + "".join(parts)
+    if not text.endswith("\n}"):
+        f.write(text)  # empty object: nothing worth protecting
+        return
+    digest.update(text.encode("utf-8"))
+    f.write(text[:-2] + _SEAL + digest.hexdigest() + '"\n}')
+
+
+def unseal(text: str) -> Tuple[Dict[str, Any], bool]:
+    """(data, ok). ok is False when the checksum doesn't match the content."""
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("store is not a JSON object")
+    want = data.pop("_checksum", None)
+    if want is None:
+        return data, True  # written before checksums existed
+    i = text.rfind(_SEAL)
+    body = text[:i] + "\n}" if i >= 0 else ""
+    return data, hashlib.sha256(body.encode("utf-8")).hexdigest() == want
+
+
+# ---- journal ----
+class Journal:
+    """Append-only op log, split into one segment per snapshot."""
+
+    def __init__(self, directory: str):
+        self.dir = directory
+        self._f = None
+
+    def rotate(self, first_seq: int) -> None:
+        self.close()
+        os.makedirs(self.dir, exist_ok=True)
+        self._f = open(os.path.join(self.dir, f"journal-{first_seq:012d}.jsonl"), "a", encoding="utf-8")
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        if self._f is None:
+            self.rotate(entry["seq"])
+        self._f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def _segments(directory: str) -> List[Tuple[int, str]]:
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    out = [(int(m.group(1)), os.path.join(directory, n)) for n in names if (m := _SEG_RE.match(n))]
+    return sorted(out)
+
+
+def entries(directory: str, after_seq: int = 0, before_seq: Optional[int] = None,
+            until_ts: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Journal entries with after_seq < seq (< before_seq) and ts <= until_ts, in order."""
+    segs = _segments(directory)
+    for i, (start, path) in enumerate(segs):
+        nxt = segs[i + 1][0] if i + 1 < len(segs) else None
+        if nxt is not None and nxt - 1 <= after_seq:
+            continue  # whole segment is already in the base
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    break  # torn write at the tail of a segment
+                seq = e.get("seq", 0)
+                if seq <= after_seq:
+                    continue
+                if before_seq is not None and seq >= before_seq:
+                    return
+                if until_ts is not None and e.get("ts", 0) > until_ts:
+                    return
+                yield e
+
+
+def journal_start(directory: str) -> int:
+    """First seq still covered by the journal (0 if there is no journal)."""
+    segs = _segments(directory)
+    return segs[0][0] if segs else 0
+
+
+def last_seq(directory: str) -> int:
+    segs = _segments(directory)
+    for _, path in reversed(segs):
+        last = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    last = json.loads(line).get("seq", last)
+                except ValueError:
+                    break
+        if last:
+            return last
+    return 0
+
+
+# ---- snapshots ----
+def list_snapshots(directory: str) -> List[Snapshot]:
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    out = [Snapshot(int(m.group(1)), int(m.group(2)), os.path.join(directory, n))
+           for n in names if (m := _SNAP_RE.match(n))]
+    return sorted(out)
+
+
+def snapshot_path(directory: str, seq: int) -> str:
+    return os.path.join(directory, f"stats-{seq:012d}-{int(time.time())}.json.gz")
+
+
+def write(path: str, obj: Any) -> None:
+    """Write a snapshot atomically. `obj` may be the store or its JSON text."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        if isinstance(obj, str):
+            f.write(obj)
+        else:
+            json.dump(obj, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def fork_write(path: str, obj: Dict[str, Any]) -> Optional[int]:
+    """
+    Write `obj` from a forked child and return its pid, or None if fork isn't
+    available (caller falls back to write()). The child sees a frozen
+    copy-on-write view of `obj`, so the parent can keep mutating it.
+    """
+    if not hasattr(os, "fork"):
+        return None
+    try:
+        pid = os.fork()
+    except OSError:
+        return None
+    if pid == 0:
+        code = 0
+        try:
+            write(path, obj)
+        except BaseException:
+            code = 1
+        os._exit(code)
+    return pid
+
+
+def load(path: str) -> Optional[Dict[str, Any]]:
+    """A snapshot's contents, or None if it is truncated/corrupt (gzip CRC or JSON)."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def prune(directory: str, keep: int = SNAPSHOT_KEEP) -> int:
+    """Keep the newest `keep` snapshots and the journal segments they need."""
+    snaps = list_snapshots(directory)
+    removed = 0
+    for s in snaps[:-keep] if keep > 0 else []:
+        os.remove(s.path)
+        removed += 1
+    kept = snaps[-keep:] if keep > 0 else snaps
+    if not kept:
+        return removed
+    oldest = kept[0].seq
+    segs = _segments(directory)
+    for i, (start, path) in enumerate(segs[:-1]):
+        if segs[i + 1][0] - 1 <= oldest:
+            os.remove(path)
+    return removed
+
+
+async def snapshot_and_prune(take: Callable[[], Tuple[Optional[int], str]]) -> None:
+    """Call take(), reap the child it forks and prune (a scheduled job, every SNAPSHOT_EVERY)."""
+    pid, directory = take()
+    if pid:
+        _, status = await asyncio.to_thread(os.waitpid, pid, 0)
+        if status != 0:
+            raise RuntimeError(f"snapshot writer exited with status {status}")
+    await asyncio.to_thread(prune, directory)
@@ -2,19 +2,460 @@
 import os
 import json
 import time
-from typing import Dict, Any, List
+import asyncio
+import socket
+import collections
+import inspect
+import functools
+import threading
+from typing import Dict, Any, Iterable, List, Callable
+
+from utils import achievements, ranking, snapshots, tiers, timeutil, windows
 
 # Where to write stats. On Render, set env var:
 # STATS_FILE=/data/stats.json   (or /opt/render/project/src/data/stats.json)
 STATS_FILE = os.getenv("STATS_FILE", "stats.json")
 
-# Brettventures stamina regen: default 1 point every 6 hours
-BV_STAMINA_REGEN_SECS = int(os.getenv("BV_STAMINA_REGEN_SECS", str(3 * 3600)))
+# Multi-process mode: when set, the public reads/writes below are forwarded to
+# the storage daemon (python -m utils.storage_daemon) listening on this Unix
+# socket, which owns STATS_FILE and applies every write in order. Coroutines
+# go through acall() so the round trip doesn't block the event loop.
+STORAGE_SOCKET = os.getenv("STORAGE_SOCKET", "").strip() or None
+
+# ---- remote (storage daemon) ----
+class StorageError(RuntimeError):
+    """The storage daemon failed or returned an error we can't map to a builtin."""
+
+
+class VersionConflict(ValueError):
+    """The record changed since the caller read it; re-read and try again."""
+
+
+# name -> local implementation; the daemon serves exactly these
+REMOTE_OPS: Dict[str, Callable[..., Any]] = {}
+
+_REMOTE_ERRORS = {"ValueError": ValueError, "KeyError": KeyError, "TypeError": TypeError,
+                  "VersionConflict": VersionConflict}
+
+
+class _Client:
+    """Blocking newline-delimited JSON client for threads; one request in flight at a time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._rfile = None
+        self._seq = 0
+
+    def _connect(self) -> None:
+        self.close()
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(self.path)
+        self._sock = s
+        self._rfile = s.makefile("rb")
+
+    def close(self) -> None:
+        if self._rfile is not None:
+            self._rfile.close()
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._rfile = None
+
+    def call(self, op: str, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._seq += 1
+            req = _request(self._seq, op, args, kwargs)
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(req)
+                    line = self._rfile.readline()
+                    if not line:
+                        raise ConnectionError("storage daemon closed the connection")
+                    break
+                except OSError as e:
+                    self.close()
+                    if attempt == 2:
+                        raise StorageError(f"storage daemon unreachable at {self.path}: {e}") from e
+        return _result(line)
+
+
+def _request(seq: int, op: str, args: tuple, kwargs: dict) -> bytes:
+    return (json.dumps({"id": seq, "op": op, "args": list(args), "kwargs": kwargs}) + "\n").encode("utf-8")
+
+
+def _result(line: bytes) -> Any:
+    resp = json.loads(line)
+    if resp.get("ok"):
+        return resp.get("result")
+    exc = _REMOTE_ERRORS.get(resp.get("type"), StorageError)
+    raise exc(resp.get("error", "storage daemon error"))
+
+
+class _AsyncClient:
+    """
+    _Client for coroutines: requests are pipelined on one connection and the
+    daemon answers a connection's requests in order, so each caller awaits
+    its own reply and the event loop never blocks on the socket.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: asyncio.StreamWriter | None = None
+        self._reading: asyncio.Task | None = None
+        self._waiting: collections.deque = collections.deque()
+        self._connecting = asyncio.Lock()
+        self._seq = 0
+
+    async def _connect(self) -> None:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path, limit=1 << 30)
+        except OSError as e:
+            raise StorageError(f"storage daemon unreachable at {self.path}: {e}") from e
+        self._writer = writer
+        self._reading = asyncio.create_task(self._read(reader, writer))
+
+    async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("storage daemon closed the connection")
+                fut = self._waiting.popleft()
+                if not fut.done():   # its caller may have given up (cancelled)
+                    fut.set_result(line)
+        except Exception as e:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            while self._waiting:
+                fut = self._waiting.popleft()
+                if not fut.done():
+                    fut.set_exception(StorageError(f"storage daemon connection lost: {e}"))
+
+    async def call(self, op: str, args: tuple, kwargs: dict) -> Any:
+        if self._writer is None:
+            async with self._connecting:
+                if self._writer is None:
+                    await self._connect()
+        self._seq += 1
+        fut = asyncio.get_running_loop().create_future()
+        # No await between queueing the future and writing: replies match up in order
+        self._waiting.append(fut)
+        self._writer.write(_request(self._seq, op, args, kwargs))
+        await self._writer.drain()
+        return _result(await fut)
+
+
+_CLIENT: _Client | None = None
+_ACLIENTS: Dict[asyncio.AbstractEventLoop, _AsyncClient] = {}
+
+
+def _client() -> _Client:
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.path != STORAGE_SOCKET:
+        _CLIENT = _Client(STORAGE_SOCKET)
+    return _CLIENT
+
+
+def _aclient() -> _AsyncClient:
+    loop = asyncio.get_running_loop()
+    c = _ACLIENTS.get(loop)
+    if c is None or c.path != STORAGE_SOCKET:
+        _ACLIENTS.clear()   # one event loop per process; an old one is gone
+        c = _ACLIENTS[loop] = _AsyncClient(STORAGE_SOCKET)
+    return c
+
+
+def _remote(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Run locally, or forward to the storage daemon when STORAGE_SOCKET is set."""
+    REMOTE_OPS[fn.__name__] = fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if STORAGE_SOCKET:
+            return _client().call(fn.__name__, args, kwargs)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+async def acall(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call a storage op from a coroutine. Over the daemon socket it is sent on
+    the event loop's own connection instead of blocking the loop (anything
+    that isn't a single op runs in a thread); in-process it just runs.
+    """
+    if not STORAGE_SOCKET:
+        return fn(*args, **kwargs)
+    if REMOTE_OPS.get(fn.__name__) is getattr(fn, "__wrapped__", None):
+        return await _aclient().call(fn.__name__, args, kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# In-memory copy of the whole store. Loaded once (lazily, or up front via
+# prewarm()) and kept in sync by every save, so reads never re-parse the file.
+_ROOT: Dict[str, Any] | None = None
+_ROOT_PATH: str | None = None
+_NORMALIZED_FOR: set = set()
+# Changes whenever the store is swapped (load, reset, restore). Per-record "v"
+# counters restart or rewind with the store, so anything cached by "v" outside
+# this process keys on (epoch, v) instead.
+_EPOCH = 0
+_ROOT_LOCK = threading.Lock()
+
+
+def _forget_derived() -> None:
+    """The store was swapped out: drop everything computed from the old one."""
+    global _USER_GUILDS, _EPOCH
+    _EPOCH = max(_EPOCH + 1, time.time_ns())
+    _NORMALIZED_FOR.clear()
+    _PROFILE_CACHE.clear()
+    _BOARDS.clear()
+    _USER_GUILDS = None
+    if _ROOT is not None:
+        _install_tiers(_ROOT)
+
+
+def _ensure_parent() -> None:
+    parent = os.path.dirname(STATS_FILE)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+
+def _read_file() -> Dict[str, Any]:
+    """
+    The store on disk. A file that fails to parse or whose checksum doesn't
+    match is moved aside and rebuilt from the newest good snapshot instead of
+    being replaced with a blank store.
+    """
+    if not os.path.exists(STATS_FILE):
+        # Fresh store: continue the journal's numbering but replay nothing
+        return {"_seq": snapshots.last_seq(_snap_dir()) if snapshots.JOURNAL_ENABLED else 0}
+    try:
+        with open(STATS_FILE, "r", encoding="utf-8") as f:
+            data, ok = snapshots.unseal(f.read())
+        if ok:
+            return data
+        reason = "checksum mismatch"
+    except Exception as e:
+        reason = f"unreadable ({e})"
+
+    aside = f"{STATS_FILE}.corrupt-{time.time_ns()}"
+    os.replace(STATS_FILE, aside)
+    print(f"[STORAGE] {STATS_FILE} is {reason}; kept as {aside}", flush=True)
+    for snap in reversed(snapshots.list_snapshots(_snap_dir())):
+        data = snapshots.load(snap.path)
+        if data is not None:
+            print(f"[STORAGE] recovering from snapshot {os.path.basename(snap.path)} + journal", flush=True)
+            return data
+    print("[STORAGE] no usable snapshot; recovering from the journal alone", flush=True)
+    return {}
+
+
+def _root() -> Dict[str, Any]:
+    """The cached store; loads it on first use (or if STATS_FILE was repointed)."""
+    global _ROOT, _ROOT_PATH
+    if _ROOT is not None and _ROOT_PATH == STATS_FILE:
+        return _ROOT
+    with _ROOT_LOCK:
+        if _ROOT is None or _ROOT_PATH != STATS_FILE:
+            _ROOT = _read_file()
+            _ROOT_PATH = STATS_FILE
+            _catch_up()
+    return _ROOT
 
-# Ensure parent folder exists
-_parent = os.path.dirname(STATS_FILE)
-if _parent:
-    os.makedirs(_parent, exist_ok=True)
+
+# ---- journal + snapshots (see utils/snapshots.py) ----
+# Ops applied so far; the store on disk records the seq it includes as "_seq"
+_SEQ = 0
+_JOURNAL: snapshots.Journal | None = None
+_JOURNALED: Dict[str, Callable[..., Any]] = {}
+_REPLAYING = False
+# Parameters pinned to the wall clock at journal time so replay is exact
+_CLOCK_PARAMS = ("ts", "now")
+
+
+def _snap_dir() -> str:
+    return snapshots.snapshot_dir(STATS_FILE)
+
+
+def _journal() -> snapshots.Journal:
+    global _JOURNAL
+    if _JOURNAL is None or _JOURNAL.dir != _snap_dir():
+        if _JOURNAL is not None:
+            _JOURNAL.close()
+        _JOURNAL = snapshots.Journal(_snap_dir())
+    return _JOURNAL
+
+
+def _journaled(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Log each call to the journal before applying it (write-ahead)."""
+    sig = inspect.signature(fn)
+    _JOURNALED[fn.__name__] = fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        global _SEQ
+        if _REPLAYING or not snapshots.JOURNAL_ENABLED:
+            return fn(*args, **kwargs)
+        _root()  # make sure _SEQ reflects the loaded store
+        bound = sig.bind(*args, **kwargs)
+        for name in _CLOCK_PARAMS:
+            if name in sig.parameters and bound.arguments.get(name) is None:
+                bound.arguments[name] = time.time()
+        _SEQ += 1
+        _journal().append({"seq": _SEQ, "ts": time.time(), "op": fn.__name__,
+                           "args": list(bound.args), "kwargs": bound.kwargs})
+        return fn(*bound.args, **bound.kwargs)
+
+    return wrapper
+
+
+def _replay(after_seq: int, before_seq: int | None = None, until_ts: float | None = None) -> int:
+    """Re-apply journal entries onto _ROOT (no disk writes); returns how many."""
+    global _SEQ, _REPLAYING
+    outer, _REPLAYING = _REPLAYING, True
+    n = 0
+    try:
+        for e in snapshots.entries(_snap_dir(), after_seq, before_seq, until_ts):
+            fn = _JOURNALED.get(e.get("op"))
+            _SEQ = max(_SEQ, e["seq"])
+            if fn is None:
+                continue
+            try:
+                fn(*e.get("args", []), **e.get("kwargs", {}))
+            except Exception:
+                pass  # it failed the first time too (e.g. unknown player)
+            n += 1
+    finally:
+        _REPLAYING = outer
+    return n
+
+
+def _catch_up() -> None:
+    """After a load: apply journaled ops the file (or snapshot) doesn't include yet."""
+    global _SEQ
+    base = int(_ROOT.pop("_seq", 0))
+    _SEQ = base
+    _forget_derived()
+    for t in _tiered(_ROOT):
+        # Cold rows newer than the store belong to ops the replay below re-applies
+        dropped = t.cold.rewind(t.gen, t.ns, base)
+        if dropped:
+            print(f"[STORAGE] dropped {dropped} cold {t.ns} record(s) newer than seq {base}", flush=True)
+    if not snapshots.JOURNAL_ENABLED:
+        return
+    replayed = _replay(base)
+    _SEQ = max(_SEQ, snapshots.last_seq(_snap_dir()))
+    if replayed:
+        print(f"[STORAGE] replayed {replayed} journaled op(s) after seq {base}", flush=True)
+        _atomic_save(_ROOT)
+
+
+def take_snapshot() -> tuple:
+    """
+    Start a snapshot of the current store; returns (child pid or None, dir).
+    The journal rolls over to a new segment at the same point.
+    """
+    stats = _root()
+    directory = _snap_dir()
+    latest = snapshots.list_snapshots(directory)[-1:]
+    if latest and latest[0].seq == _SEQ:
+        return None, directory  # nothing changed since the last one
+    path = snapshots.snapshot_path(directory, _SEQ)
+    _journal().rotate(_SEQ + 1)
+    obj = {**stats, "_seq": _SEQ}
+    pid = snapshots.fork_write(path, obj)
+    if pid is None:
+        # No fork: freeze a copy as text here, compress it off-thread
+        text = json.dumps(obj, separators=(",", ":"))
+        threading.Thread(target=snapshots.write, args=(path, text), daemon=True).start()
+    return pid, directory
+
+
+@_remote
+def prewarm(outcomes: List[str] | None = None) -> None:
+    """Load (and shape-check) the store ahead of the first command."""
+    if outcomes is None:
+        from constants import BRETT_RESPONSES as outcomes
+    load_stats(outcomes)
+
+
+def invalidate_cache() -> None:
+    """Drop the in-memory store; the next access re-reads STATS_FILE."""
+    global _ROOT, _ROOT_PATH
+    with _ROOT_LOCK:
+        _ROOT = None
+        _ROOT_PATH = None
+        _forget_derived()
+        _LEDGER_PENDING.clear()  # the journal re-queues anything unflushed
+
+
+@_remote
+def list_snapshots() -> List[List[int]]:
+    """[[seq, unix ts], ...] of the snapshots on disk, oldest first."""
+    return [[snap.seq, snap.ts] for snap in snapshots.list_snapshots(_snap_dir())]
+
+
+@_remote
+@_journaled
+def restore_point(at: float) -> Dict[str, Any]:
+    """
+    Roll the roll stats back to how they were at unix time `at`: the newest
+    good snapshot taken by then plus the journal up to `at`. Only what
+    !resetstats would wipe goes back; coins, battles, adventurers and
+    prefixes (_RESET_KEEPS) stay as they are now, so nothing can be claimed
+    twice and the ledger keeps matching the balances. Journaled like any
+    other write, so crash recovery replays the rollback too.
+    """
+    global _ROOT, _REPLAYING
+    limit = _SEQ  # this op's own seq; only history before it counts
+    live = _root()
+    kept = {k: live[k] for k in _RESET_KEEPS if k in live and k != "_tiers"}
+    kept_gens = {ns: gen for ns, gen in _tier_gens(live).items() if ns != "users"} if tiers.ENABLED else {}
+    directory = _snap_dir()
+    base, base_seq = None, 0
+    for snap in reversed(snapshots.list_snapshots(directory)):
+        if snap.seq < limit and snap.ts + 1 <= at:   # names carry whole seconds: taken before `at` for sure
+            base = snapshots.load(snap.path)
+            if base is not None:
+                base_seq = snap.seq
+                break
+    if base is None:
+        if snapshots.journal_start(directory) != 1:
+            raise ValueError("no snapshot at or before that time")
+        base = {}  # journal still goes back to the very first op
+
+    base.pop("_seq", None)
+    _fork_tiers(base, base_seq)
+    _flush_ledger()  # the rolled-back transactions still happened
+    outer, _REPLAYING = _REPLAYING, True
+    try:
+        _ROOT = base
+        _forget_derived()
+        replayed = _replay(base_seq, before_seq=limit, until_ts=at)
+    finally:
+        _REPLAYING = outer
+        _LEDGER_PENDING.clear()  # replayed history, already in the ledger
+    # The replay rebuilt the kept parts too, only so the ops that touch both
+    # could run; swap the live ones back in and drop the players fork
+    gens = _tier_gens(base) if tiers.ENABLED else {}
+    for ns, gen in kept_gens.items():
+        if gens.get(ns, gen) != gen:
+            _cold().drop(gens[ns], ns)
+        gens[ns] = gen
+    for key in _RESET_KEEPS:
+        if key in kept:
+            base[key] = kept[key]
+        elif key != "_tiers":
+            base.pop(key, None)
+    _forget_derived()
+    if not outer:
+        _atomic_save(_ROOT)
+    return {"snapshot_seq": base_seq, "replayed": replayed, "users": _user_total(_ROOT)}
 
 
 # ---- helpers ----
@@ -34,39 +475,245 @@ def _blank_stats(outcomes: List[str]) -> Dict[str, Any]:
     }
 
 
+@_remote
 def load_stats(outcomes: List[str]) -> Dict[str, Any]:
-    """Read stats JSON; create a fresh structure if missing/corrupt."""
-    try:
-        if os.path.exists(STATS_FILE):
-            with open(STATS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    """Return the stats store, with every key the outcome list needs filled in."""
+    data = _root()
+    key = tuple(outcomes)
+    if key in _NORMALIZED_FOR:
+        return data
 
-            # Ensure shape and keys exist
-            data.setdefault("global", {}).setdefault("outcomes", {})
-            data["global"].setdefault("total", 0)
-            data.setdefault("users", {})
+    # Ensure shape and keys exist (once per outcome list, not per call).
+    # This is the live store: on a bad shape say so and fail, never wipe it.
+    try:
+        data.setdefault("global", {}).setdefault("outcomes", {})
+        data["global"].setdefault("total", 0)
+        data.setdefault("users", {})
+        for name in outcomes:
+            data["global"]["outcomes"].setdefault(name, 0)
+    except Exception as e:
+        print(f"[STORAGE] stats store has an unexpected shape: {e!r}", flush=True)
+        raise
 
+    # A copy of the values: prewarm runs this in a thread while commands add users
+    for u in list(data["users"].values()):
+        try:
+            u.setdefault("outcomes", {})
+            u.setdefault("total", 0)
+            u.setdefault("streak_days", 0)
             for name in outcomes:
-                data["global"]["outcomes"].setdefault(name, 0)
-            for u in data["users"].values():
-                u.setdefault("outcomes", {})
-                u.setdefault("total", 0)
-                u.setdefault("streak_days", 0)
-                for name in outcomes:
-                    u["outcomes"].setdefault(name, 0)
+                u["outcomes"].setdefault(name, 0)
+        except Exception as e:
+            print(f"[STORAGE] skipping a malformed user record: {e!r}", flush=True)
 
-            return data
-    except Exception:
-        pass  # fall through to fresh struct
-
-    return _blank_stats(outcomes)
+    _NORMALIZED_FOR.add(key)
+    return data
 
 
 def _atomic_save(obj: Dict[str, Any]) -> None:
+    global _ROOT, _ROOT_PATH, _DIRTY, _UNSAVED
+    if obj is not _ROOT:
+        # Caller handed us a replacement store (e.g. !resetstats)
+        if _REPLAYING:
+            _ROOT = obj  # replay runs under _ROOT_LOCK already
+        else:
+            with _ROOT_LOCK:
+                _ROOT = obj
+                _ROOT_PATH = STATS_FILE
+        _forget_derived()
+    if _REPLAYING:
+        return  # _catch_up() writes once at the end
+    _ensure_parent()
+    _flush_ledger()
     tmp = STATS_FILE + ".tmp"
     with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2)
+        snapshots.write_sealed(f, {**obj, "_seq": _SEQ})
     os.replace(tmp, STATS_FILE)
+    _DIRTY, _UNSAVED = False, 0
+
+
+# ---- batched writes ----
+# Journaled writers change the in-memory store and call _save_soon(); the
+# store hits disk on the next flush (or every STORE_FLUSH_MAX writes) instead
+# of once per change, which at 100k users is a ~40 MB rewrite per roll. The
+# journal covers anything applied but not yet flushed; with STATS_JOURNAL=0
+# nothing would, so every write saves straight away again.
+STORE_FLUSH_SECS = float(os.getenv("STORE_FLUSH_SECS", "2"))
+STORE_FLUSH_MAX = int(os.getenv("STORE_FLUSH_MAX", "500"))
+_DIRTY = False
+_UNSAVED = 0   # writes applied since the last save
+_LEDGER_PENDING: List[Dict[str, Any]] = []
+# Fingerprints of the ledger's newest lines, so re-queued txs aren't written twice
+_LEDGER_SEEN: Dict[tuple, None] | None = None
+_LEDGER_SEEN_PATH: str | None = None
+_LEDGER_SEEN_MAX = max(4096, 2 * STORE_FLUSH_MAX)
+
+
+def _save_soon() -> None:
+    global _DIRTY, _UNSAVED
+    if not snapshots.JOURNAL_ENABLED:
+        _atomic_save(_root())
+        return
+    _DIRTY = True
+    _UNSAVED += 1
+    if max(_UNSAVED, len(_LEDGER_PENDING)) >= STORE_FLUSH_MAX and not _REPLAYING:
+        _atomic_save(_root())
+
+
+def _flush_ledger() -> None:
+    global _LEDGER_SEEN, _LEDGER_SEEN_PATH
+    if not _LEDGER_PENDING:
+        return
+    path = economy.ledger_path(STATS_FILE)
+    if _LEDGER_SEEN is None or _LEDGER_SEEN_PATH != path:
+        _LEDGER_SEEN, _LEDGER_SEEN_PATH = economy.ledger_tail(path, _LEDGER_SEEN_MAX), path
+    economy.append_ledger(path, _LEDGER_PENDING, _LEDGER_SEEN, _LEDGER_SEEN_MAX)
+    _LEDGER_PENDING.clear()
+
+
+@_remote
+def flush() -> bool:
+    """Write batched changes now (and demote idle users); returns whether there was anything to write."""
+    demoted = _sweep_tiers()
+    if not _DIRTY and not demoted:
+        return False
+    _atomic_save(_root())
+    return True
+
+
+def expire_caches() -> int:
+    """Drop cached profile summaries of users no longer in memory; returns how many."""
+    users = _root().get("users", {})
+    stale = [uid for uid in _PROFILE_CACHE if not dict.__contains__(users, uid)]
+    for uid in stale:
+        del _PROFILE_CACHE[uid]
+    return len(stale)
+
+
+def schedule_jobs(sched: timeutil.Scheduler) -> None:
+    """Maintenance for the process that owns the store (the bot, or the storage daemon)."""
+    sched.add("flush", flush, every=STORE_FLUSH_SECS)
+    sched.add("snapshot", lambda: snapshots.snapshot_and_prune(take_snapshot), every=snapshots.SNAPSHOT_EVERY)
+    sched.add("cold_prune", lambda: asyncio.to_thread(_prune_cold), every=snapshots.SNAPSHOT_EVERY, jitter=60)
+    # Hourly, not daily, so a restart across midnight delays the rollover by an hour at most
+    sched.add("streaks", roll_over_streaks, cron="1 * * * *", jitter=30)
+    sched.add("windows", prune_windows, cron="5 * * * *", jitter=60)
+    sched.add("caches", expire_caches, every=600, jitter=60)
+
+
+# ---- hot/cold tiers (see utils/tiers.py) ----
+# Users and Brettventures players who haven't been around for a while live in
+# the cold store, not in _ROOT; reading one promotes it back transparently.
+# Idle records are demoted by flush(), before the save that drops them.
+_COLD: tiers.ColdStore | None = None
+_SWEPT = float("-inf")
+_SWEEP_BACKLOG = False
+
+
+def _cold() -> tiers.ColdStore:
+    global _COLD
+    path = tiers.cold_path(STATS_FILE)
+    if _COLD is None or _COLD.path != path:
+        if _COLD is not None:
+            _COLD.close()
+        _COLD = tiers.ColdStore(path, clock=lambda: _SEQ)
+    return _COLD
+
+
+def _normalize_user(u: Dict[str, Any]) -> None:
+    # What load_stats() did to everyone hot, for a user coming back from cold
+    u.setdefault("outcomes", {})
+    u.setdefault("total", 0)
+    u.setdefault("streak_days", 0)
+    for outcomes in _NORMALIZED_FOR:
+        for name in outcomes:
+            u["outcomes"].setdefault(name, 0)
+
+
+def _tiered(root: Dict[str, Any]) -> List[tiers.TieredDict]:
+    found = [root.get("users"), root.get("brettventures", {}).get("players")]
+    return [t for t in found if isinstance(t, tiers.TieredDict)]
+
+
+def _tier_gens(root: Dict[str, Any]) -> Dict[str, int]:
+    meta = root.setdefault("_tiers", {})
+    gens = meta.setdefault("gens", {})
+    if "gen" in meta:
+        # Stores from before per-namespace generations shared one
+        gen = meta.pop("gen")
+        gens.setdefault("users", gen)
+        gens.setdefault("players", gen)
+    return gens
+
+
+def _fork_tiers(root: Dict[str, Any], seq: int) -> None:
+    """Point a store restored from a snapshot at its cold tier as of the snapshot's seq."""
+    if not tiers.ENABLED:
+        return
+    gens = _tier_gens(root)
+    for ns, gen in gens.items():
+        gens[ns] = _cold().fork(gen, ns, seq)
+
+
+def _prune_cold() -> None:
+    """Drop cold versions older than anything the kept snapshots can restore."""
+    kept = snapshots.list_snapshots(_snap_dir())
+    if tiers.ENABLED and kept:
+        _cold().prune(kept[0].seq)
+
+
+def _install_tiers(root: Dict[str, Any]) -> None:
+    """Put the per-user parts of a newly loaded (or swapped-in) store on the tiers."""
+    if not tiers.ENABLED:
+        return
+    cold = _cold()
+    gens = _tier_gens(root)
+    bv = root.setdefault("brettventures", {})
+    for parent, key, last_active, hook in (
+            (root, "users", windows.last_active, _normalize_user),
+            (bv, "players", lambda p: p.get("stamina_ts", 0), None)):
+        fresh = key not in gens
+        if fresh:
+            gens[key] = cold.new_gen()
+        gen = gens[key]
+        cur = parent.get(key) or {}
+        if isinstance(cur, tiers.TieredDict) and cur.cold is cold and cur.gen == gen:
+            continue
+        parent[key] = t = tiers.TieredDict(cur, cold, gen, key, last_active, hook)
+        if fresh:
+            cold.register(gen, key, list(t))
+
+
+def _sweep_tiers(now: float | None = None, force: bool = False) -> int:
+    """Demote idle users to the cold store (every SWEEP_SECS); returns how many moved."""
+    global _SWEPT, _SWEEP_BACKLOG
+    if not tiers.ENABLED or _REPLAYING or _ROOT is None:
+        return 0
+    mono = time.monotonic()
+    if not (force or _SWEEP_BACKLOG or mono - _SWEPT >= tiers.SWEEP_SECS):
+        return 0
+    _SWEPT = mono
+    root = _root()
+    economy.live_node()  # legacy player gold has to reach the ledger before players can leave memory
+    now = time.time() if now is None else now
+    moved, _SWEEP_BACKLOG = 0, False
+    for t in _tiered(root):
+        n = t.sweep(now, prepare=(lambda u: _chill_user(u, now)) if t.ns == "users" else None)
+        moved += n
+        _SWEEP_BACKLOG |= n >= tiers.SWEEP_MAX
+    return moved
+
+
+def _chill_user(u: Dict[str, Any], now: float) -> None:
+    # Nothing runs over cold users: expire their windows and streak on the way out
+    windows.expire(u, now)
+    if _streak_lapsed(u, now):
+        u["streak_days"] = 0
+
+
+def _user_total(root: Dict[str, Any]) -> int:
+    users = root.get("users", {})
+    return users.total() if isinstance(users, tiers.TieredDict) else len(users)
 
 
 def ensure_user(stats: Dict[str, Any], user_id: int, outcomes: List[str]) -> Dict[str, Any]:
@@ -77,8 +724,8 @@ def ensure_user(stats: Dict[str, Any], user_id: int, outcomes: List[str]) -> Dic
 
 
 # ---- writers (NO recursion) ----
-def _record_roll_impl(guild_id: int, user_id: int, outcome: str, ts: float | None = None) -> None:
-    """Internal implementation used by both new and legacy entrypoints."""
+def _record_roll_impl(guild_id: int, user_id: int, outcome: str, ts: float | None = None) -> List[str]:
+    """Internal implementation used by both new and legacy entrypoints; returns unlocked achievement ids."""
     # Prefer the same list stats.py iterates over
     try:
         from constants import BRETT_RESPONSES as OUTCOME_KEYS
@@ -87,8 +734,9 @@ def _record_roll_impl(guild_id: int, user_id: int, outcome: str, ts: float | Non
 
     stats = load_stats(OUTCOME_KEYS)
 
-    # Global
+    # Global (v = stats version, bumped on every change; keys render caches)
     stats["global"]["total"] = int(stats["global"].get("total", 0)) + 1
+    stats["global"]["v"] = int(stats["global"].get("v", 0)) + 1
     stats["global"]["outcomes"].setdefault(outcome, 0)
     stats["global"]["outcomes"][outcome] += 1
 
@@ -97,159 +745,504 @@ def _record_roll_impl(guild_id: int, user_id: int, outcome: str, ts: float | Non
     u["total"] = int(u.get("total", 0)) + 1
     u["outcomes"].setdefault(outcome, 0)
     u["outcomes"][outcome] += 1
+    u["v"] = int(u.get("v", 0)) + 1
+    changes = [("rolls", u["total"] - 1, u["total"]),
+               ("outcome:" + outcome, u["outcomes"][outcome] - 1, u["outcomes"][outcome])]
 
-    _atomic_save(stats)
+    # Daily streak: the first roll of a UTC day extends it or starts over
+    now = ts if ts is not None else time.time()
+    boards = ["rolls", ranking.OUTCOME_PREFIX + outcome]
+    today = _utc_date(now)
+    if u.get("last_roll_date") != today:
+        kept = u.get("last_roll_date") == _utc_date(now - 86400)
+        streak = int(u.get("streak_days", 0))
+        u["streak_days"] = streak + 1 if kept else 1
+        u["last_roll_date"] = today
+        boards.append("streak")
+        changes.append(("streak", streak if kept else 0, u["streak_days"]))
+    unlocked = achievements.unlock(u, achievements.user_counters, changes)
 
+    # Time-windowed counters (O(1): one bucket per unit per node)
+    windows.bump(u, now, outcome)
+    windows.bump(stats["global"], now, outcome, user_id)
+    if guild_id:
+        g = stats.setdefault("guilds", {}).setdefault(str(guild_id), {})
+        windows.bump(g, now, outcome, user_id)
+        _lb_join(guild_id, user_id)
+    _lb_touch(user_id, boards)
 
-def record_roll(guild_id: int, user_id: int, outcome: str, ts: float | None = None) -> None:
-    """Primary entrypoint: (gid, uid, outcome, [ts])."""
-    _record_roll_impl(guild_id, user_id, outcome, ts)
+    quests.emit_for(user_id, "roll", 1, now, outcome=outcome)
+    _save_soon()
+    return unlocked
 
 
-def record_roll_legacy(user_id: int, outcome: str) -> None:
+def _utc_date(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _streak_lapsed(u: Dict[str, Any], now: float) -> bool:
+    # ISO dates compare as strings; a streak survives until the end of the day after the last roll
+    return bool(u.get("streak_days")) and (u.get("last_roll_date") or "") < _utc_date(now - 86400)
+
+
+@_remote
+@_journaled
+def roll_over_streaks(now: float | None = None) -> int:
+    """
+    Zero the streaks of users who missed a day (scheduled hourly); returns
+    how many. Cold users are zeroed as they are demoted instead.
+    """
+    now = time.time() if now is None else now
+    stats = _root()
+    lapsed = [uid for uid, u in stats.get("users", {}).items() if _streak_lapsed(u, now)]
+    for uid in lapsed:
+        u = stats["users"][uid]
+        u["streak_days"] = 0
+        u["v"] = int(u.get("v", 0)) + 1
+        _lb_touch(uid, ("streak",))
+    if lapsed:
+        _save_soon()
+    return len(lapsed)
+
+
+@_remote
+@_journaled
+def record_roll(guild_id: int, user_id: int, outcome: str, ts: float | None = None) -> List[str]:
+    """Primary entrypoint: (gid, uid, outcome, [ts]); returns the achievement ids it unlocked."""
+    return _record_roll_impl(guild_id, user_id, outcome, ts)
+
+
+@_remote
+@_journaled
+def record_roll_legacy(user_id: int, outcome: str, ts: float | None = None) -> List[str]:
     """Legacy entrypoint: (uid, outcome)."""
-    _record_roll_impl(0, user_id, outcome, None)
+    return _record_roll_impl(0, user_id, outcome, ts)
     
+@_remote
+@_journaled
 def save_stats(stats: Dict[str, Any]) -> None:
     """Write the stats dictionary back to disk safely."""
     _atomic_save(stats)
 
 
+# What !resetstats leaves alone: coins, fights, adventurers and server settings aren't roll stats
+_RESET_KEEPS = ("economy", "battles", "brettventures", "prefixes", "_tiers")
+
+
+@_remote
+@_journaled
+def reset_stats(outcomes: List[str]) -> None:
+    """Wipe every roll stat (global, per-user, per-guild) in one write."""
+    root = _root()
+    for key in [k for k in root if k not in _RESET_KEEPS]:
+        del root[key]
+    root.update(_blank_stats(outcomes))
+    root.get("_tiers", {}).get("gens", {}).pop("users", None)   # the old users' cold rows stop counting
+    _forget_derived()
+    _atomic_save(root)
+
+
+# ---- narrow reads/writes (cheap over the daemon socket) ----
+@_remote
+def get_user_stats(user_id: int, outcomes: List[str] | None = None) -> Dict[str, Any] | None:
+    """One user's roll stats, or None if they have never rolled."""
+    if outcomes is None:
+        from constants import BRETT_RESPONSES as outcomes
+    u = load_stats(outcomes).get("users", {}).get(str(user_id))
+    return None if u is None else {**u, "epoch": _EPOCH}
+
+
+@_remote
+def get_global_stats(outcomes: List[str] | None = None) -> Dict[str, Any]:
+    if outcomes is None:
+        from constants import BRETT_RESPONSES as outcomes
+    return {**load_stats(outcomes).get("global", {}), "epoch": _EPOCH}
+
+
+@_remote
+def get_window_stats(user_id: int, unit: str | None, guild_id: int | None = None) -> Dict[str, Any]:
+    """
+    Roll counts for the current window (unit: "day"/"week"/"month", None = last 24h).
+    With user_id=0 the global (or guild, if guild_id) scope is returned instead.
+    """
+    stats = _root()
+    if user_id:
+        node = stats.get("users", {}).get(str(user_id))
+    elif guild_id:
+        node = stats.get("guilds", {}).get(str(guild_id))
+    else:
+        node = stats.get("global")
+    out = windows.current(node, unit)
+    out.pop("users", None)
+    out["v"] = int((node or {}).get("v", 0))
+    out["epoch"] = _EPOCH
+    return out
+
+
+@_remote
+def window_leaderboard(unit: str, guild_id: int | None = None, n: int = 10) -> List[List[int]]:
+    """[[count, user_id], ...] for the current day/week/month bucket."""
+    stats = _root()
+    node = stats.get("guilds", {}).get(str(guild_id)) if guild_id else stats.get("global")
+    return [[c, uid] for c, uid in windows.top_users(node, unit, n)]
+
+
+@_remote
+@_journaled
+def prune_windows(now: float | None = None) -> int:
+    """Drop expired window buckets everywhere; returns how many were removed."""
+    stats = _root()
+    nodes = [stats.get("global", {})]
+    nodes.extend(stats.get("users", {}).values())
+    nodes.extend(stats.get("guilds", {}).values())
+    dropped = windows.expire_all(nodes, now)
+    if dropped:
+        _save_soon()
+    return dropped
+
+
+# ---- bulk export / import (chunked, so neither side holds the whole store) ----
+@_remote
+def user_count() -> int:
+    return _user_total(_root())
+
+
+# (gen, offset, rowid) where the last users_chunk() stopped, so a sequential
+# export resumes by rowid instead of skipping `offset` registry rows each time
+_EXPORT_AT: tuple = (None, 0, 0)
+
+
+@_remote
+def users_chunk(offset: int, limit: int) -> List[List[Any]]:
+    """
+    [[user_id, record], ...] for users[offset:offset+limit] in insertion order
+    (registration order once tiered; cold users are read, not promoted).
+    New users are appended, so an export walking offsets sees each user once.
+    """
+    global _EXPORT_AT
+    import itertools
+    users = _root().get("users", {})
+    if not isinstance(users, tiers.TieredDict):
+        return [[int(uid), u] for uid, u in itertools.islice(users.items(), offset, offset + limit)]
+    gen, at, rowid = _EXPORT_AT
+    if gen == users.gen and at == offset:
+        rows = users.cold.page(users.gen, users.ns, after=rowid, limit=limit)
+    else:
+        rows = users.cold.page(users.gen, users.ns, offset=offset, limit=limit)
+    if rows:
+        _EXPORT_AT = (users.gen, offset + len(rows), rows[-1][0])
+    out = []
+    for _, uid, blob in rows:
+        u = users.peek(uid, blob)
+        if u is not None:
+            out.append([int(uid), u])
+    return out
+
+
+def iter_users(chunk: int = 500):
+    """Yield (user_id, record) for every user, fetching `chunk` at a time."""
+    offset = 0
+    while True:
+        rows = users_chunk(offset, chunk)
+        for uid, u in rows:
+            yield uid, u
+        if len(rows) < chunk:
+            return
+        offset += len(rows)
+
+
+@_remote
+@_journaled
+def import_users(rows: List[List[Any]], mode: str = "merge", save: bool = True) -> int:
+    """
+    Upsert [[user_id, record], ...]. mode="merge" keeps fields the record
+    doesn't mention; "replace" swaps the whole record. Bulk loaders pass
+    save=False per chunk and flush once with import_users([], save=True).
+    Returns rows applied.
+    """
+    if mode not in ("merge", "replace"):
+        raise ValueError(f"unknown import mode {mode!r}")
+    from constants import BRETT_RESPONSES as outcomes
+    stats = load_stats(outcomes)
+    users = stats["users"]
+    if isinstance(users, tiers.TieredDict):
+        users.cold.register(users.gen, users.ns, [str(int(uid)) for uid, _ in rows])  # one transaction
+    for uid, rec in rows:
+        key = str(int(uid))
+        cur = users.get(key)
+        if mode == "replace" or cur is None:
+            new = _blank_user(outcomes)
+            new.update(rec)
+            new["outcomes"] = {**_blank_user(outcomes)["outcomes"], **rec.get("outcomes", {})}
+        else:
+            new = {**cur, **rec, "outcomes": {**cur.get("outcomes", {}), **rec.get("outcomes", {})}}
+        # Imported data invalidates anything cached against the old record
+        new["v"] = int((cur or {}).get("v", 0)) + 1
+        users[key] = new
+        _lb_touch(key, _roll_boards())
+    if rows:
+        stats["global"]["v"] = int(stats["global"].get("v", 0)) + 1
+    if save:
+        _atomic_save(stats)
+    return len(rows)
+
+
+@_remote
+@_journaled
+def reset_user_stats(user_id: int, outcomes: List[str] | None = None) -> None:
+    if outcomes is None:
+        from constants import BRETT_RESPONSES as outcomes
+    stats = load_stats(outcomes)
+    old = stats.setdefault("users", {}).get(str(user_id)) or {}
+    fresh = stats["users"][str(user_id)] = {
+        "total": 0,
+        "outcomes": {k: 0 for k in outcomes},
+        "streak_days": 0,
+        "v": int(old.get("v", 0)) + 1,
+    }
+    # Unlocked achievements stay earned (and aren't announced again on the way back up)
+    if "ach" in old:
+        fresh["ach"] = old["ach"]
+    _lb_touch(user_id, _roll_boards())
+    _save_soon()
+
+
 
 # =====================================================================
-# Brettventures section
+# Achievements section (see utils/achievements.py)
 # =====================================================================
 
-def _load_all() -> Dict[str, Any]:
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
+@_remote
+def achievements_of(user_id: int) -> Dict[str, Any]:
+    """{"bits": every unlock OR'd together, "counters": {counter: value}} for one user."""
+    root, uid = _root(), str(user_id)
+    owners = ((root.get("users", {}).get(uid), achievements.user_counters),
+              (root.get("battles", {}).get("players", {}).get(uid), achievements.battler_counters),
+              (root.get("brettventures", {}).get("players", {}).get(uid), achievements.player_counters))
+    bits, counters = 0, {}
+    for rec, of in owners:
+        if rec:
+            bits |= achievements.bits_for(rec, of)
+            counters.update(of(rec))
+    return {"bits": bits, "counters": counters}
 
-def _save_all(root: Dict[str, Any]) -> None:
-    _atomic_save(root)
 
-def _blank_player(user_id: int, name: str) -> Dict[str, Any]:
-    return {
-        "user_id": user_id,
-        "name": name,
-        "level": 1,
-        "xp": 0,
-        "hp": 20, "hp_max": 20,
-        "stamina": 5, "stamina_max": 5,
-        "pow": 1, "smt": 1, "luck": 0,
-        "gold": 0,
-        "inventory": [],
-        "flags": {},
-        "stamina_ts": int(time.time()),  # <--- add this
+# =====================================================================
+# Leaderboards section (see utils/ranking.py)
+# =====================================================================
+# metric -> scope -> index, scope 0 being global and anything else a guild id.
+# Built on first use, then kept current by _lb_touch() from every writer.
+# Guild boards hold the users who have rolled in that guild ("seen").
+_BOARDS: Dict[str, Dict[int, ranking.RankIndex]] = {}
+_USER_GUILDS: Dict[str, set] | None = None   # uid -> guild ids it was seen in
+
+
+def _guild_seen(g: Dict[str, Any]) -> Dict[str, int]:
+    if "seen" not in g:
+        # Older guild records: recover members from the windowed buckets
+        seen = g["seen"] = {}
+        for ring in g.get("win", {}).values():
+            for b in ring.values():
+                seen.update((uid, 1) for uid in b.get("u", {}))
+    return g["seen"]
+
+
+def _user_guilds(uid: str):
+    global _USER_GUILDS
+    if _USER_GUILDS is None:
+        _USER_GUILDS = {}
+        for gid, g in _root().get("guilds", {}).items():
+            for u in _guild_seen(g):
+                _USER_GUILDS.setdefault(u, set()).add(int(gid))
+    return _USER_GUILDS.get(uid, ())
+
+
+def _board(name: str, scope: int = 0) -> ranking.RankIndex:
+    metric = ranking.get_metric(name)
+    boards = _BOARDS.setdefault(metric.name, {})
+    b = boards.get(scope)
+    if b is None:
+        root = _everyone(_root())
+        if scope:
+            uids = _guild_seen(root.get("guilds", {}).get(str(scope), {}))
+        else:
+            uids = metric.source(root)
+        b = boards[scope] = ranking.RankIndex((int(u), metric.score(root, u)) for u in uids)
+    return b
+
+
+def _everyone(root: Dict[str, Any]) -> Dict[str, Any]:
+    """The store as boards see it: cold users included, and read without promoting them."""
+    if not tiers.ENABLED:
+        return root
+    view = dict(root)
+    view["users"] = tiers.ColdView(root["users"])
+    view["brettventures"] = {**root["brettventures"], "players": tiers.ColdView(root["brettventures"]["players"])}
+    return view
+
+
+def _roll_boards() -> List[str]:
+    return [n for n in _BOARDS if n in ("rolls", "streak") or n.startswith(ranking.OUTCOME_PREFIX)]
+
+
+def _lb_touch(user_id: int | str, names: Iterable[str]) -> None:
+    """Re-score one user on the given metrics' boards (only boards already built)."""
+    if not _BOARDS:
+        return
+    uid = str(user_id)
+    root = _root()
+    scopes = None
+    for name in names:
+        boards = _BOARDS.get(name)
+        if not boards:
+            continue
+        if scopes is None:
+            scopes = (0, *_user_guilds(uid))
+        score = ranking.get_metric(name).score(root, uid)
+        for scope in scopes:
+            b = boards.get(scope)
+            if b is not None:
+                b.set(int(uid), score)
+
+
+def _lb_join(guild_id: int, user_id: int) -> None:
+    """Mark a user as seen in a guild (and put them on its built boards)."""
+    uid = str(user_id)
+    seen = _guild_seen(_root()["guilds"][str(guild_id)])
+    if uid in seen:
+        return
+    seen[uid] = 1
+    if _USER_GUILDS is not None:
+        _USER_GUILDS.setdefault(uid, set()).add(int(guild_id))
+    root = _root()
+    for name, boards in _BOARDS.items():
+        b = boards.get(int(guild_id))
+        if b is not None:
+            b.set(int(user_id), ranking.get_metric(name).score(root, uid))
+
+
+@_remote
+def lb_page(metric: str, scope: int = 0, page: int = 1, per: int = 10) -> Dict[str, Any]:
+    """
+    One page of a board: {"rows": [[rank, user_id, score], ...], "count",
+    "page", "pages"}. ValueError for an unknown metric.
+    """
+    b = _board(metric, scope)
+    pages = max(1, -(-len(b) // per))
+    page = max(1, min(page, pages))
+    return {"rows": [list(r) for r in b.rows((page - 1) * per, per)],
+            "count": len(b), "page": page, "pages": pages}
+
+
+@_remote
+def lb_around(metric: str, user_id: int, scope: int = 0, radius: int = 2) -> Dict[str, Any]:
+    """The user's rank and the rows `radius` places either side of them."""
+    b = _board(metric, scope)
+    pos = b.position(int(user_id))
+    if pos is None:
+        return {"rows": [], "count": len(b), "rank": None}
+    start = max(0, pos - radius)
+    return {"rows": [list(r) for r in b.rows(start, pos - start + radius + 1)],
+            "count": len(b), "rank": b.rank(int(user_id))}
+
+
+@_remote
+def guild_seen(guild_id: int) -> List[int]:
+    """Ids of everyone who has rolled in the guild (some may have left it since)."""
+    g = _root().get("guilds", {}).get(str(guild_id))
+    return [int(u) for u in _guild_seen(g)] if g else []
+
+
+# =====================================================================
+# Profiles section
+# =====================================================================
+# !profile pulls from rolls, Brettventures and the economy in one call. The
+# roll-derived part is cached per user against the user's "v" (bumped by every
+# write to that user) and the rank comes from the "rolls" leaderboard index, so
+# a lookup is a few dict reads and one O(log n) rank query.
+_PROFILE_CACHE: Dict[str, tuple] = {}
+
+
+def _roll_summary(uid: str, u: Dict[str, Any]) -> Dict[str, Any]:
+    v = u.get("v", 0)
+    hit = _PROFILE_CACHE.get(uid)
+    if hit is not None and hit[0] == v:
+        return hit[1]
+    outcomes = u.get("outcomes", {})
+    fav = max(outcomes, key=lambda k: int(outcomes[k]), default=None)
+    summary = {
+        "total": int(u.get("total", 0)),
+        "favourite": fav if fav is not None and int(outcomes[fav]) > 0 else None,
+        "favourite_count": int(outcomes.get(fav, 0)) if fav is not None else 0,
+        "streak_days": int(u.get("streak_days", 0)),
     }
+    _PROFILE_CACHE[uid] = (v, summary)
+    return summary
 
 
-def bv_get_player(user_id: int) -> Dict[str, Any] | None:
-    root = _load_all()
-    p = root.get("brettventures", {}).get("players", {}).get(str(user_id))
-    if not p:
-        return None
-    # Apply regen every read
-    changed = _tick_stamina_inplace(p)
-    if changed:
-        ns = root.setdefault("brettventures", {})
-        ns.setdefault("players", {})[str(user_id)] = p
-        _save_all(root)
-    return p
-
-def bv_get_or_create_player(user_id: int, name: str) -> Dict[str, Any]:
-    root = _load_all()
-    ns = root.setdefault("brettventures", {})
-    players = ns.setdefault("players", {})
-    if str(user_id) in players:
-        p = players[str(user_id)]
-        changed = _tick_stamina_inplace(p)
-        if changed:
-            _save_all(root)
-        return p
-    p = _blank_player(user_id, name)
-    players[str(user_id)] = p
-    _save_all(root)
-    return p
-
-def bv_upsert_player(p: Dict[str, Any]) -> None:
-    root = _load_all()
-    ns = root.setdefault("brettventures", {})
-    players = ns.setdefault("players", {})
-    players[str(p["user_id"])] = p
-    _save_all(root)
-
-def bv_add_xp(user_id: int, amount: int) -> Dict[str, Any]:
-    root = _load_all()
-    ns = root.setdefault("brettventures", {})
-    players = ns.setdefault("players", {})
-    p = players.get(str(user_id))
-    if not p:
-        raise ValueError("No such player")
-    p["xp"] += amount
-    while p["xp"] >= 10 * p["level"]:
-        p["xp"] -= 10 * p["level"]
-        p["level"] += 1
-        p["hp_max"] += 2
-        p["stamina_max"] += 1
-    _save_all(root)
-    return p
-
-def _tick_stamina_inplace(p: Dict[str, Any], now: int | None = None) -> int:
-    """
-    Apply time-based stamina regen in-place.
-    Returns how many stamina points were regenerated.
-    """
-    if not p or BV_STAMINA_REGEN_SECS <= 0:
-        return 0
-    now = int(now or time.time())
-    p.setdefault("stamina_ts", now)
-    if p["stamina"] >= p["stamina_max"]:
-        # Keep ts “caught up” so next ETA is sane
-        p["stamina_ts"] = now
-        return 0
+@_remote
+def get_profile(user_id: int) -> Dict[str, Any]:
+    """
+    Everything !profile shows, in one read: {"rolls": {...} | None,
+    "rank": int | None, "ranked": int, "adventure": {...} | None,
+    "battles": {"w", "l", "t", "elo"} | None, "balance": int}.
+    """
+    root = _root()
+    uid = str(user_id)
+    u = root.get("users", {}).get(uid)
+    rolls = _roll_summary(uid, u) if u else None
+    board = _board("rolls")
+    rank, ranked = board.rank(int(user_id)), len(board)
+    p = root.get("brettventures", {}).get("players", {}).get(uid)
+    adventure = None
+    if p:
+        adventure = {k: p.get(k) for k in ("level", "xp", "hp", "hp_max", "stamina", "stamina_max")}
+        adventure["quests_done"] = sum(1 for _, _, done in quests.status(p) if done)
+    return {"rolls": rolls, "rank": rank, "ranked": ranked, "adventure": adventure,
+            "battles": root.get("battles", {}).get("players", {}).get(uid),
+            "balance": economy.balance(economy.live_node(), economy.account(user_id))}
 
-    elapsed = max(0, now - int(p["stamina_ts"]))
-    if elapsed < BV_STAMINA_REGEN_SECS:
-        return 0
 
-    ticks = elapsed // BV_STAMINA_REGEN_SECS
-    if ticks <= 0:
-        return 0
+# ---- per-guild settings ----
+@_remote
+def get_prefixes() -> Dict[str, str]:
+    """guild id (str) -> custom command prefix, for every guild that set one."""
+    return dict(_root().get("prefixes", {}))
+
 
-    before = p["stamina"]
-    p["stamina"] = min(p["stamina_max"], p["stamina"] + int(ticks))
-    # Advance ts by the number of full-interval ticks actually applied.
-    applied = p["stamina"] - before
-    if applied > 0:
-        p["stamina_ts"] = int(p["stamina_ts"]) + applied * BV_STAMINA_REGEN_SECS
+@_remote
+@_journaled
+def set_prefix(guild_id: int, prefix: str | None) -> None:
+    """Set a guild's command prefix; None clears it back to the default."""
+    stats = _root()
+    table = stats.setdefault("prefixes", {})
+    if prefix:
+        table[str(guild_id)] = prefix
     else:
-        # If we were already full by the time we checked, catch up ts to now.
-        p["stamina_ts"] = now
-    return applied
-
-
-def bv_next_stamina_eta(user_id: int) -> int | None:
-    """
-    Seconds until next stamina point for this user.
-    Returns 0 if a point is ready now, None if already full.
-    """
-    root = _load_all()
-    p = root.get("brettventures", {}).get("players", {}).get(str(user_id))
-    if not p:
-        return None
-    now = int(time.time())
-    _ = _tick_stamina_inplace(p, now)
-    # Save after tick
-    ns = root.setdefault("brettventures", {})
-    ns.setdefault("players", {})[str(user_id)] = p
-    _save_all(root)
-
-    if p["stamina"] >= p["stamina_max"]:
-        return None
-    due = int(p.get("stamina_ts", now)) + BV_STAMINA_REGEN_SECS
-    return max(0, due - now)
+        table.pop(str(guild_id), None)
+    _atomic_save(stats)
+
+# ---- rate limits (see utils/ratelimit.py) ----
+_RATES = None
+
+
+@_remote
+def rate_hit_all(checks: List[List[Any]], now: float) -> List[float]:
+    """
+    GCRA checks [[key, interval, tolerance], ...] against this process's
+    limiter, spent together or not at all; the daemon's is shared by every shard.
+    """
+    global _RATES
+    if _RATES is None:
+        from utils import ratelimit
+        _RATES = ratelimit.MemoryBackend()
+    return _RATES.hit_all(checks, now)
+
+
+# The per-feature store ops live with their features (utils/economy.py,
+# utils/quests.py, utils/battles.py, utils/brettventures.py) and register
+# themselves through @_remote/@_journaled when imported. They import this
+# module, so they come last: by now everything they use is defined, and
+# importing storage alone is enough for the daemon and journal replay to
+# know every op.
+from utils import battles, brettventures, economy, quests  # noqa: E402,F401
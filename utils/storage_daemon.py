@@ -0,0 +1,105 @@
+# utils/storage_daemon.py
+"""
+Local storage service for multi-process deployments.
+
+One daemon owns STATS_FILE. Bot processes (one per shard group) set
+STORAGE_SOCKET to the same path and utils.storage forwards every public
+read/write here instead of touching the file. Requests are handled one at a
+time on a single event loop, so writes from all processes are serialized.
+
+Wire format: one JSON object per line.
+    -> {"id": 1, "op": "record_roll", "args": [gid, uid, "Nah."], "kwargs": {}}
+    <- {"id": 1, "ok": true, "result": null}
+    <- {"id": 1, "ok": false, "type": "ValueError", "error": "No such player"}
+
+Usage:
+    python -m utils.storage_daemon --socket /tmp/brett-storage.sock
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+from typing import Any, Dict
+
+from utils import storage, timeutil
+
+# Requests can carry a whole store (save_stats), so don't cap line length
+_MAX_LINE = 1 << 30
+
+
+def _dispatch(req: Dict[str, Any]) -> Dict[str, Any]:
+    rid = req.get("id")
+    op = req.get("op")
+    if op == "ping":
+        return {"id": rid, "ok": True, "result": "pong"}
+    fn = storage.REMOTE_OPS.get(op)
+    if fn is None:
+        return {"id": rid, "ok": False, "type": "ValueError", "error": f"unknown op {op!r}"}
+    try:
+        result = fn(*req.get("args", []), **req.get("kwargs", {}))
+        return {"id": rid, "ok": True, "result": result}
+    except Exception as e:
+        return {"id": rid, "ok": False, "type": type(e).__name__, "error": str(e)}
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                resp = _dispatch(json.loads(line))
+            except json.JSONDecodeError as e:
+                resp = {"id": None, "ok": False, "type": "ValueError", "error": f"bad request: {e}"}
+            writer.write((json.dumps(resp) + "\n").encode("utf-8"))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(path: str) -> None:
+    # This process is the store; never forward to ourselves
+    storage.STORAGE_SOCKET = None
+    storage.prewarm()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(_handle, path=path, limit=_MAX_LINE)
+    os.chmod(path, 0o600)
+    print(f"[STORAGE] serving {storage.STATS_FILE} on {path}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    sched = timeutil.Scheduler()
+    storage.schedule_jobs(sched)
+    upkeep = asyncio.create_task(sched.run())
+    async with server:
+        await stop.wait()
+    upkeep.cancel()
+    storage.flush()
+    if os.path.exists(path):
+        os.unlink(path)
+    print("[STORAGE] stopped", flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Brett Bot storage daemon")
+    ap.add_argument("--socket", default=os.getenv("STORAGE_SOCKET") or "/tmp/brett-storage.sock")
+    args = ap.parse_args()
+    asyncio.run(serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
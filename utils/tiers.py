@@ -0,0 +1,344 @@
+# utils/tiers.py
+"""
+Hot/cold tiers for the per-user parts of the store.
+
+root["users"] (roll stats) and root["brettventures"]["players"] are
+TieredDicts: a plain dict holding only the hot records, which is all that the
+store file, snapshots and every save contain, backed by a ColdStore (a SQLite
+file of zlib'd JSON records) holding everyone else. Callers use the ordinary
+dict API; a key that isn't hot is read from the cold store and promoted on the
+spot, so nothing outside storage knows which tier a user was in. Iterating a
+TieredDict sees the hot records only; ColdView walks everybody without
+promoting anyone (leaderboard builds, exports).
+
+sweep() demotes the least recently used records: everything idle for
+COLD_AFTER seconds, then whatever is left over HOT_MAX. Rows are committed to
+the cold store before they leave the dict, so a crash in between leaves a
+record in both tiers, and the hot copy wins. Recency is a {key: unix time}
+dict kept in LRU order; after a restart it starts from each record's own
+last-activity time (the `last_active` callback), so it isn't saved anywhere.
+
+Every record also gets a registry row the first time it is written, so the
+registry lists all users in a stable order: counts and exports come from it,
+not from memory. Demoting a record adds a version of it stamped with the
+journal seq (ColdStore's clock) rather than overwriting the last one, so the
+cold tier can be read as of any seq: a store loaded from disk rewinds away
+versions newer than itself before the journal is replayed onto it.
+
+Each namespace's rows belong to a generation named in the store
+(root["_tiers"]["gens"][ns]). A namespace that arrives without one (a fresh
+install; "users" after !resetstats) starts a new generation and the rows of
+the old one stop counting. Restoring a snapshot forks its "users" generation
+as of the snapshot's seq, so users who were cold then come back as they were
+at that point, and the originals stay intact for the other snapshots
+(players aren't rolled back; their fork only lives for the replay).
+
+STORE_COLD_DAYS (default 30; 0 turns tiering off), STORE_HOT_MAX (records
+per namespace, default 100000), STORE_COLD_FILE (default cold_store.sqlite
+next to STATS_FILE).
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+COLD_AFTER = float(os.getenv("STORE_COLD_DAYS", "30")) * 86400
+ENABLED = COLD_AFTER > 0
+HOT_MAX = int(os.getenv("STORE_HOT_MAX", "100000"))
+SWEEP_SECS = 60.0
+SWEEP_MAX = 5000      # records demoted per namespace per sweep; the rest wait for the next flush
+TOUCH_GRAIN = 60      # a record's recency only moves once a minute
+SCAN_PAGE = 1000
+
+
+def cold_path(stats_file: str) -> str:
+    return os.getenv("STORE_COLD_FILE") or os.path.join(os.path.dirname(stats_file) or ".", "cold_store.sqlite")
+
+
+def _encode(rec: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(rec, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+class ColdStore:
+    def __init__(self, path: str, clock: Callable[[], int] = lambda: 0):
+        self.path, self.clock = path, clock
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")   # a demoted record exists nowhere else
+        self._lock = threading.Lock()
+        self._write(
+            ("CREATE TABLE IF NOT EXISTS gens (gen INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL)", None),
+            # Registry: one row per key ever written, in a stable order; gone = seq it was deleted at
+            ("CREATE TABLE IF NOT EXISTS reg (gen INTEGER NOT NULL, ns TEXT NOT NULL, uid TEXT NOT NULL, "
+             "seq INTEGER NOT NULL, gone INTEGER, UNIQUE (gen, ns, uid))", None),
+            # Record versions, one per demotion (blob NULL: deleted), stamped with the journal seq
+            ("CREATE TABLE IF NOT EXISTS recs (gen INTEGER NOT NULL, ns TEXT NOT NULL, uid TEXT NOT NULL, "
+             "seq INTEGER NOT NULL, blob BLOB, UNIQUE (gen, ns, uid, seq))", None),
+            ("CREATE INDEX IF NOT EXISTS recs_seq ON recs (gen, ns, seq)", None),
+        )
+        if self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cold'").fetchone():
+            # Unversioned rows from before: they become versions as of seq 0
+            self._write(
+                ("INSERT OR IGNORE INTO reg (gen, ns, uid, seq) SELECT gen, ns, uid, 0 FROM cold ORDER BY rowid", None),
+                ("INSERT OR IGNORE INTO recs (gen, ns, uid, seq, blob) "
+                 "SELECT gen, ns, uid, 0, blob FROM cold WHERE blob IS NOT NULL", None),
+                ("DROP TABLE cold", None),
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def new_gen(self) -> int:
+        with self._lock:
+            return self._db.execute("INSERT INTO gens (ts) VALUES (?)", (time.time(),)).lastrowid
+
+    def get(self, gen: int, ns: str, uid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT blob FROM recs WHERE gen = ? AND ns = ? AND uid = ? "
+                                   "ORDER BY seq DESC LIMIT 1", (gen, ns, uid)).fetchone()
+        return _decode(row[0]) if row and row[0] is not None else None
+
+    def count(self, gen: int, ns: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reg WHERE gen = ? AND ns = ? AND gone IS NULL",
+                                    (gen, ns)).fetchone()[0]
+
+    def register(self, gen: int, ns: str, uids: Iterable[str]) -> None:
+        """Add registry rows (no record yet) for keys the store hasn't seen before."""
+        seq = self.clock()
+        self._write(("INSERT INTO reg (gen, ns, uid, seq) VALUES (?, ?, ?, ?) ON CONFLICT (gen, ns, uid) "
+                     "DO UPDATE SET seq = excluded.seq, gone = NULL WHERE gone IS NOT NULL",
+                     [(gen, ns, u, seq) for u in uids]))
+
+    def put(self, gen: int, ns: str, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Store a new version of each record, in one transaction."""
+        seq = self.clock()
+        self._write(("INSERT INTO recs (gen, ns, uid, seq, blob) VALUES (?, ?, ?, ?, ?) "
+                     "ON CONFLICT (gen, ns, uid, seq) DO UPDATE SET blob = excluded.blob",
+                     [(gen, ns, uid, seq, _encode(rec)) for uid, rec in rows]))
+
+    def _write(self, *steps: Tuple[str, Optional[List[tuple]]]) -> None:
+        """Run (sql, params for each row, or None to run once) steps in one transaction."""
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in steps:
+                    if params is None:
+                        db.execute(sql)
+                    else:
+                        db.executemany(sql, params)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def forget(self, gen: int, ns: str, uid: str) -> None:
+        seq = self.clock()
+        self._write(("UPDATE reg SET gone = ? WHERE gen = ? AND ns = ? AND uid = ?", [(seq, gen, ns, uid)]),
+                    ("INSERT INTO recs (gen, ns, uid, seq) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT (gen, ns, uid, seq) DO UPDATE SET blob = NULL", [(gen, ns, uid, seq)]))
+
+    def rewind(self, gen: int, ns: str, seq: int) -> int:
+        """Drop what was written after journal seq `seq` (the store on disk is older); returns versions dropped."""
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM recs WHERE gen = ? AND ns = ? AND seq > ?",
+                                 (gen, ns, seq)).fetchone()[0]
+            stale = n or self._db.execute("SELECT 1 FROM reg WHERE gen = ? AND ns = ? AND (seq > ? OR gone > ?)",
+                                          (gen, ns, seq, seq)).fetchone()
+        if stale:
+            self._write(("DELETE FROM recs WHERE gen = ? AND ns = ? AND seq > ?", [(gen, ns, seq)]),
+                        ("DELETE FROM reg WHERE gen = ? AND ns = ? AND seq > ?", [(gen, ns, seq)]),
+                        ("UPDATE reg SET gone = NULL WHERE gen = ? AND ns = ? AND gone > ?", [(gen, ns, seq)]))
+        return n
+
+    def fork(self, gen: int, ns: str, seq: int) -> int:
+        """A new generation holding `ns` of `gen` as it was at journal seq `seq`; returns it."""
+        new = self.new_gen()
+        self._write(
+            ("INSERT INTO reg (gen, ns, uid, seq) SELECT ?, ns, uid, seq FROM reg WHERE gen = ? AND ns = ? "
+             "AND seq <= ? AND (gone IS NULL OR gone > ?) ORDER BY rowid", [(new, gen, ns, seq, seq)]),
+            # (SQLite fills the bare blob column from the row MAX() picked)
+            ("INSERT INTO recs (gen, ns, uid, seq, blob) SELECT ?, v.ns, v.uid, MAX(v.seq), v.blob FROM recs v "
+             "JOIN reg r ON r.gen = ? AND r.ns = v.ns AND r.uid = v.uid "
+             "WHERE v.gen = ? AND v.ns = ? AND v.seq <= ? GROUP BY v.uid", [(new, new, gen, ns, seq)]),
+        )
+        return new
+
+    def drop(self, gen: int, ns: str) -> None:
+        """Delete `ns` of a generation nothing points at any more."""
+        self._write(("DELETE FROM recs WHERE gen = ? AND ns = ?", [(gen, ns)]),
+                    ("DELETE FROM reg WHERE gen = ? AND ns = ?", [(gen, ns)]))
+
+    def prune(self, seq: int) -> None:
+        """Drop versions nothing at or after journal seq `seq` can read (a newer one exists by then)."""
+        self._write(("DELETE FROM recs WHERE seq < ? AND EXISTS (SELECT 1 FROM recs n WHERE n.gen = recs.gen "
+                     "AND n.ns = recs.ns AND n.uid = recs.uid AND n.seq > recs.seq AND n.seq <= ?)", [(seq, seq)]))
+
+    def page(self, gen: int, ns: str, after: int = 0, offset: int = 0,
+             limit: int = SCAN_PAGE) -> List[Tuple[int, str, Optional[bytes]]]:
+        """[(rowid, uid, blob or None), ...] in registration order, after rowid `after` (skipping `offset`)."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT r.rowid, r.uid, (SELECT v.blob FROM recs v WHERE v.gen = r.gen AND v.ns = r.ns "
+                "AND v.uid = r.uid ORDER BY v.seq DESC LIMIT 1) FROM reg r "
+                "WHERE r.gen = ? AND r.ns = ? AND r.gone IS NULL AND r.rowid > ? "
+                "ORDER BY r.rowid LIMIT ? OFFSET ?", (gen, ns, after, limit, offset)).fetchall()
+
+
+class TieredDict(dict):
+    """The hot records of one namespace (see the module docstring)."""
+
+    def __init__(self, records: Dict[str, Any], cold: ColdStore, gen: int, ns: str,
+                 last_active: Callable[[Dict[str, Any]], float],
+                 on_promote: Callable[[Dict[str, Any]], None] | None = None):
+        super().__init__(dict.items(records))
+        self.cold, self.gen, self.ns = cold, gen, ns
+        self.on_promote = on_promote
+        self.promoted = self.demoted = 0
+        stamps = sorted(((int(last_active(rec)), key) for key, rec in dict.items(self)))
+        self.seen: Dict[str, int] = {key: at for at, key in stamps}
+
+    # -- promotion --
+    def _fetch(self, key: Any) -> bool:
+        if not isinstance(key, str):
+            return False
+        rec = self.cold.get(self.gen, self.ns, key)
+        if rec is None:
+            return False
+        if self.on_promote is not None:
+            self.on_promote(rec)
+        dict.__setitem__(self, key, rec)
+        self.promoted += 1
+        return True
+
+    def _touch(self, key: str) -> None:
+        now = int(time.time())
+        seen = self.seen
+        if now - seen.get(key, 0) >= TOUCH_GRAIN:
+            seen.pop(key, None)
+            seen[key] = now   # to the back: the front is always the least recently used
+
+    def __contains__(self, key: Any) -> bool:
+        if dict.__contains__(self, key) or self._fetch(key):
+            self._touch(key)
+            return True
+        return False
+
+    def __getitem__(self, key: Any) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return dict.__getitem__(self, key) if key in self else default
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not dict.__contains__(self, key):
+            self.cold.register(self.gen, self.ns, (key,))
+        dict.__setitem__(self, key, value)
+        self._touch(key)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            raise KeyError(key)
+        dict.__delitem__(self, key)
+        self.seen.pop(key, None)
+        self.cold.forget(self.gen, self.ns, key)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
+
+    def peek(self, key: str, blob: bytes | None = None) -> Optional[Dict[str, Any]]:
+        """A record from whichever tier has it, without promoting it (`blob`: its cold row, if already read)."""
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if blob is not None:
+            return _decode(blob)
+        return self.cold.get(self.gen, self.ns, key)
+
+    # -- demotion --
+    def total(self) -> int:
+        """Records in both tiers."""
+        return self.cold.count(self.gen, self.ns)
+
+    def sweep(self, now: float, idle_after: float = COLD_AFTER, max_hot: int = HOT_MAX,
+              most: int = SWEEP_MAX, prepare: Callable[[Dict[str, Any]], Any] | None = None) -> int:
+        """Demote idle records, then least recently used ones over max_hot; returns how many."""
+        cutoff = now - idle_after
+        over = len(self) - max_hot
+        keys = []
+        for key, at in self.seen.items():
+            if len(keys) >= most or (at >= cutoff and len(keys) >= over):
+                break
+            keys.append(key)
+        if not keys:
+            return 0
+        rows = []
+        for key in keys:
+            rec = dict.__getitem__(self, key)
+            if prepare is not None:
+                prepare(rec)
+            rows.append((key, rec))
+        self.cold.put(self.gen, self.ns, rows)
+        for key in keys:
+            dict.__delitem__(self, key)
+            del self.seen[key]
+        self.demoted += len(keys)
+        return len(keys)
+
+
+class ColdView(Mapping):
+    """Every record of a TieredDict, hot or cold, read without promoting anyone."""
+
+    def __init__(self, hot: TieredDict):
+        self.hot = hot
+        self._row: Tuple[str | None, bytes | None] = (None, None)   # the row iteration is on
+
+    def __iter__(self) -> Iterator[str]:
+        hot, after = self.hot, 0
+        while True:
+            rows = hot.cold.page(hot.gen, hot.ns, after)
+            for rowid, uid, blob in rows:
+                self._row = (uid, blob)
+                yield uid
+            if len(rows) < SCAN_PAGE:
+                return
+            after = rows[-1][0]
+
+    def __len__(self) -> int:
+        return self.hot.total()
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        uid, blob = self._row
+        # Board builds score each key as they iterate: read it off the current row
+        rec = self.hot.peek(key, blob if key == uid else None)
+        if rec is None:
+            raise KeyError(key)
+        return rec
@@ -0,0 +1,208 @@
+# utils/timeutil.py
+"""
+One asyncio scheduler for the bot's periodic work (flushes, snapshots, streak
+rollover, window pruning, cache expiry), so none of it runs on a command's
+request path and every job is timed in one place.
+
+Jobs sit in a heap keyed by their next run time; a single task sleeps until
+the earliest one is due (or a job is added). A job is either an interval
+(`every=` seconds) or a cron spec (`cron="0 0 * * *"`: minute, hour,
+day-of-month, month, day-of-week, all UTC; `@hourly`/`@daily`/`@weekly`/
+`@monthly` work too). `jitter` adds a random 0..jitter seconds to each run so
+processes sharing a schedule don't all fire at once.
+
+A job whose previous run is still going when it comes due is skipped (and
+counted), never started twice. Each job keeps runs, failures, skips and
+last/avg/max duration; Scheduler.stats() returns them.
+
+Jobs may be plain functions or return an awaitable. Plain functions run on
+the event loop, like the storage calls they usually make; wrap blocking I/O
+in asyncio.to_thread yourself.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+class Cron:
+    """A 5-field cron spec; next_after() gives the next matching minute (UTC)."""
+
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        parts = CRON_ALIASES.get(spec.strip(), spec).split()
+        if len(parts) != 5:
+            raise ValueError(f"cron spec needs 5 fields: {spec!r}")
+        fields = [self._field(p, lo, hi) for p, (lo, hi) in zip(parts, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months = fields[:4]
+        self.weekdays = frozenset(d % 7 for d in fields[4])   # 0 and 7 are both Sunday
+        # Like cron: if both day fields are restricted, either one matching is enough
+        self._any_day, self._any_weekday = parts[2] == "*", parts[4] == "*"
+
+    @staticmethod
+    def _field(text: str, lo: int, hi: int) -> Tuple[int, ...]:
+        values = set()
+        for item in text.split(","):
+            item, _, step = item.partition("/")
+            if item == "*":
+                a, b = lo, hi
+            elif "-" in item:
+                a, b = (int(x) for x in item.split("-", 1))
+            else:
+                a = int(item)
+                b = hi if step else a
+            n = int(step) if step else 1
+            if not lo <= a <= b <= hi or n < 1:
+                raise ValueError(f"bad cron field {text!r}")
+            values.update(range(a, b + 1, n))
+        return tuple(sorted(values))
+
+    def _day_ok(self, tm: time.struct_time) -> bool:
+        dom = tm.tm_mday in self.days
+        dow = (tm.tm_wday + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, ts: float) -> float:
+        t = (int(ts) // 60 + 1) * 60
+        for _ in range(4 * 366):
+            tm = time.gmtime(t)
+            day_start = t - tm.tm_hour * 3600 - tm.tm_min * 60 - tm.tm_sec
+            if tm.tm_mon in self.months and self._day_ok(tm):
+                for h in self.hours:
+                    if h < tm.tm_hour:
+                        continue
+                    for m in self.minutes:
+                        if h == tm.tm_hour and m < tm.tm_min:
+                            continue
+                        return float(day_start + h * 3600 + m * 60)
+            t = day_start + 86400
+        raise ValueError(f"cron spec never fires: {self.spec!r}")
+
+
+class Job:
+    __slots__ = ("name", "func", "every", "cron", "jitter", "next_run", "task", "cancelled",
+                 "runs", "failures", "skipped", "last_ms", "max_ms", "total_ms", "last_error")
+
+    def __init__(self, name: str, func: Callable[[], Any], every: float | None,
+                 cron: Cron | None, jitter: float):
+        self.name, self.func = name, func
+        self.every, self.cron, self.jitter = every, cron, jitter
+        self.next_run = 0.0
+        self.task: asyncio.Task | None = None
+        self.cancelled = False
+        self.runs = self.failures = self.skipped = 0
+        self.last_ms = self.max_ms = self.total_ms = 0.0
+        self.last_error: str | None = None
+
+    def plan(self, now: float) -> float:
+        base = self.cron.next_after(now) if self.cron is not None else now + self.every
+        self.next_run = base + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        return self.next_run
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {"runs": self.runs, "failures": self.failures, "skipped": self.skipped,
+                "last_ms": round(self.last_ms, 2), "max_ms": round(self.max_ms, 2),
+                "avg_ms": round(self.total_ms / self.runs, 2) if self.runs else 0.0,
+                "running": self.task is not None and not self.task.done(),
+                "next_in": round(max(0.0, self.next_run - now), 1), "last_error": self.last_error}
+
+
+class Scheduler:
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._jobs: Dict[str, Job] = {}
+        self._seq = 0
+        self._wake: asyncio.Event | None = None
+
+    def add(self, name: str, func: Callable[[], Any], *, every: float | None = None,
+            cron: str | None = None, jitter: float = 0.0) -> Job:
+        """Schedule func, replacing any job of the same name."""
+        if (every is None) == (cron is None):
+            raise ValueError("give a job exactly one of every= or cron=")
+        if every is not None and every <= 0:
+            raise ValueError("every= must be positive")
+        self.cancel(name)
+        job = self._jobs[name] = Job(name, func, every, Cron(cron) if cron else None, jitter)
+        self._push(job, job.plan(time.time()))
+        return job
+
+    def cancel(self, name: str) -> bool:
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return False
+        job.cancelled = True   # its heap entry is dropped when it comes up
+        return True
+
+    def _push(self, job: Job, at: float) -> None:
+        job.next_run = at
+        self._seq += 1
+        heapq.heappush(self._heap, (at, self._seq, job))
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self) -> None:
+        """Run jobs as they come due, until cancelled."""
+        self._wake = asyncio.Event()
+        while True:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, job = heapq.heappop(self._heap)
+            self._start(job)
+            self._push(job, job.plan(time.time()))
+
+    def _start(self, job: Job) -> None:
+        if job.task is not None and not job.task.done():
+            job.skipped += 1
+            print(f"[SCHED] {job.name} still running; skipped this run", flush=True)
+            return
+        job.task = asyncio.create_task(self._run(job))
+
+    @staticmethod
+    async def _run(job: Job) -> None:
+        t0 = time.perf_counter()
+        try:
+            result = job.func()
+            if inspect.isawaitable(result):
+                await result
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            print(f"[SCHED] {job.name} failed: {job.last_error}", flush=True)
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            job.runs += 1
+            job.last_ms = ms
+            job.total_ms += ms
+            job.max_ms = max(job.max_ms, ms)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """name -> runs, failures, skipped, last/avg/max ms, running, next_in (s), last_error."""
+        now = time.time()
+        return {name: job.stats(now) for name, job in sorted(self._jobs.items())}
+
+
+SCHEDULER = Scheduler()
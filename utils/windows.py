@@ -0,0 +1,155 @@
+# utils/windows.py
+"""
+Rolling, bucketed counters for time-windowed stats.
+
+Each counted node (a user record, stats["global"], a guild record) carries a
+"win" dict of ring buffers, one per unit:
+
+    node["win"]["day"] = {"<slot>": {"k": <day index>, "n": total,
+                                     "o": {outcome: n}, "u": {uid: n}}}
+
+A roll bumps one bucket per unit (O(1)); the slot is `key % ring size`, and a
+bucket whose key doesn't match the current one is simply overwritten, so each
+node holds at most sum(ring sizes) buckets no matter how long it lives.
+Queries read the current bucket (today / week / month) or sum the hour ring
+(24h) and never look at raw history.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+# unit -> ring size
+RING = {"hour": 24, "day": 8, "week": 2, "month": 2}
+
+# Units whose scope buckets (global/guild) also keep per-user counts for
+# windowed leaderboards. Hours stay totals-only to keep buckets small.
+USER_UNITS = ("day", "week", "month")
+
+# user-facing window name -> unit (None means "sum the hour ring")
+WINDOWS = {
+    "today": "day", "day": "day", "daily": "day",
+    "week": "week", "weekly": "week",
+    "month": "month", "monthly": "month",
+    "24h": None,
+}
+
+WINDOW_LABELS = {"day": "today", "week": "this week", "month": "this month", None: "last 24h"}
+
+
+def unit_key(unit: str, ts: float) -> int:
+    """Monotonic bucket index of `ts` (UTC) for the given unit."""
+    t = int(ts)
+    if unit == "hour":
+        return t // 3600
+    if unit == "day":
+        return t // 86400
+    if unit == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (t // 86400 + 3) // 7
+    if unit == "month":
+        tm = time.gmtime(t)
+        return tm.tm_year * 12 + tm.tm_mon - 1
+    raise ValueError(f"unknown unit {unit!r}")
+
+
+def parse_window(word: str | None) -> Tuple[bool, str | None]:
+    """(is_window, unit) for a user-typed word like 'week' or 'today'."""
+    if not word:
+        return False, None
+    w = word.strip().lower()
+    if w in WINDOWS:
+        return True, WINDOWS[w]
+    return False, None
+
+
+def _bucket(ring: Dict[str, Any], unit: str, key: int, with_users: bool) -> Dict[str, Any] | None:
+    slot = str(key % RING[unit])
+    b = ring.get(slot)
+    if b is not None and b.get("k", -1) > key:
+        return None  # late event older than the ring covers; never clobber newer data
+    if b is None or b.get("k") != key:
+        b = {"k": key, "n": 0, "o": {}}
+        if with_users:
+            b["u"] = {}
+        ring[slot] = b
+    return b
+
+
+def bump(node: Dict[str, Any], ts: float, outcome: str, user_id: int | None = None) -> None:
+    """Count one roll in every unit's current bucket. `user_id` marks a scope node."""
+    win = node.setdefault("win", {})
+    uid = str(user_id) if user_id is not None else None
+    for unit in RING:
+        key = unit_key(unit, ts)
+        keep_users = uid is not None and unit in USER_UNITS
+        b = _bucket(win.setdefault(unit, {}), unit, key, keep_users)
+        if b is None:
+            continue
+        b["n"] += 1
+        if unit != "hour":
+            b["o"][outcome] = b["o"].get(outcome, 0) + 1
+        if keep_users:
+            b["u"][uid] = b["u"].get(uid, 0) + 1
+
+
+def current(node: Dict[str, Any] | None, unit: str | None, now: float | None = None) -> Dict[str, Any]:
+    """{"total", "outcomes", "users"} for the window ending now."""
+    now = time.time() if now is None else now
+    out: Dict[str, Any] = {"total": 0, "outcomes": {}, "users": {}}
+    win = (node or {}).get("win", {})
+
+    if unit is None:
+        # last 24 hours: sum the hour ring (totals only)
+        ring = win.get("hour", {})
+        lo = unit_key("hour", now) - RING["hour"] + 1
+        out["total"] = sum(b["n"] for b in ring.values() if b.get("k", -1) >= lo)
+        return out
+
+    key = unit_key(unit, now)
+    b = win.get(unit, {}).get(str(key % RING[unit]))
+    if b and b.get("k") == key:
+        out["total"] = b["n"]
+        out["outcomes"] = dict(b.get("o", {}))
+        out["users"] = dict(b.get("u", {}))
+    return out
+
+
+def top_users(node: Dict[str, Any] | None, unit: str, n: int = 10,
+              now: float | None = None) -> List[Tuple[int, int]]:
+    """[(count, user_id), ...] for the current bucket of a scope node."""
+    users = current(node, unit, now)["users"]
+    rows = sorted(((c, int(uid)) for uid, c in users.items()), reverse=True)
+    return rows[:n]
+
+
+def expire(node: Dict[str, Any], now: float | None = None) -> int:
+    """Drop buckets that fell out of their ring's range; returns how many."""
+    now = time.time() if now is None else now
+    win = node.get("win")
+    if not win:
+        return 0
+    dropped = 0
+    for unit, ring in list(win.items()):
+        if unit not in RING:
+            continue
+        lo = unit_key(unit, now) - RING[unit] + 1
+        for slot in [s for s, b in ring.items() if b.get("k", -1) < lo]:
+            del ring[slot]
+            dropped += 1
+        if not ring:
+            del win[unit]
+    if not win:
+        del node["win"]
+    return dropped
+
+
+def last_active(node: Dict[str, Any]) -> float:
+    """Start of the newest hour/day bucket the node counted anything in (0 if none)."""
+    win = node.get("win", {})
+    return max([b.get("k", 0) * 3600 for b in win.get("hour", {}).values()]
+               + [b.get("k", 0) * 86400 for b in win.get("day", {}).values()], default=0)
+
+
+def expire_all(nodes: Iterable[Dict[str, Any]], now: float | None = None) -> int:
+    return sum(expire(n, now) for n in nodes)